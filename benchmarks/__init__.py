@@ -0,0 +1,12 @@
+"""
+Performance benchmarks for the simulation core. Run them with
+
+    $ python -m benchmarks --output results.json
+
+Every benchmark runs on virtual clocks with fixed seeds, and the results are written as JSON so runs
+can be compared between commits.
+"""
+import os
+
+# Keep pygame's import banner out of the JSON written to stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
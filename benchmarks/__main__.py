@@ -0,0 +1,75 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks import controller, fleet, imports, kinematics
+
+SUITES = {
+    "kinematics": kinematics.run,
+    "controller": controller.run,
+    "fleet": fleet.run,
+    "imports": imports.run,
+}
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the gherkin benchmarks"
+    )
+    parser.add_argument(
+        "suites", nargs="*",
+        help=f"the suites to run, out of {', '.join(SUITES)}. All of them by default"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="run smaller workloads, for smoke testing"
+    )
+    parser.add_argument("--output", help="where to write the JSON results, stdout by default")
+    args = parser.parse_args(argv)
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    results: List[Dict[str, Any]] = []
+    for name in args.suites or SUITES:
+        # The robots print every goal they receive, which would drown out the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            suite_results = SUITES[name](quick=args.quick)
+        for result in suite_results:
+            result["suite"] = name
+        results.extend(suite_results)
+
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "quick": args.quick,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from gherkin.common import Goal
+from gherkin.util import generate_random_goals
+
+SEED: int = 1234
+
+
+def seeded_goals(num_goals: int, seed: int = SEED, shape: str = "uniform") -> List[Goal]:
+    """
+    Generates the same reachable goals on every run
+    Args:
+        num_goals: how many goals to generate
+        seed: the seed for the random number generator
+        shape: the workload to generate, see generate_random_goals
+
+    Returns: the goals
+    """
+    return generate_random_goals(num_goals, seed, shape)
+
+
+def time_call(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Times a function over several runs
+    Args:
+        function: the code to time
+        repeat: how many times to run it
+
+    Returns: the fastest and median wall time of a run, in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min_s": min(timings), "median_s": statistics.median(timings)}
+
+
+def record(name: str, params: Dict[str, Any], metrics: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Builds a single benchmark record
+    Args:
+        name: the name of the benchmark
+        params: the parameters the benchmark ran with
+        metrics: the measured values
+
+    Returns: the record, ready to be dumped as JSON
+    """
+    return {"name": name, "params": params, "metrics": metrics}
@@ -0,0 +1,55 @@
+import itertools
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import record, seeded_goals
+from gherkin.common import Goal, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.trajectory import CONTROLLERS
+
+
+class TickCounter:
+    """
+    Stands in for a visualizer, counting the control ticks of a reach
+    """
+
+    def __init__(self) -> None:
+        self.ticks = 0
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> None:
+        self.ticks += 1
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    """
+    Measures how many control ticks, and how much simulated and wall time, a robot needs per goal
+    with each arm controller, with the base and arm moving one after the other and concurrently
+    """
+    goals = seeded_goals(20 if quick else 500)
+    records = []
+    for (name, controller), concurrent in itertools.product(CONTROLLERS.items(), (False, True)):
+        robot = Robot(
+            0, clock=VirtualClock(), controller=controller(), concurrent_motion=concurrent
+        )
+        ticks = []
+        simulated = []
+        failures = 0
+        start = time.perf_counter()
+        for goal in goals:
+            counter = TickCounter()
+            before = robot.clock.now()
+            failures += not robot.reach(goal, counter).success
+            ticks.append(counter.ticks)
+            simulated.append((robot.clock.now() - before).total_seconds())
+        wall = time.perf_counter() - start
+        parameters = {"goals": len(goals), "controller": name, "concurrent_motion": concurrent}
+        records.append(record("robot.reach", parameters, {
+            "mean_ticks": float(np.mean(ticks)),
+            "p99_ticks": float(np.percentile(ticks, 99)),
+            "mean_simulated_s": float(np.mean(simulated)),
+            "failures": failures,
+            "wall_per_goal_ms": wall / len(goals) * 1e3,
+        }))
+    return records
@@ -0,0 +1,76 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pykka
+
+from benchmarks.common import record, seeded_goals
+from gherkin.common import VirtualClock
+from gherkin.model import Robot
+from gherkin.model.engine import FleetEngine
+from gherkin.model.fleet_manager import FleetManager
+from gherkin.model.trajectory import ProportionalController
+
+# How much slower than its peers the first robot of an uneven fleet moves its arm
+SLOW_ROBOT_FACTOR: int = 6
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    """
+    Measures goals per second of wall time for the actor fleet and the lock-step engine at different
+    fleet sizes, and the makespan of a fleet with one slow robot with and without work stealing
+    """
+    results = []
+    goals_per_robot = 5 if quick else 25
+    for num_robots in ([1, 4] if quick else [1, 2, 4, 8, 16]):
+        num_goals = num_robots * goals_per_robot
+        results.append(record("fleet_manager", {"robots": num_robots, "goals": num_goals},
+                              _run_fleet_manager(num_robots, num_goals)))
+    for work_stealing in (False, True):
+        results.append(record("fleet_manager.uneven", {"robots": 4, "goals": 4 * goals_per_robot,
+                                                       "work_stealing": work_stealing},
+                              _run_uneven_fleet(4, 4 * goals_per_robot, work_stealing)))
+    for num_robots in ([10, 100] if quick else [10, 100, 1_000]):
+        num_goals = num_robots * goals_per_robot
+        results.append(record("fleet_engine", {"robots": num_robots, "goals": num_goals},
+                              _run_engine(num_robots, num_goals)))
+    return results
+
+
+def _run_fleet_manager(num_robots: int, num_goals: int) -> Dict[str, float]:
+    goals = seeded_goals(num_goals)
+    start = datetime.now()
+    robots = [Robot.start(i, clock=VirtualClock(start)).proxy() for i in range(num_robots)]
+    manager = FleetManager(robots, None)
+    began = time.perf_counter()
+    manager.dispatch_goals(goals)
+    completed = sum(1 for _ in manager.iter_results())
+    wall = time.perf_counter() - began
+    pykka.ActorRegistry.stop_all()
+    return {"wall_s": wall, "goals_per_s": completed / wall}
+
+
+def _run_uneven_fleet(num_robots: int, num_goals: int, work_stealing: bool) -> Dict[str, float]:
+    goals = seeded_goals(num_goals)
+    start = datetime.now()
+    robots = [
+        Robot.start(i, clock=VirtualClock(start), controller=ProportionalController(
+            divisor=10 * (SLOW_ROBOT_FACTOR if i == 0 else 1)
+        )).proxy()
+        for i in range(num_robots)
+    ]
+    manager = FleetManager(robots, None, work_stealing=work_stealing)
+    manager.dispatch_goals(goals)
+    finished = [result.completed_at for result in manager.iter_results()]
+    pykka.ActorRegistry.stop_all()
+    return {"makespan_s": (max(finished) - start).total_seconds(), "stolen": manager.stolen}
+
+
+def _run_engine(num_robots: int, num_goals: int) -> Dict[str, float]:
+    goals = seeded_goals(num_goals)
+    engine = FleetEngine(num_robots)
+    began = time.perf_counter()
+    engine.receive_goals(goals)
+    completed = sum(1 for _ in engine.run())
+    wall = time.perf_counter() - began
+    return {"wall_s": wall, "goals_per_s": completed / wall}
@@ -0,0 +1,56 @@
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import record
+
+# The modules a headless run or a worker process starts with
+MODULES: List[str] = [
+    "gherkin.common", "gherkin.model", "gherkin.util", "gherkin.model.fleet_manager"
+]
+
+# Run in a fresh interpreter, so nothing is imported yet. Prints the import time and whether pygame
+# came along
+_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "pygame" in sys.modules)
+"""
+
+
+def import_module(module: str) -> Dict[str, Any]:
+    """
+    Imports a module in a fresh interpreter
+    Args:
+        module: the module to import
+
+    Returns: the import time in seconds, and whether importing it also imported pygame
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output(
+        [sys.executable, "-c", _SCRIPT.format(module=module)], cwd=root, text=True,
+        env={**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"}
+    )
+    seconds, pygame_loaded = output.split()
+    return {"seconds": float(seconds), "pygame_loaded": pygame_loaded == "True"}
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    """
+    Measures how long the gherkin packages take to import in a fresh interpreter, and guards that
+    none of the headless ones drag in pygame
+    """
+    repeat = 3 if quick else 15
+    results = []
+    for module in MODULES:
+        runs = [import_module(module) for _ in range(repeat)]
+        timings = [run["seconds"] for run in runs]
+        results.append(record("import", {"module": module}, {
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "pygame_loaded": any(run["pygame_loaded"] for run in runs),
+        }))
+    return results
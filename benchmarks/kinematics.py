@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import SEED, record, time_call
+from gherkin.model.arm import Arm
+from gherkin.util.utilities import GOAL_SHAPES, generate_random_goal_array
+
+
+def run(quick: bool = False) -> List[Dict[str, Any]]:
+    """
+    Times the scalar and batch kinematics, the cost of the Arm setters as a move gets longer, and
+    the generation of synthetic workloads
+    """
+    num_points = 1_000 if quick else 100_000
+    rng = np.random.RandomState(SEED)
+    radii = rng.uniform(Arm.min_reachable_radius(), Arm.max_reachable_radius(), num_points)
+    angles = rng.uniform(0, 2 * np.pi, num_points)
+    xs, ys = radii * np.cos(angles), radii * np.sin(angles)
+    scalar_points = list(zip(xs[:1_000].tolist(), ys[:1_000].tolist()))
+
+    def scalar_inverse() -> None:
+        for x, y in scalar_points:
+            Arm.inverse(x, y)
+
+    results = []
+    timing = time_call(scalar_inverse, 5)
+    results.append(record("arm.inverse", {"points": len(scalar_points)}, {
+        **timing, "per_call_us": timing["min_s"] / len(scalar_points) * 1e6
+    }))
+    timing = time_call(lambda: Arm.inverse_batch(xs, ys), 5)
+    results.append(record("arm.inverse_batch", {"points": num_points}, {
+        **timing, "per_point_us": timing["min_s"] / num_points * 1e6
+    }))
+    theta_0s, theta_1s, _ = Arm.inverse_batch(xs, ys)
+    timing = time_call(lambda: Arm.forward_batch(theta_0s, theta_1s), 5)
+    results.append(record("arm.forward_batch", {"points": num_points}, {
+        **timing, "per_point_us": timing["min_s"] / num_points * 1e6
+    }))
+
+    for history in ([10, 1_000] if quick else [10, 1_000, 100_000]):
+        results.append(record("arm.setter", {"history": history}, _time_setters(history)))
+
+    num_goals = 10_000 if quick else 1_000_000
+    for shape in GOAL_SHAPES:
+        timing = time_call(lambda: generate_random_goal_array(num_goals, SEED, shape), 3)
+        results.append(record("generate_random_goal_array", {"goals": num_goals, "shape": shape}, {
+            **timing, "per_goal_ns": timing["min_s"] / num_goals * 1e9
+        }))
+    return results
+
+
+def _time_setters(history: int) -> Dict[str, float]:
+    """
+    Times a batch of setter calls on an arm that has already been moving for the given number of
+    ticks
+    """
+    arm = Arm()
+    step = 0.1 * arm.limits.MAX_VELOCITY * arm.limits.DT / history
+    for tick in range(history):
+        arm.theta_0 = tick * step
+    start = history * step
+    calls = 1_000
+
+    def setters() -> None:
+        for tick in range(calls):
+            arm.theta_0 = start
+
+    timing = time_call(setters, 5)
+    return {**timing, "per_call_us": timing["min_s"] / calls * 1e6}
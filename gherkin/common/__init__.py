@@ -1,5 +1,10 @@
 from gherkin.common.angle import Angle
-from gherkin.common.enums import DIRECTION, SPEED
+from gherkin.common.clock import Clock, RealTimeClock, VirtualClock
+from gherkin.common.enums import DIRECTION, ELBOW, SPEED
+from gherkin.common.metrics import Histogram, RobotMetrics
 from gherkin.common.types import Goal, Result, Rotation
 
-__all__ = ["Angle", "DIRECTION", "Goal", "Result", "Rotation", "SPEED"]
+__all__ = [
+    "Angle", "Clock", "DIRECTION", "ELBOW", "Goal", "Histogram", "RealTimeClock", "Result",
+    "RobotMetrics", "Rotation", "SPEED", "VirtualClock"
+]
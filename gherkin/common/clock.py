@@ -0,0 +1,64 @@
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+
+class Clock(ABC):
+    """
+    A source of time for the robots. Every wait and every timestamp in the simulation goes through a
+    clock, so the same code can run against the wall clock or as fast as the CPU allows.
+    """
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """
+
+        Returns: The current time according to this clock
+        """
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """
+        Lets the given amount of time pass on this clock
+        Args:
+            seconds: how long to wait
+
+        Returns:
+
+        """
+
+
+class RealTimeClock(Clock):
+    """
+    A clock that follows the wall clock, for running the robots the way hardware would
+    """
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+@dataclass
+class VirtualClock(Clock):
+    """
+    A simulated clock that advances instantly whenever it is asked to sleep.
+
+    Args:
+        start: the moment the simulated timeline begins
+        elapsed: the number of simulated seconds that have passed since start
+
+    Note:
+        A virtual clock is a single timeline, so it should belong to a single robot. Robots in a
+        fleet should each get their own clock, sharing the same start, so their timelines line up.
+    """
+    start: datetime = field(default_factory=datetime.now)
+    elapsed: float = 0.
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed)
+
+    def sleep(self, seconds: float) -> None:
+        self.elapsed += seconds
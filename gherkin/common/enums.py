@@ -9,3 +9,8 @@ class DIRECTION(Enum):
 class SPEED(Enum):
     FAST = "FAST"
     FINE = "FINE"
+
+
+class ELBOW(Enum):
+    DOWN = "DOWN"
+    UP = "UP"
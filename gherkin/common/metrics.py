@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+# Phases of a goal timed by RobotMetrics. The phases of a reach are measured on the robot's clock,
+# so they are simulated time on a virtual clock, while the overheads are always measured on the wall
+# clock
+PHASES = ("queue_wait", "reach", "rotation", "arm", "visualizer", "limit_check")
+
+
+class Histogram:
+    """
+    A high dynamic range histogram of durations. Values are kept in microseconds, exactly below
+    2 ** sub_bucket_bits and above that in buckets whose width doubles every power of two, so every
+    value is kept to within 2 ** (1 - sub_bucket_bits) of itself while the whole range fits in a few
+    thousand counters.
+    Recording is a couple of integer operations and a list increment. A histogram has a single
+    writer, the thread of the robot it belongs to, so it needs no locks, and readers take a snapshot
+    of the counts.
+
+    Args:
+        sub_bucket_bits: how many bits of precision every value keeps
+        max_bits: values of 2 ** max_bits microseconds or more are clamped into the last bucket
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7, max_bits: int = 40) -> None:
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_bits = max_bits
+        self.counts: List[int] = [0] * self._index((1 << max_bits) - 1) + [0]
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        half = 1 << (self.sub_bucket_bits - 1)
+        return (1 << self.sub_bucket_bits) + (shift - 1) * half + (value >> shift) - half
+
+    def _lowest(self, index: int) -> int:
+        """
+        The smallest value that falls into the bucket at the given index
+        """
+        size = 1 << self.sub_bucket_bits
+        if index < size:
+            return index
+        half = size >> 1
+        shift = (index - size) // half + 1
+        return ((index - size) % half + half) << shift
+
+    def record(self, seconds: float) -> None:
+        """
+        Adds a duration to the histogram
+        Args:
+            seconds: the duration
+
+        Returns:
+
+        """
+        value = min(max(int(seconds * 1e6), 0), (1 << self.max_bits) - 1)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Args:
+            q: the quantile, between 0 and 1
+
+        Returns: The smallest recorded value, in seconds, that at least the given fraction of values
+            do not exceed
+        """
+        if not self.count:
+            return 0.
+        rank = max(int(q * self.count + 0.5), 1)
+        seen = 0
+        for index, count in enumerate(list(self.counts)):
+            seen += count
+            if seen >= rank:
+                return min(self._lowest(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """
+        Adds every value recorded in another histogram with the same precision into this one
+        Returns: this histogram
+        """
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def summary(self) -> Dict[str, float]:
+        """
+
+        Returns: The number of values, and their mean, median, 90th and 99th percentile and maximum
+            in seconds
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count / 1e6 if self.count else 0.,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max / 1e6,
+        }
+
+
+@dataclass
+class RobotMetrics:
+    """
+    Where a robot's goals spend their time: a histogram of durations per entry of PHASES, and a
+    count of the control ticks spent rotating the base and moving the arm. Every robot writes to its
+    own metrics, so nothing is shared between robot threads
+
+    Args:
+        histograms: a histogram per phase
+        rotation_ticks: how many rotation steps the robot has taken
+        arm_ticks: how many arm ticks the robot has taken
+    """
+    histograms: Dict[str, Histogram] = field(
+        default_factory=lambda: {phase: Histogram() for phase in PHASES}
+    )
+    rotation_ticks: int = 0
+    arm_ticks: int = 0
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+
+        Returns: A summary of every phase, plus the tick counts under "ticks"
+        """
+        snapshot = {phase: histogram.summary() for phase, histogram in self.histograms.items()}
+        snapshot["ticks"] = {"rotation": self.rotation_ticks, "arm": self.arm_ticks}
+        return snapshot
+
+
+def summarize(metrics: Iterable[RobotMetrics]) -> Dict[str, Dict[str, float]]:
+    """
+    Merges the metrics of a whole fleet
+    Args:
+        metrics: the metrics of every robot
+
+    Returns: a snapshot of the merged metrics, see RobotMetrics.snapshot
+    """
+    fleet = RobotMetrics()
+    for robot in metrics:
+        for phase, histogram in robot.histograms.items():
+            fleet.histograms[phase].merge(histogram)
+        fleet.rotation_ticks += robot.rotation_ticks
+        fleet.arm_ticks += robot.arm_ticks
+    return fleet.snapshot()
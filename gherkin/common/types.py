@@ -33,3 +33,4 @@ class Result(NamedTuple):
     success: bool
     completed_at: datetime
     error: Optional[Exception]
+    ticks: int = 0
@@ -1,8 +1,11 @@
+import math
 from dataclasses import dataclass, field
-from typing import Tuple, List
+from typing import Dict, Iterable, Optional, Tuple, List
 
 import numpy as np
 
+from gherkin.common import Clock, ELBOW, RealTimeClock
+
 
 @dataclass
 class ArmLimits:
@@ -23,6 +26,70 @@ class ArmLimits:
     def max_acceleration(self, all_theta: List[float]) -> float:
         return float(max(abs(np.diff(np.diff(all_theta)) / self.DT / self.DT), default=0.))
 
+    def move_time(self, distance: float) -> float:
+        """
+        The least time a joint needs to travel the given distance from rest to rest, accelerating
+        and decelerating at MAX_ACCELERATION and cruising at MAX_VELOCITY
+        """
+        distance = abs(distance)
+        if distance >= self.MAX_VELOCITY ** 2 / self.MAX_ACCELERATION:
+            return distance / self.MAX_VELOCITY + self.MAX_VELOCITY / self.MAX_ACCELERATION
+        return 2 * math.sqrt(distance / self.MAX_ACCELERATION)
+
+    def move_times(self, distances: np.ndarray) -> np.ndarray:
+        """
+        The batch form of move_time, for many distances at once
+        """
+        distances = np.abs(distances)
+        return np.where(
+            distances >= self.MAX_VELOCITY ** 2 / self.MAX_ACCELERATION,
+            distances / self.MAX_VELOCITY + self.MAX_VELOCITY / self.MAX_ACCELERATION,
+            2 * np.sqrt(distances / self.MAX_ACCELERATION)
+        )
+
+
+@dataclass
+class JointLimitChecker:
+    """
+    A class responsible for tracking the velocity and acceleration of a single joint as its values
+    stream in. Only the last two samples are kept, so every update costs the same regardless of how
+    long the move runs.
+
+    Args:
+        DT: The length of a cycle between two samples
+        max_velocity: the largest velocity seen since the last reset
+        max_acceleration: the largest acceleration seen since the last reset
+    """
+    DT: float = ArmLimits.DT
+    max_velocity: float = 0.
+    max_acceleration: float = 0.
+    _last_theta: Optional[float] = None
+    _last_delta: Optional[float] = None
+
+    def update(self, theta: float) -> None:
+        """
+        Records a new joint value, folding its velocity and acceleration into the running maximums
+        Args:
+            theta: the newly commanded joint value
+
+        Returns:
+
+        """
+        if self._last_theta is not None:
+            delta = theta - self._last_theta
+            self.max_velocity = max(self.max_velocity, abs(delta) / self.DT)
+            if self._last_delta is not None:
+                acceleration = abs(delta - self._last_delta) / self.DT / self.DT
+                self.max_acceleration = max(self.max_acceleration, acceleration)
+            self._last_delta = delta
+        self._last_theta = theta
+
+    def reset(self) -> None:
+        self.max_velocity = 0.
+        self.max_acceleration = 0.
+        self._last_theta = None
+        self._last_delta = None
+
 
 @dataclass()
 class Arm:
@@ -30,9 +97,14 @@ class Arm:
     _theta_1: float = 0  # radians
     link_1: float = 75.  # pixels
     link_2: float = 50.  # pixels
-    all_theta_0: List[float] = field(default_factory=list)
-    all_theta_1: List[float] = field(default_factory=list)
     limits: ArmLimits = field(default_factory=ArmLimits)
+    clock: Clock = field(default_factory=RealTimeClock)
+    joint_0_checker: JointLimitChecker = field(init=False)
+    joint_1_checker: JointLimitChecker = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.joint_0_checker = JointLimitChecker(self.limits.DT)
+        self.joint_1_checker = JointLimitChecker(self.limits.DT)
 
     @property
     def theta_0(self) -> float:
@@ -40,15 +112,15 @@ class Arm:
 
     @theta_0.setter
     def theta_0(self, value: float) -> None:
-        self.all_theta_0.append(value)
+        self.joint_0_checker.update(value)
         self._theta_0 = value
         # Check limits
         assert self.limits.check_angle_limits(value), \
             f'Joint 0 value {value} exceeds joint limits'
-        assert self.limits.max_velocity(self.all_theta_0) < self.limits.MAX_VELOCITY, \
-            f'Joint 0 Velocity {self.limits.max_velocity(self.all_theta_0)} exceeds velocity limit'
-        assert self.limits.max_acceleration(self.all_theta_0) < self.limits.MAX_ACCELERATION, \
-            f'Joint 0 Accel {self.limits.max_acceleration(self.all_theta_0)} exceeds acceleration limit'
+        assert self.joint_0_checker.max_velocity < self.limits.MAX_VELOCITY, \
+            f'Joint 0 Velocity {self.joint_0_checker.max_velocity} exceeds velocity limit'
+        assert self.joint_0_checker.max_acceleration < self.limits.MAX_ACCELERATION, \
+            f'Joint 0 Accel {self.joint_0_checker.max_acceleration} exceeds acceleration limit'
 
     @property
     def theta_1(self) -> float:
@@ -56,20 +128,20 @@ class Arm:
 
     @theta_1.setter
     def theta_1(self, value: float) -> None:
-        self.all_theta_1.append(value)
+        self.joint_1_checker.update(value)
         self._theta_1 = value
         assert self.limits.check_angle_limits(value), \
             f'Joint 1 value {value} exceeds joint limits'
-        assert self.limits.max_velocity(self.all_theta_1) < self.limits.MAX_VELOCITY, \
-            f'Joint 1 Velocity {self.limits.max_velocity(self.all_theta_1)} exceeds velocity limit'
-        assert self.limits.max_acceleration(self.all_theta_1) < self.limits.MAX_ACCELERATION, \
-            f'Joint 1 Accel {self.limits.max_acceleration(self.all_theta_1)} exceeds acceleration limit'
+        assert self.joint_1_checker.max_velocity < self.limits.MAX_VELOCITY, \
+            f'Joint 1 Velocity {self.joint_1_checker.max_velocity} exceeds velocity limit'
+        assert self.joint_1_checker.max_acceleration < self.limits.MAX_ACCELERATION, \
+            f'Joint 1 Accel {self.joint_1_checker.max_acceleration} exceeds acceleration limit'
 
     def joint_1_pos(self) -> Tuple[float, float]:
         """
         Compute the x, y position of joint 1
         """
-        return self.link_1 * np.cos(self.theta_0), self.link_1 * np.sin(self.theta_0)
+        return self.link_1 * math.cos(self.theta_0), self.link_1 * math.sin(self.theta_0)
 
     def joint_2_pos(self) -> Tuple[float, float]:
         """
@@ -77,33 +149,126 @@ class Arm:
         """
         return self.forward(self.theta_0, self.theta_1)
 
+    def wait(self) -> None:
+        """
+        Waits out a single control cycle on the arm's clock
+        """
+        self.clock.sleep(self.limits.DT)
+
     def reset(self):
-        self.all_theta_0 = []
-        self.all_theta_1 = []
+        self.joint_0_checker.reset()
+        self.joint_1_checker.reset()
 
     @classmethod
     def forward(cls, theta_0: float, theta_1: float) -> Tuple[float, float]:
         """
         Compute the x, y position of the end of the links from the joint angles
         """
-        x = cls.link_1 * np.cos(theta_0) + cls.link_2 * np.cos(theta_0 + theta_1)
-        y = cls.link_1 * np.sin(theta_0) + cls.link_2 * np.sin(theta_0 + theta_1)
+        x = cls.link_1 * math.cos(theta_0) + cls.link_2 * math.cos(theta_0 + theta_1)
+        y = cls.link_1 * math.sin(theta_0) + cls.link_2 * math.sin(theta_0 + theta_1)
 
         return x, y
 
     @classmethod
-    def inverse(cls, x: float, y: float) -> Tuple[float, float]:
+    def inverse(cls, x: float, y: float, elbow: ELBOW = ELBOW.DOWN) -> Tuple[float, float]:
         """
-        Compute the joint angles from the position of the end of the links
+        Compute the joint angles from the position of the end of the links, with the elbow in the
+        given configuration
+
+        Raises:
+            ValueError: if the position is outside of the arm's reachable workspace
         """
-        theta_1 = np.arccos((x ** 2 + y ** 2 - cls.link_1 ** 2 - cls.link_2 ** 2)
+        theta_1 = math.acos((x ** 2 + y ** 2 - cls.link_1 ** 2 - cls.link_2 ** 2)
                             / (2 * cls.link_1 * cls.link_2))
-        theta_0 = np.arctan2(y, x) - \
-            np.arctan((cls.link_2 * np.sin(theta_1)) /
-                      (cls.link_1 + cls.link_2 * np.cos(theta_1)))
+        if elbow == ELBOW.UP:
+            theta_1 = -theta_1
+        theta_0 = math.atan2(y, x) - \
+            math.atan((cls.link_2 * math.sin(theta_1)) /
+                      (cls.link_1 + cls.link_2 * math.cos(theta_1)))
 
         return theta_0, theta_1
 
+    @classmethod
+    def inverse_solutions(cls, x: float, y: float) -> Dict[ELBOW, Tuple[float, float]]:
+        """
+        Compute the joint angles of both elbow configurations that put the end of the links at the
+        given position
+
+        Raises:
+            ValueError: if the position is outside of the arm's reachable workspace
+        """
+        return {elbow: cls.inverse(x, y, elbow) for elbow in ELBOW}
+
+    def fastest_inverse(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        Compute the joint angles the arm can move to soonest from its current pose to put the end of
+        the links at the given position, see select_solution
+
+        Raises:
+            ValueError: if the position is outside of the arm's reachable workspace
+        """
+        return select_solution(
+            self.inverse_solutions(x, y).values(), self.theta_0, self.theta_1, self.limits
+        )
+
+    @classmethod
+    def forward_batch(
+            cls,
+            theta_0s: np.ndarray,
+            theta_1s: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the x, y positions of the end of the links for many pairs of joint angles at once
+        Args:
+            theta_0s: the angles of joint 0
+            theta_1s: the angles of joint 1, matching theta_0s element for element
+
+        Returns: the x and y positions as arrays
+        """
+        theta_0s = np.asarray(theta_0s, dtype=float)
+        theta_1s = np.asarray(theta_1s, dtype=float)
+        xs = cls.link_1 * np.cos(theta_0s) + cls.link_2 * np.cos(theta_0s + theta_1s)
+        ys = cls.link_1 * np.sin(theta_0s) + cls.link_2 * np.sin(theta_0s + theta_1s)
+
+        return xs, ys
+
+    @classmethod
+    def inverse_batch(
+            cls,
+            xs: np.ndarray,
+            ys: np.ndarray,
+            elbow: ELBOW = ELBOW.DOWN,
+            link_1: Optional[float] = None,
+            link_2: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the joint angles for many end positions at once, with the elbow in the given
+        configuration
+        Args:
+            xs: the x positions of the end of the links
+            ys: the y positions of the end of the links, matching xs element for element
+            elbow: which of the two solutions to compute
+            link_1: the length of the first link, the arm's by default
+            link_2: the length of the second link, the arm's by default
+
+        Returns: the angles of joint 0, the angles of joint 1 and a mask of which positions are
+            reachable. Unreachable positions get angles of 0 rather than NaN.
+        """
+        link_1 = cls.link_1 if link_1 is None else link_1
+        link_2 = cls.link_2 if link_2 is None else link_2
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        cos_theta_1 = (xs ** 2 + ys ** 2 - link_1 ** 2 - link_2 ** 2) / (2 * link_1 * link_2)
+        valid = np.abs(cos_theta_1) <= 1.
+        theta_1s = np.arccos(np.where(valid, cos_theta_1, 1.))
+        if elbow == ELBOW.UP:
+            theta_1s = -theta_1s
+        theta_0s = np.arctan2(ys, xs) - \
+            np.arctan((link_2 * np.sin(theta_1s)) /
+                      (link_1 + link_2 * np.cos(theta_1s)))
+
+        return np.where(valid, theta_0s, 0.), theta_1s, valid
+
     @classmethod
     def min_reachable_radius(cls) -> float:
         return max(cls.link_1 - cls.link_2, 0)
@@ -113,3 +278,98 @@ class Arm:
         return cls.link_1 + cls.link_2
 
 
+def wrap_to_limits(theta: float, current: float, limits: ArmLimits) -> float:
+    """
+    Chooses the turn of a joint angle that is closest to the joint's current angle, among those
+    equivalent to it within the joint limits
+    Args:
+        theta: the angle the joint should reach
+        current: the angle the joint is at
+        limits: the physical limits of the arm
+
+    Returns: theta, plus or minus a full turn if that is closer and within the joint limits
+    """
+    turns = (theta - 2 * math.pi, theta, theta + 2 * math.pi)
+    candidates = [turn for turn in turns if limits.check_angle_limits(turn)]
+    return min(candidates or [theta], key=lambda turn: abs(turn - current))
+
+
+def select_solution(
+        solutions: Iterable[Tuple[float, float]],
+        theta_0: float,
+        theta_1: float,
+        limits: ArmLimits
+) -> Tuple[float, float]:
+    """
+    Picks the inverse kinematics solution an arm can reach soonest from its current pose. Each
+    solution is first wrapped to the turn of each joint closest to the current pose, then the one
+    whose slower joint has the shortest move time under the arm's velocity and acceleration limits
+    wins
+    Args:
+        solutions: the candidate pairs of joint angles, such as both elbow configurations from
+            inverse_solutions
+        theta_0: the current angle of joint 0
+        theta_1: the current angle of joint 1
+        limits: the physical limits of the arm
+
+    Returns: the angles of joint 0 and joint 1 to move to
+    """
+    wrapped = [
+        (
+            wrap_to_limits(goal_theta_0, theta_0, limits),
+            wrap_to_limits(goal_theta_1, theta_1, limits)
+        )
+        for goal_theta_0, goal_theta_1 in solutions
+    ]
+    return min(
+        wrapped,
+        key=lambda solution: max(
+            limits.move_time(solution[0] - theta_0), limits.move_time(solution[1] - theta_1)
+        )
+    )
+
+
+def select_solution_batch(
+        xs: np.ndarray,
+        ys: np.ndarray,
+        theta_0: float,
+        theta_1: float,
+        limits: ArmLimits
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The batch form of select_solution over both elbow configurations of many positions at once, for
+    an arm starting from the same pose. Matches Arm.fastest_inverse position for position
+    Args:
+        xs: the x positions of the end of the links
+        ys: the y positions of the end of the links, matching xs element for element
+        theta_0: the current angle of joint 0
+        theta_1: the current angle of joint 1
+        limits: the physical limits of the arm
+
+    Returns: the angles of joint 0 and joint 1 to move to. Unreachable positions get the elbow down
+        angles of Arm.inverse_batch
+    """
+    solutions = []
+    for elbow in ELBOW:
+        theta_0s, theta_1s, _ = Arm.inverse_batch(xs, ys, elbow)
+        theta_0s = _wrap_batch(theta_0s, theta_0, limits)
+        theta_1s = _wrap_batch(theta_1s, theta_1, limits)
+        times = np.maximum(
+            limits.move_times(theta_0s - theta_0), limits.move_times(theta_1s - theta_1)
+        )
+        solutions.append((theta_0s, theta_1s, times))
+    (down_0, down_1, down_time), (up_0, up_1, up_time) = solutions
+    # Ties keep elbow down, the first solution, as min does in select_solution
+    faster = up_time < down_time
+    return np.where(faster, up_0, down_0), np.where(faster, up_1, down_1)
+
+
+def _wrap_batch(thetas: np.ndarray, current: float, limits: ArmLimits) -> np.ndarray:
+    """
+    The batch form of wrap_to_limits
+    """
+    candidates = np.stack((thetas - 2 * math.pi, thetas, thetas + 2 * math.pi))
+    within = (candidates > limits.JOINT_LIMITS[0]) & (candidates < limits.JOINT_LIMITS[1])
+    closest = np.argmin(np.where(within, np.abs(candidates - current), np.inf), axis=0)
+    wrapped = np.take_along_axis(candidates, closest[np.newaxis], axis=0)[0]
+    return np.where(within.any(axis=0), wrapped, thetas)
@@ -0,0 +1,284 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from gherkin.common import Angle, Goal
+from gherkin.model.arm import Arm, ArmLimits, select_solution, select_solution_batch
+from gherkin.model.base import RotationLimits, plan_rotation
+from gherkin.model.robot import evaluate_goal, facing_angle
+from gherkin.model.workspace import workspace_table
+
+# Rough cost of every goal already waiting in a robot's queue, in seconds. Covers a typical
+# rotation, the arm converging on the goal and the settle time at the end of a reach.
+GOAL_TIME_ESTIMATE: float = 3.5
+# Above this many cells in the cost matrix the batch is assigned greedily instead of optimally
+MAX_OPTIMAL_CELLS: int = 100_000
+
+
+@dataclass
+class RobotState:
+    """
+    What the fleet manager expects a robot to look like once it has worked through its current queue
+
+    Args:
+        robot_id: the id of the robot
+        angle: the angle the base will be facing
+        theta_0: the angle joint 0 will be at
+        theta_1: the angle joint 1 will be at
+        queued: the number of goals the robot still has to work through
+        backlog: the estimated time, in seconds, the robot needs to work through them. When None,
+            every queued goal counts as GOAL_TIME_ESTIMATE
+    """
+    robot_id: str
+    angle: Angle = Angle(0)
+    theta_0: float = 0.
+    theta_1: float = 0.
+    queued: int = 0
+    backlog: Optional[float] = None
+
+    @property
+    def busy_for(self) -> float:
+        """
+
+        Returns: How long until the robot can start on a new goal, in seconds
+        """
+        return self.queued * GOAL_TIME_ESTIMATE if self.backlog is None else self.backlog
+
+
+def estimate_rotation_time(start: Angle, target: Angle, limits: RotationLimits) -> float:
+    """
+    Works out how long the base takes to face the target, or the inverse a robot at the start angle
+    would choose instead, from the rotation plan. travel_costs applies the same estimate to whole
+    batches at once
+    Args:
+        start: the current angle of the base
+        target: the angle of the goal
+        limits: the physical limits of the base
+
+    Returns: the estimated rotation time in seconds
+    """
+    return plan_rotation(start, facing_angle(target, start), limits).duration
+
+
+def travel_costs(
+        states: List[RobotState],
+        goals: List[Goal],
+        rotation_limits: RotationLimits,
+        arm_limits: ArmLimits
+) -> np.ndarray:
+    """
+    Estimates the time each robot needs to move from where it will be to each of the goals
+    Args:
+        states: the expected states of the robots
+        goals: the goals to be assigned
+        rotation_limits: the physical limits of the robots' bases
+        arm_limits: the physical limits of the robots' arms
+
+    Returns: a (goals x robots) matrix of estimated travel times in seconds
+    """
+    xs = np.fromiter((goal.x for goal in goals), dtype=float, count=len(goals))
+    ys = np.fromiter((goal.y for goal in goals), dtype=float, count=len(goals))
+    goal_angles = np.fromiter(
+        (goal.angle.angle for goal in goals), dtype=np.int64, count=len(goals)
+    )
+    costs = np.empty((len(goals), len(states)))
+    for column, state in enumerate(states):
+        # The same choice of facing as facing_angle, and the same closed form as plan_rotation
+        base = state.angle.angle
+        keep = ((base + 90) % 360 > goal_angles) | ((base - 90) % 360 < goal_angles)
+        facing = np.where(keep, goal_angles, (goal_angles - 180) % 360)
+        diff = np.abs(base - facing) % 360
+        fast_steps, fine_steps = np.divmod(
+            np.minimum(diff, 360 - diff) % 180, rotation_limits.FAST_ROTATION_SPEED
+        )
+        rotation_steps = fast_steps + np.ceil(fine_steps / rotation_limits.FINE_ROTATION_SPEED)
+        # The joint angles the robot's arm will choose, see evaluate_goal and Arm.fastest_inverse
+        theta_0s, theta_1s = select_solution_batch(
+            np.where(facing > 180, -xs, xs), ys, state.theta_0, state.theta_1, arm_limits
+        )
+        arm_travel = np.maximum(
+            arm_limits.move_times(theta_0s - state.theta_0),
+            arm_limits.move_times(theta_1s - state.theta_1)
+        )
+        costs[:, column] = arm_travel + rotation_steps * rotation_limits.DT
+    return costs
+
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Solves the rectangular assignment problem with the Hungarian algorithm, in O(rows^2 * columns)
+    Args:
+        cost: a (rows x columns) cost matrix, with no more rows than columns
+
+    Returns: the column assigned to each row, minimizing the total cost
+    """
+    rows, columns = cost.shape
+    if rows > columns:
+        raise ValueError(f"Expected no more rows than columns, but got {rows} x {columns}")
+    # Potentials and matching are 1-indexed, with index 0 as the virtual starting column
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    matched_row = np.zeros(columns + 1, dtype=int)
+    way = np.zeros(columns + 1, dtype=int)
+    for row in range(1, rows + 1):
+        matched_row[0] = row
+        column = 0
+        min_slack = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while matched_row[column] != 0:
+            used[column] = True
+            current_row = matched_row[column]
+            slack = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            improved = free & (slack < min_slack[1:])
+            min_slack[1:][improved] = slack[improved]
+            way[1:][improved] = column
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[matched_row[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            column = next_column
+        while column:
+            previous = way[column]
+            matched_row[column] = matched_row[previous]
+            column = previous
+
+    assignment = np.empty(rows, dtype=int)
+    for column in range(1, columns + 1):
+        if matched_row[column]:
+            assignment[matched_row[column] - 1] = column - 1
+    return assignment
+
+
+def assign_goals(
+        states: List[RobotState],
+        goals: List[Goal],
+        rotation_limits: Optional[RotationLimits] = None,
+        arm_limits: Optional[ArmLimits] = None,
+        max_optimal_cells: int = MAX_OPTIMAL_CELLS
+) -> List[str]:
+    """
+    Assigns a batch of goals to the robots of a fleet, minimizing the total time until every goal is
+    completed. Each robot gets one column per goal it could take on, and every extra goal in a
+    robot's queue costs another GOAL_TIME_ESTIMATE of waiting on top of the robot's backlog, so the
+    solver trades travel time against load balancing.
+    Batches too large to solve optimally fall back to a greedy assignment.
+    Args:
+        states: the expected states of the robots
+        goals: the goals to be assigned
+        rotation_limits: the physical limits of the robots' bases. Defaults to RotationLimits()
+        arm_limits: the physical limits of the robots' arms. Defaults to ArmLimits()
+        max_optimal_cells: the largest cost matrix that will be solved optimally
+
+    Returns: the id of the robot assigned to each goal
+    """
+    if not goals:
+        return []
+    travel = travel_costs(
+        states, goals, rotation_limits or RotationLimits(), arm_limits or ArmLimits()
+    )
+    if len(goals) * len(goals) * len(states) > max_optimal_cells:
+        return _assign_greedy(states, goals, travel)
+
+    slots = np.arange(len(goals))
+    busy_for = np.array([state.busy_for for state in states])
+    # Column (robot * len(goals) + slot) is the slot-th extra goal in that robot's queue
+    waiting = (busy_for[:, np.newaxis] + slots[np.newaxis, :] * GOAL_TIME_ESTIMATE).reshape(-1)
+    cost = np.repeat(travel, len(goals), axis=1) + waiting[np.newaxis, :]
+    columns = solve_assignment(cost)
+    return [states[column // len(goals)].robot_id for column in columns]
+
+
+def _assign_greedy(states: List[RobotState], goals: List[Goal], travel: np.ndarray) -> List[str]:
+    """
+    Assigns each goal in turn to the robot that would finish it soonest, counting the work it has
+    already been given
+    Args:
+        states: the expected states of the robots
+        goals: the goals to be assigned
+        travel: a (goals x robots) matrix of estimated travel times
+
+    Returns: the id of the robot assigned to each goal
+    """
+    busy_for = np.array([state.busy_for for state in states], dtype=float)
+    assignment: List[str] = []
+    for row in range(len(goals)):
+        column = int(np.argmin(travel[row] + busy_for))
+        busy_for[column] += GOAL_TIME_ESTIMATE
+        assignment.append(states[column].robot_id)
+    return assignment
+
+
+def expected_pose(
+        goal: Goal,
+        start: Optional[RobotState] = None,
+        arm_limits: Optional[ArmLimits] = None
+) -> Tuple[Angle, float, float]:
+    """
+    The pose a robot is expected to end in after reaching the goal. Follows the robot's own choices:
+    the facing of evaluate_goal, and the elbow configuration and turn of each joint of
+    Arm.fastest_inverse
+    Args:
+        goal: the goal being reached
+        start: the pose the robot starts from. Defaults to the rest pose
+        arm_limits: the physical limits of the robot's arm. Defaults to ArmLimits()
+
+    Returns: the angle of the base and of both joints. A robot that cannot reach the goal stays
+        where it started
+    """
+    start = start or RobotState("")
+    arm_limits = arm_limits or ArmLimits()
+    goal = evaluate_goal(goal, start.angle)
+    try:
+        theta_0, theta_1 = select_solution(
+            Arm.inverse_solutions(goal.x, goal.y).values(), start.theta_0, start.theta_1, arm_limits
+        )
+    except ValueError:
+        return start.angle, start.theta_0, start.theta_1
+    return goal.angle, theta_0, theta_1
+
+
+def reachable_mask(goals: List[Goal], use_workspace_table: bool = False) -> np.ndarray:
+    """
+    Solves the inverse kinematics for a whole batch at once, so goals no arm can reach are rejected
+    up front instead of being discovered by a robot after it has been dispatched
+    Args:
+        goals: the goals received by the fleet
+        use_workspace_table: whether goals are validated against the precomputed workspace table
+
+    Returns: whether each goal is within the arm's reachable workspace
+    """
+    if not goals:
+        return np.zeros(0, dtype=bool)
+    xs = np.fromiter((goal.x for goal in goals), dtype=float, count=len(goals))
+    ys = np.fromiter((goal.y for goal in goals), dtype=float, count=len(goals))
+    if use_workspace_table:
+        return workspace_table(Arm.link_1, Arm.link_2).reachable_batch(xs, ys)
+    _, _, valid = Arm.inverse_batch(xs, ys)
+    return valid
+
+
+def pending_state(
+        robot_id: str,
+        last_goal: Optional[Goal],
+        queued: int,
+        backlog: Optional[float] = None
+) -> RobotState:
+    """
+    Builds the state a robot is expected to be in once it finishes the goals it has already been
+    given
+    Args:
+        robot_id: the id of the robot
+        last_goal: the last goal the robot was given, or None if it has never had any
+        queued: the number of goals the robot still has to work through
+        backlog: the estimated time the robot needs to work through them, see RobotState
+
+    Returns: the expected state of the robot
+    """
+    state = RobotState(robot_id, queued=queued, backlog=backlog)
+    if last_goal is not None:
+        state.angle, state.theta_0, state.theta_1 = expected_pose(last_goal)
+    return state
@@ -0,0 +1,379 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from gherkin.common import Goal, Result
+from gherkin.model.engine import FleetEngine
+from gherkin.model.fleet_manager import FleetManager
+
+# The positions in a batch of the goals a back end queued for each robot, in the order the robot
+# will work through them, and the positions of the goals it rejected. Positions rather than goals,
+# since a goal may be submitted twice
+Dispatched = Tuple[Dict[str, List[int]], List[int]]
+# A submitted goal, and the future its result is delivered to
+Submission = Tuple[Goal, "asyncio.Future[Result]"]
+
+
+class FleetBackend(ABC):
+    """
+    Whatever actually reaches the goals submitted to an AsyncFleetManager. Every robot of a back end
+    must work through the goals queued for it in order, since that is how results are matched back
+    to their submissions
+    """
+
+    @abstractmethod
+    def start(self, on_result: Callable[[Result], None]) -> None:
+        """
+        Starts the back end
+        Args:
+            on_result: where to hand every result, from any thread, as soon as it is known
+
+        Returns:
+
+        """
+
+    @abstractmethod
+    def dispatch(self, goals: List[Goal]) -> Dispatched:
+        """
+        Queues a batch of goals. Called from a worker thread, never from the event loop. Either
+        every goal of the batch is queued or, if it raises, none of them is, since results are
+        matched back to their submissions by the order each robot finishes its goals in
+        Args:
+            goals: the goals to be reached
+
+        Returns: the positions in goals of the goals queued for each robot, in the order it will
+            reach them, and the positions of the goals that were rejected
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """
+        Stops the back end, abandoning any goals it still holds
+        """
+
+
+class ActorBackend(FleetBackend):
+    """
+    Reaches goals with the actor based fleet of a FleetManager
+
+    Args:
+        manager: the fleet manager, which must not use work stealing, since stolen goals finish out
+            of order
+    """
+
+    def __init__(self, manager: FleetManager) -> None:
+        if manager.work_stealing:
+            raise ValueError(
+                "ActorBackend needs every robot to finish its goals in order, so no work stealing"
+            )
+        self.manager = manager
+
+    def start(self, on_result: Callable[[Result], None]) -> None:
+        self.manager.on_result = on_result
+
+    def dispatch(self, goals: List[Goal]) -> Dispatched:
+        manager = self.manager
+        queued = manager.dispatch_goals(goals)
+        dispatched = {position for positions in queued.values() for position in positions}
+        rejected = [position for position in range(len(goals)) if position not in dispatched]
+        # A long lived fleet would otherwise keep every goal it was ever given. Only the last goal
+        # of each robot is needed, to predict where it will be
+        for robot_id, robot_goals in manager.robot_goals.items():
+            manager.robot_goals[robot_id] = robot_goals[-1:]
+        manager.rejected.clear()
+        return queued, rejected
+
+    def stop(self) -> None:
+        # Robots still hand over the result of the goal they are working on, which nobody is waiting
+        # for any more
+        self.manager.on_result = None
+        self.manager.cancel()
+        for robot in self.manager.robots:
+            robot.actor_ref.stop()
+        if self.manager.visualizer:
+            self.manager.visualizer.cleanup()
+
+
+class EngineBackend(FleetBackend):
+    """
+    Reaches goals with a lock-step FleetEngine, stepped on a background thread whenever it has work
+
+    Args:
+        engine: the engine
+    """
+
+    def __init__(self, engine: FleetEngine) -> None:
+        self.engine = engine
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_result: Callable[[Result], None]) -> None:
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._step_loop, args=(on_result,), name="fleet-engine", daemon=True
+        )
+        self._thread.start()
+
+    def dispatch(self, goals: List[Goal]) -> Dispatched:
+        with self._condition:
+            assignment = self.engine.receive_goals(goals)
+            self._condition.notify()
+        queued: Dict[str, List[int]] = defaultdict(list)
+        for position, robot_id in enumerate(assignment):
+            queued[robot_id].append(position)
+        return queued, []
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+
+    def _step_loop(self, on_result: Callable[[Result], None]) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self.engine.busy:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                results = self.engine.step()
+            for result in results:
+                on_result(result)
+
+
+@dataclass
+class _Session:
+    """
+    Everything an AsyncFleetManager creates on the event loop it is started on
+
+    Args:
+        loop: the event loop goals are submitted on
+        intake: the bounded queue of submitted goals waiting for the back end
+        capacity: notified whenever goals leave the back end
+        batcher: the task collecting submitted goals into batches
+    """
+    loop: asyncio.AbstractEventLoop
+    intake: "asyncio.Queue[Submission]"
+    capacity: asyncio.Condition
+    batcher: "asyncio.Task[None]"
+
+
+class AsyncFleetManager:
+    """
+    An asyncio front end for a fleet that is fed goals continuously. Each goal is submitted on its
+    own and awaited for its result, while goals are collected into batches behind the scenes so the
+    back end still assigns and sequences them together.
+
+    Submitted goals wait in a bounded intake queue, and at most max_in_flight goals are handed to
+    the back end at a time. Once every robot is saturated the intake fills up and submit waits for
+    room, so a producer that outpaces the fleet is slowed down instead of piling up an unbounded
+    backlog. Assignment runs on a worker thread and results come back through call_soon_threadsafe,
+    so the event loop never blocks on the fleet.
+
+    Args:
+        backend: what reaches the goals, see ActorBackend and EngineBackend
+        intake_size: how many submitted goals may wait for the back end before submit waits
+        max_in_flight: how many goals the back end may hold at a time
+        batch_size: the most goals handed to the back end at once
+        batch_window: how long to wait for more goals, in seconds, before dispatching a batch
+            smaller than batch_size
+    """
+
+    def __init__(
+            self,
+            backend: FleetBackend,
+            intake_size: int = 256,
+            max_in_flight: int = 64,
+            batch_size: int = 32,
+            batch_window: float = 0.005
+    ) -> None:
+        self.backend = backend
+        self.intake_size = intake_size
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._session: Optional[_Session] = None
+        self._in_flight = 0
+        self._pending: Dict[str, Deque["asyncio.Future[Result]"]] = defaultdict(deque)
+        self._finished: Dict[str, Deque[Result]] = defaultdict(deque)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fleet-dispatch")
+        self._closed = False
+
+    async def start(self) -> None:
+        """
+        Starts the back end and the batching of submitted goals. Must be awaited on the loop that
+        submits goals
+        """
+        loop = asyncio.get_running_loop()
+        self._session = _Session(
+            loop, asyncio.Queue(maxsize=self.intake_size), asyncio.Condition(),
+            loop.create_task(self._batch_loop())
+        )
+        self.backend.start(self._on_result)
+
+    @property
+    def _running(self) -> _Session:
+        """
+        Raises:
+            RuntimeError: if the fleet manager has not been started
+
+        Returns: The session created by start
+        """
+        if self._session is None:
+            raise RuntimeError("The fleet manager has not been started")
+        return self._session
+
+    async def submit(self, goal: Goal) -> Result:
+        """
+        Submits a goal, waiting for room in the intake queue if the fleet is saturated
+        Args:
+            goal: the goal to be reached
+
+        Raises:
+            RuntimeError: if the fleet manager is not running
+
+        Returns: the result of the goal, once a robot has finished it
+        """
+        if self._closed or self._session is None:
+            raise RuntimeError("The fleet manager is not accepting goals")
+        session = self._session
+        future: "asyncio.Future[Result]" = session.loop.create_future()
+        await session.intake.put((goal, future))
+        if session.batcher.done():
+            # The fleet shut down without draining while this goal waited for room in the intake
+            future.cancel()
+        return await future
+
+    async def drain(self) -> None:
+        """
+        Waits until every goal submitted so far has a result
+        """
+        session = self._running
+        await session.intake.join()
+        async with session.capacity:
+            await session.capacity.wait_for(lambda: self._in_flight == 0)
+
+    async def shutdown(self, drain: bool = True) -> None:
+        """
+        Stops accepting goals and stops the back end
+        Args:
+            drain: whether to wait for every submitted goal to finish first. Otherwise goals without
+                a result are cancelled
+
+        Returns:
+
+        """
+        session = self._running
+        self._closed = True
+        if drain:
+            await self.drain()
+        session.batcher.cancel()
+        try:
+            await session.batcher
+        except asyncio.CancelledError:
+            pass
+        while not session.intake.empty():
+            _, future = session.intake.get_nowait()
+            future.cancel()
+        for futures in self._pending.values():
+            for future in futures:
+                future.cancel()
+        await session.loop.run_in_executor(self._executor, self.backend.stop)
+        self._executor.shutdown()
+
+    async def __aenter__(self) -> "AsyncFleetManager":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.shutdown()
+
+    async def _batch_loop(self) -> None:
+        session = self._running
+        while True:
+            async with session.capacity:
+                await session.capacity.wait_for(lambda: self._in_flight < self.max_in_flight)
+            room = min(self.batch_size, self.max_in_flight - self._in_flight)
+            batch = [await session.intake.get()]
+            self._take_waiting(batch, room)
+            if len(batch) < room and self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+                self._take_waiting(batch, room)
+            await self._dispatch(batch)
+
+    def _take_waiting(self, batch: List[Submission], room: int) -> None:
+        intake = self._running.intake
+        while len(batch) < room and not intake.empty():
+            batch.append(intake.get_nowait())
+
+    async def _dispatch(self, batch: List[Submission]) -> None:
+        """
+        Hands a batch over to the back end, and lines its futures up behind the robots that will
+        reach the goals
+        """
+        session = self._running
+        self._in_flight += len(batch)
+        try:
+            queued, rejected = await session.loop.run_in_executor(
+                self._executor, self.backend.dispatch, [goal for goal, _ in batch]
+            )
+        except Exception as e:
+            queued, rejected = {}, []
+            for _, future in batch:
+                self._settle(future, exception=e)
+        for _ in batch:
+            session.intake.task_done()
+        for position in rejected:
+            goal, future = batch[position]
+            error = ValueError(f"Goal {goal} is outside of every arm's reachable workspace")
+            self._settle(future, Result("", goal, False, datetime.now(), error))
+        for robot_id, positions in queued.items():
+            self._pending[robot_id].extend(batch[position][1] for position in positions)
+            self._match(robot_id)
+        await self._notify_capacity()
+
+    def _on_result(self, result: Result) -> None:
+        """
+        Called from the back end's threads
+        """
+        self._running.loop.call_soon_threadsafe(self._receive, result)
+
+    def _receive(self, result: Result) -> None:
+        self._finished[result.robot_id].append(result)
+        self._match(result.robot_id)
+        self._running.loop.create_task(self._notify_capacity())
+
+    def _match(self, robot_id: str) -> None:
+        """
+        Pairs a robot's results with its submissions in order. Results can arrive before the
+        dispatch of their batch has returned, so whichever side is ahead waits for the other
+        """
+        pending, finished = self._pending[robot_id], self._finished[robot_id]
+        while pending and finished:
+            self._settle(pending.popleft(), finished.popleft())
+
+    def _settle(
+            self,
+            future: "asyncio.Future[Result]",
+            result: Optional[Result] = None,
+            exception: Optional[Exception] = None
+    ) -> None:
+        self._in_flight -= 1
+        if future.done():
+            return
+        if result is not None:
+            future.set_result(result)
+        elif exception is not None:
+            future.set_exception(exception)
+
+    async def _notify_capacity(self) -> None:
+        capacity = self._running.capacity
+        async with capacity:
+            capacity.notify_all()
@@ -1,6 +1,8 @@
+import math
 from dataclasses import dataclass, field
+from typing import Callable, NamedTuple, Optional
 
-from gherkin.common import Angle, DIRECTION, Rotation, SPEED
+from gherkin.common import Angle, Clock, DIRECTION, RealTimeClock, Rotation, SPEED, VirtualClock
 
 
 @dataclass
@@ -18,6 +20,49 @@ class RotationLimits:
     DT: float = 0.066
 
 
+class RotationPlan(NamedTuple):
+    """
+    Every step a base takes to turn from one angle to another, worked out up front
+
+    Args:
+        direction: the direction the base turns in
+        fast_steps: how many FAST steps it takes first
+        fine_steps: how many FINE steps it takes after those
+        duration: how long the whole rotation takes, in seconds
+    """
+    direction: DIRECTION
+    fast_steps: int
+    fine_steps: int
+    duration: float
+
+    @property
+    def steps(self) -> int:
+        return self.fast_steps + self.fine_steps
+
+
+def plan_rotation(start: Angle, target: Angle, limits: RotationLimits) -> RotationPlan:
+    """
+    Plans the rotation from start to target in closed form. The base turns the shorter way round,
+    taking FAST steps while at least a FAST step away and FINE steps for the rest, and it does not
+    turn at all if it already faces the target or its inverse. Costs a few integer operations, so
+    schedulers can query it as often as they like
+    Args:
+        start: the angle the base is at
+        target: the angle the base should face
+        limits: the physical limits of the base
+
+    Returns: the plan for the rotation
+    """
+    direction = DIRECTION.CLOCKWISE if (target - start).angle < 180 else DIRECTION.COUNTER_CLOCKWISE
+    if start == target or start.inverse == target:
+        return RotationPlan(direction, 0, 0, 0.)
+    diff = abs(start.angle - target.angle) % 360
+    distance = 360 - diff if diff > 180 else diff
+    fast_steps, remainder = divmod(distance, limits.FAST_ROTATION_SPEED)
+    fine_steps = math.ceil(remainder / limits.FINE_ROTATION_SPEED)
+    return RotationPlan(direction, fast_steps, fine_steps, (fast_steps + fine_steps) * limits.DT)
+
+
 @dataclass
 class RotatingBase:
     """
@@ -26,9 +71,11 @@ class RotatingBase:
     Args:
         limits: the physical limitations of the base
         _angle: The current angle of the "front" of the base
+        clock: the source of time used to wait out a rotation cycle
     """
     limits: RotationLimits = field(default_factory=RotationLimits)
     _angle: Angle = Angle(0)  # degrees
+    clock: Clock = field(default_factory=RealTimeClock)
 
     @property
     def angle(self) -> Angle:
@@ -48,3 +95,46 @@ class RotatingBase:
             self._angle += rotation_rate
         else:
             self._angle -= rotation_rate
+
+    def plan_rotation(self, target: Angle) -> RotationPlan:
+        """
+        Plans the rotation from the current angle to the target, see plan_rotation
+        Args:
+            target: the angle the base should face
+
+        Returns: the plan for the rotation
+        """
+        return plan_rotation(self._angle, target, self.limits)
+
+    def execute(self, plan: RotationPlan, on_step: Optional[Callable[[], None]] = None) -> None:
+        """
+        Carries out a rotation plan. The steps run as a counted loop, waiting out every cycle. On a
+        virtual clock, with nobody watching the individual steps, the base jumps straight to the end
+        of the plan instead
+        Args:
+            plan: the rotation to carry out
+            on_step: an optional callback, invoked after every step
+
+        Returns:
+
+        """
+        if on_step is None and isinstance(self.clock, VirtualClock):
+            sign = 1 if plan.direction == DIRECTION.CLOCKWISE else -1
+            turn = (plan.fast_steps * self.limits.FAST_ROTATION_SPEED
+                    + plan.fine_steps * self.limits.FINE_ROTATION_SPEED)
+            self._angle = Angle((self._angle.angle + sign * turn) % 360)
+            self.clock.sleep(plan.duration)
+            return
+        for speed, steps in ((SPEED.FAST, plan.fast_steps), (SPEED.FINE, plan.fine_steps)):
+            rotation = Rotation(plan.direction, speed)
+            for _ in range(steps):
+                self.rotate(rotation)
+                self.wait()
+                if on_step:
+                    on_step()
+
+    def wait(self) -> None:
+        """
+        Waits out a single rotation cycle on the base's clock
+        """
+        self.clock.sleep(self.limits.DT)
@@ -0,0 +1,28 @@
+import sys
+from typing import TYPE_CHECKING
+
+from gherkin.common import Goal
+
+if sys.version_info >= (3, 8):
+    from typing import Protocol
+else:
+    from typing_extensions import Protocol
+
+if TYPE_CHECKING:
+    from gherkin.model.robot import Robot
+
+
+class Display(Protocol):
+    """
+    Anything a robot keeps updated on its progress while it reaches a goal, such as a Visualizer
+    """
+
+    def update_display(self, robot: "Robot", goal: Goal, success: bool) -> object:
+        """
+        Args:
+            robot: the robot whose state changed
+            goal: the goal the robot is working towards
+            success: whether the robot has reached the goal
+
+        Returns: anything, robots ignore it
+        """
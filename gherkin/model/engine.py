@@ -0,0 +1,263 @@
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from gherkin.common import Angle, Goal, Result
+from gherkin.model.arm import Arm, ArmLimits, select_solution
+from gherkin.model.assignment import RobotState, assign_goals, expected_pose
+from gherkin.model.base import RotationLimits
+from gherkin.model.robot import evaluate_goal
+
+
+@dataclass
+class FleetEngine:
+    """
+    A lock-step simulation of a whole fleet on a single thread. The base angles and joint angles of
+    every robot live in NumPy arrays, and each call to step advances every busy robot by one control
+    tick, following the same P-controller, rotation and success rules as Robot.reach.
+
+    Every robot keeps its own simulated timeline, as if it had its own VirtualClock starting at
+    start, so the results carry the same completion times the actor based fleet would produce on
+    virtual clocks.
+
+    Args:
+        num_robots: how many robots are in the fleet
+        ids: a unique identifier for each robot
+        arm_limits: the physical limits of every robot's arm
+        rotation_limits: the physical limits of every robot's base
+        start: the moment the simulated timelines begin
+        settle_time: how long a robot rests after reaching a goal, matching Robot.reach
+        select_elbow: whether each arm moves to the elbow configuration it can reach soonest,
+            matching Robot.reach
+    """
+    num_robots: int
+    ids: List[str] = field(default_factory=list)
+    arm_limits: ArmLimits = field(default_factory=ArmLimits)
+    rotation_limits: RotationLimits = field(default_factory=RotationLimits)
+    start: datetime = field(default_factory=datetime.now)
+    settle_time: float = 1.
+    select_elbow: bool = True
+    angle: np.ndarray = field(init=False)
+    theta_0: np.ndarray = field(init=False)
+    theta_1: np.ndarray = field(init=False)
+    elapsed: np.ndarray = field(init=False)
+    active: np.ndarray = field(init=False)
+    ticks: np.ndarray = field(init=False)
+    goal_x: np.ndarray = field(init=False)
+    goal_y: np.ndarray = field(init=False)
+    goal_angle: np.ndarray = field(init=False)
+    goal_theta_0: np.ndarray = field(init=False)
+    goal_theta_1: np.ndarray = field(init=False)
+    goals: List[Optional[Goal]] = field(init=False)
+    queues: List[Deque[Goal]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        if not self.ids:
+            self.ids = [str(uuid.uuid1())[:8] for _ in range(self.num_robots)]
+        self.angle = np.zeros(self.num_robots, dtype=np.int64)
+        self.theta_0 = np.zeros(self.num_robots)
+        self.theta_1 = np.zeros(self.num_robots)
+        self.elapsed = np.zeros(self.num_robots)
+        self.active = np.zeros(self.num_robots, dtype=bool)
+        self.ticks = np.zeros(self.num_robots, dtype=np.int64)
+        self.goal_x = np.zeros(self.num_robots)
+        self.goal_y = np.zeros(self.num_robots)
+        self.goal_angle = np.zeros(self.num_robots, dtype=np.int64)
+        self.goal_theta_0 = np.zeros(self.num_robots)
+        self.goal_theta_1 = np.zeros(self.num_robots)
+        self.goals = [None] * self.num_robots
+        self.queues = [deque() for _ in range(self.num_robots)]
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.active.any()) or any(self.queues)
+
+    def assign(self, index: int, goal: Goal) -> None:
+        """
+        Queues a goal for the robot at the given index
+        Args:
+            index: the position of the robot in the fleet
+            goal: the desired end location of the robot arm
+
+        Returns:
+
+        """
+        self.queues[index].append(goal)
+
+    def receive_goals(self, goals: List[Goal]) -> List[str]:
+        """
+        Distributes a batch of goals between the robots, the same way FleetManager does
+        Args:
+            goals: the goals to be reached
+
+        Returns: the id of the robot each goal was queued for. Every robot works through its queue
+            in order
+        """
+        index = {robot_id: i for i, robot_id in enumerate(self.ids)}
+        assignment = assign_goals(
+            self._robot_states(), goals, self.rotation_limits, self.arm_limits
+        )
+        for goal, robot_id in zip(goals, assignment):
+            self.assign(index[robot_id], goal)
+        return assignment
+
+    def run(self) -> Iterator[Result]:
+        """
+        Steps the fleet until every queued goal has been handled
+        Returns: the results, in the order they were produced
+
+        """
+        while self.busy:
+            yield from self.step()
+
+    def step(self) -> List[Result]:
+        """
+        Advances every busy robot by a single control tick. A robot that is not yet facing its goal
+        rotates its base, one that is facing its goal moves its arm and checks for success.
+        Returns: the results of any goals that finished during this tick
+
+        """
+        results: List[Result] = []
+        self._start_goals(results)
+        facing = (self.angle == self.goal_angle) | (self.angle == (self.goal_angle + 180) % 360)
+        self._rotate(np.flatnonzero(self.active & ~facing))
+        self._move_arms(np.flatnonzero(self.active & facing), results)
+        return results
+
+    def _start_goals(self, results: List[Result]) -> None:
+        """
+        Hands idle robots the next goal in their queue, failing any goal the arm cannot reach
+        straight away
+        Args:
+            results: where to record the results of goals that failed before any motion
+
+        Returns:
+
+        """
+        for robot in np.flatnonzero(~self.active):
+            index = int(robot)
+            queue = self.queues[index]
+            while queue:
+                goal = evaluate_goal(queue.popleft(), self._base_angle(index))
+                try:
+                    self.goal_theta_0[index], self.goal_theta_1[index] = self._solve(index, goal)
+                except Exception as e:
+                    results.append(Result(self.ids[index], goal, False, self._now(index), e))
+                    continue
+                self.goals[index] = goal
+                self.goal_x[index], self.goal_y[index] = goal.x, goal.y
+                self.goal_angle[index] = goal.angle.angle
+                self.active[index] = True
+                self.ticks[index] = 0
+                break
+
+    def _rotate(self, index: np.ndarray) -> None:
+        """
+        Rotates the bases of the given robots one step towards their goals, see
+        Robot._determine_rotation
+        Args:
+            index: the positions of the robots to rotate
+
+        Returns:
+
+        """
+        if not index.size:
+            return
+        angle = self.angle[index]
+        goal_angle = self.goal_angle[index]
+        clockwise = (goal_angle - angle) % 360 < 180
+        diff = np.abs(angle - goal_angle) % 360
+        distance = np.where(diff > 180, 360 - diff, diff)
+        rate = np.where(
+            distance >= self.rotation_limits.FAST_ROTATION_SPEED,
+            self.rotation_limits.FAST_ROTATION_SPEED,
+            self.rotation_limits.FINE_ROTATION_SPEED
+        )
+        self.angle[index] = (angle + np.where(clockwise, rate, -rate)) % 360
+        self.elapsed[index] += self.rotation_limits.DT
+        self.ticks[index] += 1
+
+    def _move_arms(self, index: np.ndarray, results: List[Result]) -> None:
+        """
+        Moves the arms of the given robots one step towards their goals, see Robot._move_arm and
+        Robot._check_success
+        Args:
+            index: the positions of the robots whose arms should move
+            results: where to record the results of goals that succeeded or failed during this tick
+
+        Returns:
+
+        """
+        if not index.size:
+            return
+        low, high = self.arm_limits.JOINT_LIMITS
+        self.ticks[index] += 1
+        theta_0 = self.theta_0[index] + (self.goal_theta_0[index] - self.theta_0[index]) / 10
+        theta_1 = self.theta_1[index] + (self.goal_theta_1[index] - self.theta_1[index]) / 10
+        joint_0_failed = ~((low < theta_0) & (theta_0 < high))
+        joint_1_failed = ~joint_0_failed & ~((low < theta_1) & (theta_1 < high))
+        self.theta_0[index] = theta_0
+        self.theta_1[index] = np.where(joint_0_failed, self.theta_1[index], theta_1)
+        failed = joint_0_failed | joint_1_failed
+        self.elapsed[index[~failed]] += self.arm_limits.DT
+
+        xs, ys = Arm.forward_batch(self.theta_0[index], self.theta_1[index])
+        at_goal = np.isclose(xs, self.goal_x[index], atol=0.25)
+        at_goal &= np.isclose(ys, self.goal_y[index], atol=0.25)
+        success = ~failed & at_goal
+        self.elapsed[index[success]] += self.settle_time
+
+        for position in np.flatnonzero(failed | success):
+            robot = index[position]
+            error: Optional[Exception] = None
+            if joint_0_failed[position]:
+                error = AssertionError(f'Joint 0 value {theta_0[position]} exceeds joint limits')
+            elif joint_1_failed[position]:
+                error = AssertionError(f'Joint 1 value {theta_1[position]} exceeds joint limits')
+            results.append(Result(
+                self.ids[robot], self.goals[robot], error is None, self._now(robot), error,
+                int(self.ticks[robot])
+            ))
+            self.goals[robot] = None
+            self.active[robot] = False
+
+    def _solve(self, index: int, goal: Goal) -> Tuple[float, float]:
+        """
+        Finds the joint angles the robot at the given index should move to, see Robot._solve
+        """
+        if not self.select_elbow:
+            return Arm.inverse(goal.x, goal.y)
+        return select_solution(
+            Arm.inverse_solutions(goal.x, goal.y).values(),
+            float(self.theta_0[index]), float(self.theta_1[index]), self.arm_limits
+        )
+
+    def _robot_states(self) -> List[RobotState]:
+        """
+        Builds the state each robot is expected to be in once it finishes the goals it has already
+        been given
+        Returns: the expected state of every robot in the fleet
+
+        """
+        states = []
+        for index, robot_id in enumerate(self.ids):
+            state = RobotState(robot_id, queued=len(self.queues[index]) + int(self.active[index]))
+            last_goal = self.queues[index][-1] if self.queues[index] else self.goals[index]
+            if last_goal:
+                state.angle, state.theta_0, state.theta_1 = expected_pose(last_goal)
+            else:
+                state.angle = self._base_angle(index)
+                state.theta_0 = float(self.theta_0[index])
+                state.theta_1 = float(self.theta_1[index])
+            states.append(state)
+        return states
+
+    def _base_angle(self, index: int) -> Angle:
+        return Angle(int(self.angle[index]))
+
+    def _now(self, index: int) -> datetime:
+        return self.start + timedelta(seconds=float(self.elapsed[index]))
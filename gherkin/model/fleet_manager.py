@@ -1,94 +1,418 @@
 import pprint
+import queue
+import threading
+import time
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence
 
 import pykka
 from pykka import ActorProxy
 
-from gherkin.common import Goal, Result
-from gherkin.util import Visualizer
+from gherkin.common import Goal, Result, VirtualClock
+from gherkin.model.assignment import RobotState, assign_goals, pending_state, reachable_mask
+from gherkin.model.result_log import ResultLog
+from gherkin.model.scheduler import WorkQueues, estimate_work
+from gherkin.model.sequencing import sequence_goals
+
+if TYPE_CHECKING:
+    from gherkin.util import Visualizer
 
 
 @dataclass
 class FleetManager:
     """
-    A class responsible for overseeing the distribution of work between a fleet of robots and receiving
-    and handling their output.
+    A class responsible for overseeing the distribution of work between a fleet of robots and
+    receiving and handling their output.
 
     Args:
         robots: A list of ActorProxies of the robots in use
         visualizer: a visualizer to show the robots' progress
         id_robot: A mapping of robot proxy to its id for easy access
         robot_goals: A mapping of robot id to the goals they have been assigned
-        work: A list of futures to be handled
+        rejected: Goals that were never dispatched because no arm could reach them
+        result_buffer: How many finished results may wait to be consumed before the robots block on
+            handing them over
+        sequencing: Whether each robot's share of a batch is reordered to minimize its travel,
+            rather than being sent in arrival order
+        use_workspace_table: Whether goals are validated against the precomputed workspace table
+        result_log: An optional log every result is appended to as soon as its robot finishes
+        chunk_size: The most goals of a batch sent to a robot in a single message, see
+            Robot.reach_many
+        work_stealing: Whether goals wait in shared work queues the robots pull from, and idle
+            robots steal from the busiest, rather than being sent to the robots they were assigned
+            to
+        on_result: An optional callback every result is handed to, from the robot's thread, instead
+            of being buffered for iter_results. For front ends that consume results themselves, such
+            as AsyncFleetManager
 
     Note:
-        id_robot and robot_goals are mapped by id in the __post_init__ because retrieving the ID from the robot
-        in the middle of processing is a blocking call and produces weird behavior
+        id_robot and robot_goals are mapped by id in the __post_init__ because retrieving the ID
+        from the robot in the middle of processing is a blocking call and produces weird behavior
     """
     robots: List[ActorProxy]
-    visualizer: Visualizer
+    visualizer: "Visualizer"
     id_robot: Dict[str, ActorProxy] = field(default_factory=defaultdict)
     robot_goals: Dict[str, List[Goal]] = field(default_factory=dict)
-    work: List = field(default_factory=list)
+    rejected: List[Goal] = field(default_factory=list)
+    result_buffer: int = 64
+    sequencing: bool = True
+    use_workspace_table: bool = False
+    result_log: Optional[ResultLog] = None
+    chunk_size: int = 16
+    work_stealing: bool = False
+    on_result: Optional[Callable[[Result], None]] = None
+    _queues: WorkQueues = field(init=False)
+    _results: "queue.Queue[Result]" = field(init=False)
+    _outstanding: int = field(init=False, default=0)
+    _queued: Dict[str, int] = field(init=False, default_factory=dict)
+    _closed: bool = field(init=False, default=False)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _cancelled: threading.Event = field(init=False, default_factory=threading.Event)
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
+        self._results = queue.Queue(maxsize=self.result_buffer)
         for robot in self.robots:
             self.id_robot[robot.id.get()] = robot
+        # Robots on virtual clocks only line their timelines up through the work queues
+        virtual_time = self.work_stealing and all(
+            isinstance(robot.clock.get(), VirtualClock) for robot in self.robots
+        )
+        self._queues = WorkQueues(self.id_robot.keys(), virtual_time)
 
-    def receive_goals(self, goals: List[Goal]):
-        for goal in goals:
-            self._assign_goal(goal)
+    @property
+    def stolen(self) -> int:
+        """
+        Returns: how many goals idle robots have stolen from the work queues of busier ones
+        """
+        return self._queues.stolen
+
+    def receive_goals(
+            self,
+            goals: List[Goal],
+            deadlines: Optional[Sequence[Optional[float]]] = None
+    ) -> None:
+        self.dispatch_goals(goals, deadlines)
         self._handle_results()
 
-    def receive_goal(self, goal: Goal):
+    def dispatch_goals(
+            self,
+            goals: List[Goal],
+            deadlines: Optional[Sequence[Optional[float]]] = None
+    ) -> Dict[str, List[int]]:
+        """
+        Assigns a batch of goals to the robots and sends them out, without waiting for any results.
+        Pair with iter_results to consume the outcome. Every robot's share is planned before any of
+        them is sent, so a batch that fails to plan sends out none of its goals
+        Args:
+            goals: the goals to be reached
+            deadlines: an optional deadline for each goal, in seconds from now, that sequencing
+                tries to meet
+
+        Raises:
+            RuntimeError: if the fleet manager has been closed
+
+        Returns: the positions in goals of the goals sent to each robot, in the order it will reach
+            them. Goals at no position were rejected
+
+        """
+        self._check_open()
+        # Goals are tracked by their position in the batch, since the same goal may be submitted
+        # more than once
+        reachable = self._filter_reachable(goals)
+        states = self._robot_states()
+        assignment = assign_goals(states, [goals[position] for position in reachable])
+        shares: Dict[str, List[int]] = defaultdict(list)
+        for position, robot_id in zip(reachable, assignment):
+            shares[robot_id].append(position)
+        planned = [state for state in states if shares.get(state.robot_id)]
+        for state in planned:
+            share = shares[state.robot_id]
+            if self.sequencing:
+                order = self._sequence(
+                    state, [goals[position] for position in share],
+                    [deadlines[position] for position in share] if deadlines else None
+                )
+                shares[state.robot_id] = [share[index] for index in order]
+        for state in planned:
+            share_goals = [goals[position] for position in shares[state.robot_id]]
+            if self.work_stealing:
+                self._enqueue(state, share_goals)
+                continue
+            for start in range(0, len(share_goals), self.chunk_size):
+                self._dispatch_many(share_goals[start:start + self.chunk_size], state.robot_id)
+        return dict(shares)
+
+    def receive_goal(self, goal: Goal) -> None:
+        self._check_open()
         self._assign_goal(goal)
 
-    def _handle_results(self):
+    def iter_results(self) -> Iterator[Result]:
+        """
+        Yields the result of every dispatched goal as soon as its robot finishes it, in completion
+        order. At most result_buffer results are held at a time; once the buffer is full the robots
+        wait for it to drain. Breaking out of the iteration closes the fleet manager, see close, so
+        robots that are still working never block on a buffer nobody is reading.
+        Raises:
+            RuntimeError: if the fleet manager has been closed
+
+        Returns:
+
+        """
+        self._check_open()
+        try:
+            while self._outstanding > 0:
+                result = self._next_result()
+                self._outstanding -= 1
+                if not self.work_stealing:
+                    self._count_queued(result.robot_id, -1)
+                yield result
+        finally:
+            if self._outstanding > 0:
+                self.close()
+
+    def close(self) -> None:
+        """
+        Stops collecting results for good. Results of goals still in progress are dropped, and
+        dispatching more goals or iterating over results again raises, since their results could no
+        longer be told apart
+        Returns:
+
         """
-        Joins the various futures of all the robots' work to produce an output once all work is completed
+        self._closed = True
+        self._outstanding = 0
+        while not self._results.empty():
+            self._results.get_nowait()
+
+    def cancel(self) -> None:
+        """
+        Abandons every goal the robots have not started yet, and closes the fleet manager, see
+        close. Robots finish the goal they are working on, then skip the rest of the chunks and work
+        queues they hold
+        Returns:
+
+        """
+        self._cancelled.set()
+        self.close()
+
+    def _next_result(self) -> Result:
+        """
+        Waits for the next result. With a visualizer, the wait is broken up to keep pumping it,
+        since it can only handle events and update its window on the thread that consumes the
+        results
+        Returns: the next result
+        """
+        if not self.visualizer:
+            return self._results.get()
+        while True:
+            self.visualizer.pump()
+            try:
+                return self._results.get(timeout=1 / self.visualizer.fps)
+            except queue.Empty:
+                continue
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("The fleet manager has been closed and no longer collects results")
+
+    def _publish_result(self, result: Result) -> None:
+        """
+        Hands a finished result over to iter_results, or to on_result if one is set. Called from the
+        robot's thread
+        Args:
+            result: the outcome of a goal
+
+        Returns:
+
+        """
+        if self.result_log:
+            try:
+                self.result_log.write(result)
+            except RuntimeError:
+                # A failed log raises again when it is closed. The result itself must still reach
+                # its consumer
+                pass
+        # Read once, since a front end may clear it from another thread while it stops the fleet
+        on_result = self.on_result
+        if on_result:
+            if not self.work_stealing:
+                self._count_queued(result.robot_id, -1)
+            on_result(result)
+            return
+        while not self._closed:
+            try:
+                self._results.put(result, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _handle_results(self) -> None:
+        """
+        Collects the results of all the robots' work as they stream in, producing an output once all
+        work is completed
         Returns:
 
         """
-        results: List[Result] = list(pykka.get_all(self.work))
         results_dict: Dict[str, List[Result]] = defaultdict(list)
-        for result in results:
+        for result in self.iter_results():
             results_dict[result.robot_id].append(result)
-        self.visualizer.cleanup()
+        if self.visualizer:
+            self.visualizer.cleanup()
         pykka.ActorRegistry.stop_all()
         pprint.pprint(results_dict)
+        if self.rejected:
+            pprint.pprint({"rejected": self.rejected})
 
-    def _assign_goal(self, goal):
+    def _filter_reachable(self, goals: List[Goal]) -> List[int]:
         """
-        Assigns the given goal to the robot who will be in the best position to reach it
+        Rejects the goals no arm can reach up front, see reachable_mask
+        Args:
+            goals: the goals received by the fleet
+
+        Returns: the positions in the batch of the goals that are within the arm's reachable
+            workspace
+        """
+        valid = reachable_mask(goals, self.use_workspace_table)
+        self.rejected.extend(goal for goal, reachable in zip(goals, valid) if not reachable)
+        return [position for position, reachable in enumerate(valid) if reachable]
+
+    def _sequence(
+            self,
+            state: RobotState,
+            goals: List[Goal],
+            deadlines: Optional[List[Optional[float]]]
+    ) -> List[int]:
+        """
+        Orders a robot's share of a batch to minimize its travel, see sequence_goals
+        Args:
+            state: where the robot will be once it finishes the goals it has already been given
+            goals: the goals assigned to the robot in this batch
+            deadlines: the deadline of each of the goals, in seconds from now, or None if the batch
+                has none
+
+        Returns: the indices of the goals in the order the robot should reach them
+        """
+        if deadlines:
+            # The robot works through the goals it already has before starting on these
+            backlog = state.busy_for
+            deadlines = [None if deadline is None else deadline - backlog for deadline in deadlines]
+        return sequence_goals(state, goals, deadlines)
+
+    def _assign_goal(self, goal: Goal) -> None:
+        """
+        Assigns the given goal to the robot who will be in the best position to reach it. With work
+        stealing, the goal joins that robot's work queue like the goals of a batch do. A goal no arm
+        can reach is rejected instead, like those of a batch, see _filter_reachable
         Args:
             goal: the desired end location of the robot arm
 
         Returns:
 
         """
-        robot_id = self._select_robot(goal)
-        self.robot_goals[robot_id].append(goal)
-        self.work.append(self.id_robot[robot_id].reach(goal, self.visualizer))
+        if not self._filter_reachable([goal]):
+            return
+        states = self._robot_states()
+        robot_id = self._select_robot(goal, states)
+        if self.work_stealing:
+            assigned = next(state for state in states if state.robot_id == robot_id)
+            self._enqueue(assigned, [goal])
+        else:
+            self._dispatch(goal, robot_id)
 
-    def _select_robot(self, goal: Goal) -> str:
+    def _dispatch(self, goal: Goal, robot_id: str) -> None:
         """
-        Determines which robot in the fleet will best suited to reach the given goal, based on where it will be before
-        attempting the action, and the balancing of work between the other robots.
+        Sends the goal to the given robot and keeps track of the work it produces
         Args:
             goal: the desired end location of the robot arm
+            robot_id: the id of the robot that should reach the goal
 
-        Returns: the id of the robot that should be assigned this goal
+        Returns:
 
         """
+        self.robot_goals.setdefault(robot_id, []).append(goal)
+        self._outstanding += 1
+        self._count_queued(robot_id, 1)
+        self.id_robot[robot_id].reach(
+            goal, self.visualizer, self._publish_result, time.perf_counter()
+        )
+
+    def _dispatch_many(self, goals: List[Goal], robot_id: str) -> None:
+        """
+        Sends a chunk of goals to the given robot as a single message. Results still stream back one
+        goal at a time
+        Args:
+            goals: the goals to reach, in order
+            robot_id: the id of the robot that should reach them
+
+        Returns:
+
+        """
+        self.robot_goals.setdefault(robot_id, []).extend(goals)
+        self._outstanding += len(goals)
+        self._count_queued(robot_id, len(goals))
+        self.id_robot[robot_id].reach_many(
+            goals, self.visualizer, self._publish_result, time.perf_counter(), self._cancelled
+        )
+
+    def _enqueue(self, state: RobotState, goals: List[Goal]) -> None:
+        """
+        Appends a robot's share of a batch to its work queue, and starts every idle robot pulling
+        from the queues
+        Args:
+            state: where the robot will be once it finishes the goals it has already been given
+            goals: the goals, in the order the robot should reach them
+
+        Returns:
+
+        """
+        self.robot_goals.setdefault(state.robot_id, []).extend(goals)
+        self._outstanding += len(goals)
+        self._queues.push(state.robot_id, goals, estimate_work(state, goals))
+        for robot_id in self._queues.claim_idle():
+            self.id_robot[robot_id].work(
+                self._queues, self.visualizer, self._publish_result, self._cancelled
+            )
+
+    def _count_queued(self, robot_id: str, change: int) -> None:
+        """
+        Updates how many goals a robot has yet to finish. With on_result set, results are counted
+        from the robots' threads while goals are dispatched from another, hence the lock
+        """
+        with self._lock:
+            self._queued[robot_id] = self._queued.get(robot_id, 0) + change
+
+    def _robot_states(self) -> List[RobotState]:
+        """
+        Builds the state each robot is expected to be in once it finishes the goals it has already
+        been given
+        Returns: the expected state of every robot in the fleet
+
+        """
+        states = []
         for robot_id in self.id_robot.keys():
-            if not self.robot_goals.get(robot_id):
-                self.robot_goals[robot_id] = []
-                return robot_id
-
-        overworked = max(self.robot_goals.items(), key=(lambda value: len(value[1])))
-        robots_with_headroom = dict(self.robot_goals)
-        del robots_with_headroom[overworked[0]]
-        robot_id, previous_goal = min(robots_with_headroom.items(), key=(lambda value: value[1][-1] - goal))
-        return robot_id
+            if self.work_stealing:
+                state = pending_state(
+                    robot_id, self._queues.last_goal(robot_id), self._queues.queued(robot_id),
+                    backlog=self._queues.remaining(robot_id)
+                )
+            else:
+                goals = self.robot_goals.get(robot_id)
+                state = pending_state(
+                    robot_id, goals[-1] if goals else None, self._queued.get(robot_id, 0)
+                )
+            states.append(state)
+        return states
+
+    def _select_robot(self, goal: Goal, states: Optional[List[RobotState]] = None) -> str:
+        """
+        Determines which robot in the fleet will best suited to reach the given goal, based on where
+        it will be before attempting the action, and how long it will be busy with the work it has
+        already been given.
+        Args:
+            goal: the desired end location of the robot arm
+            states: the expected states of the robots, see _robot_states. Built when not given
+
+        Returns: the id of the robot that should be assigned this goal
+
+        """
+        return assign_goals(states if states is not None else self._robot_states(), [goal])[0]
@@ -0,0 +1,46 @@
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from gherkin.common import Goal, Histogram
+from gherkin.model.arm import JointLimitChecker
+from gherkin.model.display import Display
+
+if TYPE_CHECKING:
+    from gherkin.model.robot import Robot
+
+
+class TimedDisplay:
+    """
+    Stands in for a visualizer while a robot is instrumented, timing every update it forwards
+
+    Args:
+        vis: the visualizer to forward updates to
+        histogram: where the time spent in each update is recorded
+    """
+
+    def __init__(self, vis: Display, histogram: Histogram) -> None:
+        self.vis = vis
+        self.histogram = histogram
+
+    def update_display(self, robot: "Robot", goal: Goal, success: bool) -> object:
+        started = time.perf_counter()
+        running = self.vis.update_display(robot, goal, success)
+        self.histogram.record(time.perf_counter() - started)
+        return running
+
+
+@dataclass
+class TimedJointLimitChecker(JointLimitChecker):
+    """
+    A joint limit checker that records the time spent in every update
+
+    Args:
+        histogram: where the time spent in each update is recorded
+    """
+    histogram: Histogram = field(default_factory=Histogram)
+
+    def update(self, theta: float) -> None:
+        started = time.perf_counter()
+        super().update(theta)
+        self.histogram.record(time.perf_counter() - started)
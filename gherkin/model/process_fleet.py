@@ -0,0 +1,321 @@
+import functools
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pykka
+
+from gherkin.common import Clock, Goal, RealTimeClock, Result, VirtualClock
+from gherkin.model.assignment import RobotState, assign_goals, pending_state, reachable_mask
+from gherkin.model.robot import Robot
+
+# Columns of the shared state block, one row per robot
+ANGLE, THETA_0, THETA_1, STATUS = range(4)
+# Values of the STATUS column. A robot is IDLE until it gets a goal and once it has finished every
+# goal it was sent, and SUCCEEDED from the tick it reaches a goal until it reports the result
+IDLE, WORKING, SUCCEEDED = range(3)
+
+
+@dataclass
+class FleetState:
+    """
+    The state of every robot in a fleet, published in a memory-mapped block that any process can
+    attach to by path. Workers write their robots' rows as they move, and a visualizer or monitor
+    reads the whole block without any pickling or messages.
+
+    Args:
+        path: the file backing the shared block. Lives in /dev/shm where available, so it never
+            touches a disk
+        num_robots: how many robots the block holds
+        array: a (num_robots x 4) view of the block, with the columns ANGLE, THETA_0, THETA_1 and
+            STATUS
+    """
+    path: str
+    num_robots: int
+    array: np.memmap
+
+    @classmethod
+    def create(cls, num_robots: int) -> "FleetState":
+        """
+        Allocates a new, zeroed block for the given number of robots
+        Args:
+            num_robots: how many robots the block holds
+
+        Returns: the newly created state
+        """
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        handle, path = tempfile.mkstemp(prefix="gherkin-", suffix=".state", dir=directory)
+        os.close(handle)
+        array = np.memmap(path, dtype=np.float64, mode="w+", shape=(num_robots, 4))
+        return cls(path, num_robots, array)
+
+    @classmethod
+    def attach(cls, path: str, num_robots: int, writable: bool = False) -> "FleetState":
+        """
+        Attaches to a block created by another process
+        Args:
+            path: the file backing the shared block
+            num_robots: how many robots the block holds
+            writable: whether this process will publish into the block
+
+        Returns: a view of the existing state
+        """
+        array = np.memmap(
+            path, dtype=np.float64, mode="r+" if writable else "r", shape=(num_robots, 4)
+        )
+        return cls(path, num_robots, array)
+
+    def snapshot(self) -> np.ndarray:
+        """
+
+        Returns: A copy of the current state of every robot
+        """
+        return np.array(self.array)
+
+    def unlink(self) -> None:
+        """
+        Removes the backing file. Processes that are still attached keep their view until they let
+        go of it
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class StatePublisher:
+    """
+    Stands in for a visualizer inside a worker, publishing each robot's state into the shared block
+    on every tick
+
+    Args:
+        state: the shared block to publish into
+    """
+    state: FleetState
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> None:
+        self.state.array[robot.offset] = (
+            robot.base.angle.angle, robot.arm.theta_0, robot.arm.theta_1,
+            SUCCEEDED if success else WORKING
+        )
+
+    def publish_idle(self, offset: int) -> None:
+        """
+        Marks a robot that has finished every goal it was sent as idle, keeping the pose it ended in
+        Args:
+            offset: the position of the robot in the fleet
+
+        Returns:
+
+        """
+        self.state.array[offset, STATUS] = IDLE
+
+
+def _run_worker(
+        offsets: List[int],
+        ids: List[str],
+        state_path: str,
+        num_robots: int,
+        goals: multiprocessing.Queue,
+        results: multiprocessing.Queue,
+        realtime: bool,
+        start: datetime
+) -> None:
+    """
+    The body of a worker process. Runs its shard of the fleet as actors, reaching the goals it is
+    sent until it receives None, and sends each result back as soon as it is known
+    Args:
+        offsets: the positions in the fleet of the robots in this shard
+        ids: the ids of the robots in this shard
+        state_path: the file backing the shared state block
+        num_robots: the size of the whole fleet
+        goals: where (offset, goal) pairs for this shard arrive
+        results: where results are sent back
+        realtime: whether the robots wait on the wall clock or on virtual clocks
+        start: the start of the virtual timelines
+
+    Returns:
+
+    """
+    publisher = StatePublisher(FleetState.attach(state_path, num_robots, writable=True))
+    robots = {}
+    for offset, robot_id in zip(offsets, ids):
+        clock: Clock = RealTimeClock() if realtime else VirtualClock(start)
+        robots[offset] = Robot.start(offset, id=robot_id, clock=clock).proxy()
+    # Goals each robot has yet to finish. Results arrive on the robots' threads
+    pending = {offset: 0 for offset in offsets}
+    lock = threading.Lock()
+
+    def finish(offset: int, result: Result) -> None:
+        with lock:
+            pending[offset] -= 1
+            if not pending[offset]:
+                publisher.publish_idle(offset)
+        results.put(result)
+
+    while True:
+        message = goals.get()
+        if message is None:
+            break
+        offset, goal = message
+        with lock:
+            pending[offset] += 1
+        robots[offset].reach(goal, publisher, functools.partial(finish, offset))
+    pykka.ActorRegistry.stop_all(block=True)
+    publisher.state.array.flush()
+
+
+@dataclass
+class ProcessFleetManager:
+    """
+    A fleet manager that shards its robots across worker processes, so the robots' kinematics and
+    limit checks run on every core instead of sharing one interpreter. Goals are sent to the workers
+    and results come back over queues, while the robots' state is published in a shared FleetState
+    block.
+
+    Args:
+        num_robots: how many robots are in the fleet
+        num_workers: how many worker processes to shard the robots across. Defaults to the number of
+            cores
+        realtime: whether the robots wait on the wall clock or advance instantly on virtual clocks
+        ids: a unique identifier for each robot
+        robot_goals: A mapping of robot id to the goals they have been assigned
+        rejected: Goals that were never dispatched because no arm could reach them
+        poll_interval: how long to wait for a result, in seconds, before checking that the workers
+            are still alive
+    """
+    num_robots: int
+    num_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    realtime: bool = False
+    ids: List[str] = field(default_factory=list)
+    robot_goals: Dict[str, List[Goal]] = field(default_factory=dict)
+    rejected: List[Goal] = field(default_factory=list)
+    poll_interval: float = 0.5
+    state: FleetState = field(init=False)
+    _goals: List[multiprocessing.Queue] = field(init=False, default_factory=list)
+    _results: multiprocessing.Queue = field(init=False)
+    _workers: List[multiprocessing.Process] = field(init=False, default_factory=list)
+    _outstanding: int = field(init=False, default=0)
+    _queued: Dict[str, int] = field(init=False, default_factory=dict)
+    _worker_outstanding: Dict[int, int] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.ids:
+            self.ids = [str(uuid.uuid1())[:8] for _ in range(self.num_robots)]
+        self.num_workers = max(min(self.num_workers, self.num_robots), 1)
+        self.state = FleetState.create(self.num_robots)
+        self._results = multiprocessing.Queue()
+
+    def start(self) -> "ProcessFleetManager":
+        """
+        Starts the worker processes, each running every num_workers-th robot of the fleet
+        Returns: this manager, for chaining
+
+        """
+        start = datetime.now()
+        for worker in range(self.num_workers):
+            offsets = list(range(worker, self.num_robots, self.num_workers))
+            goals: multiprocessing.Queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_run_worker,
+                args=(offsets, [self.ids[offset] for offset in offsets], self.state.path,
+                      self.num_robots, goals, self._results, self.realtime, start),
+                daemon=True
+            )
+            process.start()
+            self._goals.append(goals)
+            self._workers.append(process)
+        return self
+
+    def receive_goals(self, goals: List[Goal]) -> None:
+        """
+        Assigns a batch of goals to the robots and sends them to the workers, without waiting for
+        any results
+        Args:
+            goals: the goals to be reached
+
+        Returns:
+
+        """
+        valid = reachable_mask(goals)
+        self.rejected.extend(goal for goal, reachable in zip(goals, valid) if not reachable)
+        goals = [goal for goal, reachable in zip(goals, valid) if reachable]
+        offsets = {robot_id: offset for offset, robot_id in enumerate(self.ids)}
+        for goal, robot_id in zip(goals, assign_goals(self._robot_states(), goals)):
+            offset = offsets[robot_id]
+            worker = offset % self.num_workers
+            self.robot_goals.setdefault(robot_id, []).append(goal)
+            self._queued[robot_id] = self._queued.get(robot_id, 0) + 1
+            self._worker_outstanding[worker] = self._worker_outstanding.get(worker, 0) + 1
+            self._outstanding += 1
+            self._goals[worker].put((offset, goal))
+
+    def iter_results(self) -> Iterator[Result]:
+        """
+        Yields the result of every dispatched goal as soon as a worker sends it back, in completion
+        order
+        Raises:
+            RuntimeError: if a worker exits while it still owes results
+
+        Returns:
+
+        """
+        offsets = {robot_id: offset for offset, robot_id in enumerate(self.ids)}
+        while self._outstanding > 0:
+            try:
+                result = self._results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            self._outstanding -= 1
+            self._queued[result.robot_id] -= 1
+            self._worker_outstanding[offsets[result.robot_id] % self.num_workers] -= 1
+            yield result
+
+    def shutdown(self) -> None:
+        """
+        Lets the workers finish the goals they were sent, then stops them and removes the shared
+        state block
+        """
+        for goals in self._goals:
+            goals.put(None)
+        try:
+            for _ in self.iter_results():
+                pass
+        finally:
+            for process in self._workers:
+                process.join()
+            self.state.unlink()
+
+    def _check_workers(self) -> None:
+        """
+        Raises if a worker that still owes results has exited, since they would never arrive
+        Raises:
+            RuntimeError: naming the dead worker and its exit code
+        """
+        for worker, process in enumerate(self._workers):
+            if self._worker_outstanding.get(worker, 0) > 0 and not process.is_alive():
+                raise RuntimeError(
+                    f"Worker {worker} exited with code {process.exitcode} "
+                    f"with {self._worker_outstanding[worker]} goals unfinished"
+                )
+
+    def _robot_states(self) -> List[RobotState]:
+        """
+        Builds the state each robot is expected to be in once it finishes the goals it has already
+        been given
+        Returns: the expected state of every robot in the fleet
+
+        """
+        states = []
+        for robot_id in self.ids:
+            goals = self.robot_goals.get(robot_id)
+            last_goal = goals[-1] if goals else None
+            states.append(pending_state(robot_id, last_goal, self._queued.get(robot_id, 0)))
+        return states
@@ -0,0 +1,133 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+# One recorded control tick: when it ended, as a POSIX timestamp, and the pose of the robot at that
+# moment
+TICK_DTYPE = np.dtype([("time", "f8"), ("angle", "f8"), ("theta_0", "f8"), ("theta_1", "f8")])
+
+
+class TrajectoryRecorder(ABC):
+    """
+    Keeps the trajectory a robot follows, one record per control tick, in preallocated arrays rather
+    than lists
+    """
+
+    @abstractmethod
+    def record(self, time: float, angle: float, theta_0: float, theta_1: float) -> None:
+        """
+        Records the pose of the robot at the end of a tick
+        Args:
+            time: when the tick ended, as a POSIX timestamp
+            angle: the angle of the base
+            theta_0: the angle of joint 0
+            theta_1: the angle of joint 1
+
+        Returns:
+
+        """
+
+    @abstractmethod
+    def trace(self) -> np.ndarray:
+        """
+
+        Returns: The retained ticks, oldest first, as an array of TICK_DTYPE records
+        """
+
+    def close(self) -> None:
+        """
+        Flushes anything still buffered once the robot is done
+        """
+
+
+class RingBufferRecorder(TrajectoryRecorder):
+    """
+    Retains only the last capacity ticks, so memory stays bounded however long the robot runs
+
+    Args:
+        capacity: how many ticks to retain
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.buffer = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.count = 0
+
+    def record(self, time: float, angle: float, theta_0: float, theta_1: float) -> None:
+        self.buffer[self.count % len(self.buffer)] = (time, angle, theta_0, theta_1)
+        self.count += 1
+
+    def trace(self) -> np.ndarray:
+        trace: np.ndarray
+        if self.count <= len(self.buffer):
+            trace = self.buffer[:self.count].copy()
+        else:
+            start = self.count % len(self.buffer)
+            trace = np.concatenate([self.buffer[start:], self.buffer[:start]])
+        return trace
+
+
+class MemmapRecorder(TrajectoryRecorder):
+    """
+    Retains every tick, spilling them to a memory-mapped file that grows a chunk at a time, so the
+    full trace is available for offline analysis through load_trace without holding it in memory
+
+    Args:
+        path: the file to write the trace to, one per robot
+        chunk: how many ticks the file grows by whenever it fills up
+    """
+
+    def __init__(self, path: str, chunk: int = 65536) -> None:
+        self.path = path
+        self.chunk = chunk
+        self.count = 0
+        self.buffer = np.memmap(path, dtype=TICK_DTYPE, mode="w+", shape=(chunk,))
+        self._trace: Optional[np.ndarray] = None
+
+    def record(self, time: float, angle: float, theta_0: float, theta_1: float) -> None:
+        self._check_open()
+        if self.count == len(self.buffer):
+            self.buffer.flush()
+            self.buffer = np.memmap(
+                self.path, dtype=TICK_DTYPE, mode="r+", shape=(self.count + self.chunk,)
+            )
+        self.buffer[self.count] = (time, angle, theta_0, theta_1)
+        self.count += 1
+
+    def trace(self) -> np.ndarray:
+        if self._trace is not None:
+            return self._trace
+        trace: np.ndarray = self.buffer[:self.count]
+        return trace
+
+    def close(self) -> None:
+        """
+        Flushes the trace and trims the unused end of the last chunk, so load_trace sees exactly the
+        recorded ticks. Closing again does nothing
+        """
+        if self._trace is not None:
+            return
+        self.buffer.flush()
+        del self.buffer
+        with open(self.path, "r+b") as file:
+            file.truncate(self.count * TICK_DTYPE.itemsize)
+        self._trace = load_trace(self.path)
+
+    def _check_open(self) -> None:
+        if self._trace is not None:
+            raise RuntimeError("The recorder has been closed and no longer records ticks")
+
+
+def load_trace(path: str) -> np.ndarray:
+    """
+    Memory-maps a trace written by a MemmapRecorder
+    Args:
+        path: the file the trace was written to
+
+    Returns: the trace, as a read-only array of TICK_DTYPE records
+    """
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    trace: np.ndarray = np.memmap(path, dtype=TICK_DTYPE, mode="r")
+    return trace
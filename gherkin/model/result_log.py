@@ -0,0 +1,197 @@
+import json
+import os
+import queue
+import threading
+from typing import IO, Any, List, Optional
+
+import numpy as np
+
+from gherkin.common import Result
+
+# One fixed-width, little endian record per result. A log file is nothing but these records back to
+# back, so it can be memory-mapped and aggregated with NumPy however many millions of goals it holds
+RESULT_DTYPE = np.dtype([
+    ("robot_id", "S16"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("angle", "<i2"),
+    ("success", "?"),
+    ("completed_at", "<f8"),
+    ("ticks", "<u4"),
+    ("error", "u1"),
+])
+# Values of the error field. Anything not listed is logged as OTHER_ERROR
+NO_ERROR, UNREACHABLE, LIMIT_EXCEEDED, OTHER_ERROR = range(4)
+ERROR_CODES = {ValueError: UNREACHABLE, AssertionError: LIMIT_EXCEEDED}
+
+_CLOSE = object()
+
+
+def error_code(error: Optional[Exception]) -> int:
+    """
+    Classifies the error a goal failed with
+    Args:
+        error: the error of a result, if any
+
+    Returns: NO_ERROR, UNREACHABLE, LIMIT_EXCEEDED or OTHER_ERROR
+    """
+    if error is None:
+        return NO_ERROR
+    return ERROR_CODES.get(type(error), OTHER_ERROR)
+
+
+def to_records(results: List[Result]) -> np.ndarray:
+    """
+    Packs results into RESULT_DTYPE records
+    Args:
+        results: the results to pack
+
+    Returns: an array with one record per result
+    """
+    records = np.zeros(len(results), dtype=RESULT_DTYPE)
+    for index, result in enumerate(results):
+        records[index] = (
+            result.robot_id.encode(), result.goal.x, result.goal.y, result.goal.angle.angle,
+            result.success, result.completed_at.timestamp(), result.ticks, error_code(result.error)
+        )
+    return records
+
+
+def to_json(result: Result) -> str:
+    """
+    Formats a result as a single line of JSON. NumPy scalars, as random goals carry, are written as
+    plain numbers
+    """
+    return json.dumps({
+        "robot_id": result.robot_id,
+        "x": result.goal.x,
+        "y": result.goal.y,
+        "angle": result.goal.angle.angle,
+        "success": result.success,
+        "completed_at": result.completed_at.isoformat(),
+        "ticks": result.ticks,
+        "error": None if result.error is None else repr(result.error),
+    }, default=lambda value: value.item())
+
+
+class ResultLog:
+    """
+    An append-only log of results. Robots hand results over with write, which only queues them, and
+    a background thread appends them to the file in batches, so logging never holds up a control
+    loop unless the file falls max_pending results behind.
+    If appending ever fails the writer stops, and the error is raised from every later write and
+    from close.
+
+    Args:
+        path: the file to append to
+        jsonl: whether to write one JSON object per line instead of binary RESULT_DTYPE records
+        batch_size: the most results written in a single append
+        max_pending: how many results may wait to be appended before write waits for the writer to
+            catch up
+    """
+
+    def __init__(
+            self,
+            path: str,
+            jsonl: bool = False,
+            batch_size: int = 1024,
+            max_pending: int = 65536
+    ) -> None:
+        self.path = path
+        self.jsonl = jsonl
+        self.batch_size = batch_size
+        self.written = 0
+        self._file: IO = open(path, "a" if jsonl else "ab")
+        self._pending: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[Exception] = None
+        self._writer = threading.Thread(target=self._write_loop, name="result-log", daemon=True)
+        self._writer.start()
+
+    def write(self, result: Result) -> None:
+        """
+        Queues a result to be appended. Safe to call from any thread, and only waits on the file
+        while max_pending results are already queued
+        Args:
+            result: the result to log
+
+        Raises:
+            RuntimeError: if appending to the file has failed
+
+        Returns:
+
+        """
+        self._put(result)
+
+    def close(self) -> None:
+        """
+        Appends every result still queued and closes the file
+        Raises:
+            RuntimeError: if appending to the file has failed
+        """
+        try:
+            self._put(_CLOSE)
+            self._writer.join()
+        finally:
+            self._file.close()
+        self._check_error()
+
+    def __enter__(self) -> "ResultLog":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _put(self, item: object) -> None:
+        self._check_error()
+        while True:
+            try:
+                self._pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                # The writer may have failed while the queue was full, and would never make room
+                self._check_error()
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Appending to the result log {self.path} failed") from self._error
+
+    def _write_loop(self) -> None:
+        closed = False
+        while not closed:
+            batch = [self._pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            if any(result is _CLOSE for result in batch):
+                closed = True
+                batch = [result for result in batch if result is not _CLOSE]
+            if batch:
+                try:
+                    self._append(batch)
+                except Exception as e:
+                    self._error = e
+                    return
+
+    def _append(self, batch: List[Result]) -> None:
+        if self.jsonl:
+            self._file.write("".join(to_json(result) + "\n" for result in batch))
+        else:
+            self._file.write(to_records(batch).tobytes())
+        self._file.flush()
+        self.written += len(batch)
+
+
+def read_results(path: str) -> np.ndarray:
+    """
+    Memory-maps a binary result log, so it can be aggregated without being loaded
+    Args:
+        path: the file the log was written to
+
+    Returns: a read-only array of RESULT_DTYPE records
+    """
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=RESULT_DTYPE)
+    records: np.ndarray = np.memmap(path, dtype=RESULT_DTYPE, mode="r")
+    return records
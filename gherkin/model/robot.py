@@ -1,14 +1,32 @@
+import logging
+import threading
 import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
 import numpy as np
 from pykka import ThreadingActor
 
-from gherkin.common import Goal, DIRECTION, Result, Rotation, SPEED
-from gherkin.model.arm import Arm
+from gherkin.common import (
+    Angle, Clock, ELBOW, Goal, RealTimeClock, Result, RobotMetrics, Rotation, SPEED
+)
+from gherkin.model.arm import Arm, select_solution
 from gherkin.model.base import RotatingBase
+from gherkin.model.display import Display
+from gherkin.model.instrumentation import TimedDisplay, TimedJointLimitChecker
+from gherkin.model.recorder import TrajectoryRecorder
+from gherkin.model.trajectory import ArmController, ProportionalController
+from gherkin.model.workspace import workspace_table
+
+if TYPE_CHECKING:
+    from gherkin.model.scheduler import WorkQueues
+
+logger = logging.getLogger(__name__)
+
+# How long a robot rests at a goal it reached before it reports the result, in seconds
+SETTLE_TIME: float = 1.
 
 
 @dataclass()
@@ -21,55 +39,296 @@ class Robot(ThreadingActor):
         id: A unique identifier for this robot
         arm: A double jointed arm responsible for reaching in a 2d space
         base: A base capable of rotating 360 degrees in order to reach a goal in 3d space
+        clock: The source of time for every wait and timestamp, shared with the arm and the base
+        controller: Decides how the arm moves towards each goal, one control tick at a time
+        concurrent_motion: Whether the base rotates while the arm moves, rather than the arm waiting
+            for the base
+        use_workspace_table: Whether goals are solved from the precomputed workspace table instead
+            of with trig
+        select_elbow: Whether the arm moves to whichever elbow configuration, and turn of each
+            joint, it can reach soonest, rather than always to the elbow down solution
+        recorder: An optional recorder that keeps the pose of the robot at every control tick
+        metrics: Optional instrumentation of where the robot's goals spend their time. When it is
+            None, the only cost to a goal is a single check
     """
     offset: int
     id: str = field(default_factory=lambda: str(uuid.uuid1())[:8])
     arm: Arm = field(default_factory=Arm)
     base: RotatingBase = field(default_factory=RotatingBase)
+    clock: Clock = field(default_factory=RealTimeClock)
+    controller: ArmController = field(default_factory=ProportionalController)
+    concurrent_motion: bool = False
+    use_workspace_table: bool = False
+    select_elbow: bool = True
+    recorder: Optional[TrajectoryRecorder] = None
+    metrics: Optional[RobotMetrics] = None
+    _rotation_steps: int = field(init=False, default=0, repr=False)
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
         super().__init__()
+        self.arm.clock = self.clock
+        self.base.clock = self.clock
+        if self.metrics:
+            limit_check = self.metrics.histograms["limit_check"]
+            dt = self.arm.limits.DT
+            self.arm.joint_0_checker = TimedJointLimitChecker(dt, histogram=limit_check)
+            self.arm.joint_1_checker = TimedJointLimitChecker(dt, histogram=limit_check)
 
-    def reach(self, goal: Goal, vis=None) -> Result:
+    def reach(
+            self,
+            goal: Goal,
+            vis: Optional[Display] = None,
+            on_result: Optional[Callable[[Result], None]] = None,
+            dispatched_at: Optional[float] = None,
+            settle: bool = True
+    ) -> Result:
         """
         Given a goal with (x, y, angle) coordinates, manipulate the various parts of the robot until the goal is reached
         If a visualizer is given, this also updates the visualization of the process
         Args:
             goal: a representation of the desired location of the end position of the robot arm
             vis: an optional visualizer component for the robot to keep updated
+            on_result: an optional callback, invoked from the robot's thread with the result as soon
+                as it is known
+            dispatched_at: when the goal was sent to the robot, on the time.perf_counter clock, to
+                measure how long it waited in the robot's queue
+            settle: whether the robot rests for SETTLE_TIME once it reaches the goal
 
         Returns:
 
         """
-        print(f"{self.id} recieved goal: {goal}")
-        found_angle = False
+        metrics = self.metrics
+        if metrics:
+            started = self.clock.now()
+            if dispatched_at is not None:
+                metrics.histograms["queue_wait"].record(time.perf_counter() - dispatched_at)
+            if vis:
+                vis = TimedDisplay(vis, metrics.histograms["visualizer"])
+        try:
+            result = self._reach(goal, vis, settle)
+        except Exception as e:
+            result = Result(self.id, goal, False, self.clock.now(), e)
+        if metrics:
+            self._measure(metrics, result, started)
+        if on_result:
+            on_result(result)
+        return result
+
+    def reach_many(
+            self,
+            goals: List[Goal],
+            vis: Optional[Display] = None,
+            on_result: Optional[Callable[[Result], None]] = None,
+            dispatched_at: Optional[float] = None,
+            cancelled: Optional[threading.Event] = None
+    ) -> List[Result]:
+        """
+        Reaches a sequence of goals within a single actor message, so a batch costs one message and
+        one future rather than one per goal. The robot only settles after the last goal, since the
+        motion towards each of the others' successors can begin as soon as it is reached
+        Args:
+            goals: the goals to reach, in order
+            vis: an optional visualizer component for the robot to keep updated
+            on_result: an optional callback, invoked from the robot's thread with the result of each
+                goal as soon as it is known, so progress streams back while the rest of the batch is
+                still running
+            dispatched_at: when the batch was sent to the robot, on the time.perf_counter clock.
+                Every goal of the batch waited in the robot's queue since then, so each one records
+                its wait from it
+            cancelled: an optional event that abandons the rest of the batch once it is set. It is
+                checked between goals, so it takes effect even while this message is still waiting
+                in the robot's inbox
+
+        Returns: the result of every goal reached before the batch was cancelled, in order
+        """
+        results: List[Result] = []
+        for index, goal in enumerate(goals):
+            if cancelled is not None and cancelled.is_set():
+                break
+            settle = index == len(goals) - 1
+            results.append(self.reach(goal, vis, on_result, dispatched_at, settle=settle))
+        return results
+
+    def work(
+            self,
+            queues: "WorkQueues",
+            vis: Optional[Display] = None,
+            on_result: Optional[Callable[[Result], None]] = None,
+            cancelled: Optional[threading.Event] = None
+    ) -> int:
+        """
+        Pulls goals from the fleet's work queues and reaches them until there are none left,
+        stealing from the busiest peer once its own deque is empty. The robot only settles when
+        nothing is queued behind a goal
+        Args:
+            queues: the work queues shared by the fleet
+            vis: an optional visualizer component for the robot to keep updated
+            on_result: an optional callback, invoked from the robot's thread with the result of each
+                goal as soon as it is known
+            cancelled: an optional event that stops the robot pulling goals once it is set
+
+        Returns: how many goals the robot reached or failed
+        """
+        count = 0
+        try:
+            goal = queues.pop(self.id, self.clock.now().timestamp())
+            while goal is not None:
+                if cancelled is not None and cancelled.is_set():
+                    queues.leave(self.id)
+                    break
+                self.reach(goal, vis, on_result, settle=queues.queued(self.id) == 0)
+                count += 1
+                goal = queues.pop(self.id, self.clock.now().timestamp())
+        except BaseException:
+            # Peers on virtual clocks would otherwise wait for this robot forever
+            queues.leave(self.id)
+            raise
+        return count
+
+    def _reach(self, goal: Goal, vis: Optional[Display] = None, settle: bool = True) -> Result:
+        logger.debug("%s received goal: %s", self.id, goal)
+        self._rotation_steps = 0
         success = False
         goal = self._evaluate_goal(goal)
         try:
-            goal_theta_0, goal_theta_1 = self.arm.inverse(goal.x, goal.y)
+            goal_theta_0, goal_theta_1 = self._solve(goal)
         except Exception as e:
             self.arm.reset()
-            return Result(self.id, goal, False, datetime.now(), e)
+            return Result(self.id, goal, False, self.clock.now(), e)
+
+        if self.concurrent_motion:
+            return self._reach_concurrently(goal, goal_theta_0, goal_theta_1, vis, settle)
 
+        on_step = (lambda: self._on_rotation_step(goal, vis)) if vis or self.recorder else None
+        plan = self.base.plan_rotation(goal.angle)
+        self.base.execute(plan, on_step)
+        self._rotation_steps = ticks = plan.steps
+        self.controller.start(self.arm, goal_theta_0, goal_theta_1)
         while not success:
-            if not self._check_angle(goal):
-                rotation = self._determine_rotation(goal) if not found_angle else None
-                if rotation:
-                    self._rotate(rotation)
-
-            else:
-                try:
-                    self._move_arm(goal_theta_0, goal_theta_1)
-                    success = self._check_success(goal)
-                except Exception as e:
-                    return Result(self.id, goal, False, datetime.now(), e)
-                finally:
-                    self.arm.reset()
+            ticks += 1
+            try:
+                self._move_arm()
+                success = self._check_success(goal)
+            except Exception as e:
+                return Result(self.id, goal, False, self.clock.now(), e, ticks)
+            finally:
+                self.arm.reset()
 
             if vis:
                 vis.update_display(self, goal, success)
-        time.sleep(1)
-        return Result(self.id, goal, True, datetime.now(), None)
+            if self.recorder:
+                self._record(self.recorder)
+        if settle:
+            self.clock.sleep(SETTLE_TIME)
+        return Result(self.id, goal, True, self.clock.now(), None, ticks)
+
+    def _reach_concurrently(
+            self,
+            goal: Goal,
+            goal_theta_0: float,
+            goal_theta_1: float,
+            vis: Optional[Display] = None,
+            settle: bool = True
+    ) -> Result:
+        """
+        Drives the base and the arm in the same control ticks, so a goal takes as long as the slower
+        of the two motions rather than their sum. Ticks run at the arm's rate, and the base starts a
+        new rotation step each time the previous one has had a full rotation cycle to complete. The
+        goal only counts as reached once the base is facing it and the arm is at its pose
+        Args:
+            goal: the goal, already transformed by _evaluate_goal
+            goal_theta_0: the angle joint 0 should end at
+            goal_theta_1: the angle joint 1 should end at
+            vis: an optional visualizer component for the robot to keep updated
+            settle: whether the robot rests for SETTLE_TIME once it reaches the goal
+
+        Returns:
+
+        """
+        rotation_ticks = max(round(self.base.limits.DT / self.arm.limits.DT), 1)
+        rotation_done = 0
+        tick = 0
+        success = False
+        self.controller.start(self.arm, goal_theta_0, goal_theta_1)
+        while not success:
+            if tick >= rotation_done and not self._check_angle(goal):
+                self.base.rotate(self._determine_rotation(goal))
+                self._rotation_steps += 1
+                rotation_done = tick + rotation_ticks
+            tick += 1
+            try:
+                self._move_arm()
+                success = (
+                    tick >= rotation_done and self._check_angle(goal) and self._check_success(goal)
+                )
+            except Exception as e:
+                return Result(self.id, goal, False, self.clock.now(), e, tick)
+            finally:
+                self.arm.reset()
+
+            if vis:
+                vis.update_display(self, goal, success)
+            if self.recorder:
+                self._record(self.recorder)
+        if settle:
+            self.clock.sleep(SETTLE_TIME)
+        return Result(self.id, goal, True, self.clock.now(), None, tick)
+
+    def _measure(self, metrics: RobotMetrics, result: Result, started: datetime) -> None:
+        """
+        Records where the time of a finished goal went. The rotation and arm phases follow from the
+        ticks spent in each, so the control loops themselves carry no instrumentation
+        Args:
+            metrics: where to record the measurements
+            result: the outcome of the goal
+            started: when the robot started on the goal, on its own clock
+
+        Returns:
+
+        """
+        arm_ticks = result.ticks if self.concurrent_motion else result.ticks - self._rotation_steps
+        # A goal that fails outside of the control loops carries no ticks, however far it got
+        arm_ticks = max(arm_ticks, 0)
+        metrics.rotation_ticks += self._rotation_steps
+        metrics.arm_ticks += arm_ticks
+        metrics.histograms["rotation"].record(self._rotation_steps * self.base.limits.DT)
+        metrics.histograms["arm"].record(arm_ticks * self.arm.limits.DT)
+        metrics.histograms["reach"].record((self.clock.now() - started).total_seconds())
+
+    def _on_rotation_step(self, goal: Goal, vis: Optional[Display] = None) -> None:
+        if vis:
+            vis.update_display(self, goal, False)
+        if self.recorder:
+            self._record(self.recorder)
+
+    def _record(self, recorder: TrajectoryRecorder) -> None:
+        """
+        Records the pose of the robot at the end of a control tick
+        """
+        recorder.record(
+            self.clock.now().timestamp(), self.base.angle.angle, self.arm.theta_0, self.arm.theta_1
+        )
+
+    def _solve(self, goal: Goal) -> Tuple[float, float]:
+        """
+        Finds the joint angles that put the end of the arm on the goal
+        Args:
+            goal: the goal, already transformed by _evaluate_goal
+
+        Raises:
+            ValueError: if the goal is outside of the arm's reachable workspace
+
+        Returns: the angles of joint 0 and joint 1
+        """
+        if self.use_workspace_table:
+            table = workspace_table(self.arm.link_1, self.arm.link_2)
+            if not self.select_elbow:
+                return table.lookup(goal.x, goal.y)
+            solutions = [table.lookup(goal.x, goal.y, elbow) for elbow in ELBOW]
+            return select_solution(solutions, self.arm.theta_0, self.arm.theta_1, self.arm.limits)
+        if not self.select_elbow:
+            return self.arm.inverse(goal.x, goal.y)
+        return self.arm.fastest_inverse(goal.x, goal.y)
 
     def _check_success(self, goal: Goal) -> bool:
         """
@@ -86,34 +345,14 @@ class Robot(ThreadingActor):
         """
         return (self.base.angle == goal.angle) or (self.base.angle.inverse == goal.angle)
 
-    def _rotate(self, rotation: Rotation) -> None:
-        """
-        Tells the robot's base to rotate in a specified direction at a specified speed
-        Args:
-            rotation: the direction and speed of the desired rotation
-
-        Returns:
-
+    def _move_arm(self) -> None:
         """
-        self.base.rotate(rotation)
-        time.sleep(self.base.limits.DT)
-
-    def _move_arm(self, goal_theta_0, goal_theta_1) -> None:
-        """
-        Given the difference between current position and the goal, instructs the arm joints to move towards the goal
-        Args:
-            goal_theta_0:
-            goal_theta_1:
-
+        Has the controller move the arm joints a single tick towards the goal it was started with
         Returns:
 
         """
-        theta_0_error = goal_theta_0 - self.arm.theta_0
-        theta_1_error = goal_theta_1 - self.arm.theta_1
-        self.arm.theta_0 += theta_0_error / 10
-        self.arm.theta_1 += theta_1_error / 10
-
-        time.sleep(self.arm.limits.DT)
+        self.controller.step(self.arm)
+        self.arm.wait()
 
     def _determine_rotation(self, goal: Goal) -> Rotation:
         """
@@ -124,13 +363,8 @@ class Robot(ThreadingActor):
         Returns:
 
         """
-        direction = DIRECTION.CLOCKWISE if ((goal.angle - self.base.angle).angle < 180) else DIRECTION.COUNTER_CLOCKWISE
-
-        diff = abs(self.base.angle.angle - goal.angle.angle) % 360
-        distance = 360 - diff if diff > 180 else diff
-        speed = SPEED.FAST if distance >= self.base.limits.FAST_ROTATION_SPEED else SPEED.FINE
-
-        return Rotation(direction, speed)
+        plan = self.base.plan_rotation(goal.angle)
+        return Rotation(plan.direction, SPEED.FAST if plan.fast_steps else SPEED.FINE)
 
     def _evaluate_goal(self, goal: Goal) -> Goal:
         """
@@ -139,12 +373,39 @@ class Robot(ThreadingActor):
         that would cause the robot to rotate counterclockwise (any angle over 90 degrees) would
         result in a nonsensical result (rotating "behind" and reaching "forward" for a -x value)
         """
+        return evaluate_goal(goal, self.base.angle)
 
-        optimal_angle = goal.angle if (self.base.angle + 90 > goal.angle or self.base.angle - 90 < goal.angle) else goal.angle.inverse
-        goal = Goal(
-            x=(-goal.x) if optimal_angle.angle > 180 else goal.x,
-            y=goal.y,
-            angle=optimal_angle
-        )
 
-        return goal
+def evaluate_goal(goal: Goal, base_angle: Angle) -> Goal:
+    """
+    Transforms the goal into the one a robot whose base faces base_angle will actually reach.
+    See Robot._evaluate_goal
+    Args:
+        goal: a representation of the desired location of the end position of the robot arm
+        base_angle: the angle the robot's base is facing when it receives the goal
+
+    Returns: the goal with the angle the base should rotate to, and x flipped to match that facing
+    """
+    optimal_angle = facing_angle(goal.angle, base_angle)
+    goal = Goal(
+        x=(-goal.x) if optimal_angle.angle > 180 else goal.x,
+        y=goal.y,
+        angle=optimal_angle
+    )
+
+    return goal
+
+
+def facing_angle(goal_angle: Angle, base_angle: Angle) -> Angle:
+    """
+    Chooses whether a robot whose base faces base_angle turns to the goal's angle or to its inverse.
+    See Robot._evaluate_goal
+    Args:
+        goal_angle: the angle of the goal
+        base_angle: the angle the robot's base is facing when it receives the goal
+
+    Returns: the angle the base should rotate to
+    """
+    if base_angle + 90 > goal_angle or base_angle - 90 < goal_angle:
+        return goal_angle
+    return goal_angle.inverse
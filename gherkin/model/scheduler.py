@@ -0,0 +1,243 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from gherkin.common import Goal
+from gherkin.model.assignment import RobotState
+from gherkin.model.sequencing import SERVICE_TIME, transition_costs
+
+
+def estimate_work(
+        state: RobotState,
+        goals: List[Goal],
+        service_time: float = SERVICE_TIME
+) -> List[float]:
+    """
+    Estimates how long a robot spends on each of a sequence of goals, travelling to it from the
+    previous one and settling at it
+    Args:
+        state: where the robot will be before it starts on the goals
+        goals: the goals, in the order the robot will reach them
+        service_time: the time spent at each goal besides travelling to it
+
+    Returns: the estimated time of each goal, in seconds
+    """
+    if not goals:
+        return []
+    costs = transition_costs(state, goals)
+    nodes = np.arange(len(goals) + 1)
+    return [float(cost) for cost in costs[nodes[:-1], nodes[1:]] + service_time]
+
+
+class WorkQueues:
+    """
+    A deque of goals per robot, shared by the whole fleet. Robots take goals from the head of their
+    own deque while they work, and a robot whose deque runs dry steals from the tail of the peer
+    projected to finish last, so goals never stay stuck behind a slow robot while others are idle.
+    Robots only hold the goal they are working on, so everything else can still be moved between
+    them. All methods are safe to call from any thread.
+
+    Robots that report the time on their own clock when they pop are judged by it, rather than by
+    the order their threads happen to run in. Each robot's pace, how long its goals actually take
+    over how long they were estimated to take, is learnt from those reports, and a robot only steals
+    a goal it would finish before the peer it steals from would.
+
+    Args:
+        robot_ids: the ids of the robots in the fleet
+        virtual_time: whether the robots run on virtual clocks. Their timelines then advance
+            independently of each other and of the wall clock, so a robot that pops waits until
+            every other working robot's clock has caught up with its own. Goals are then handed out
+            in the order a real fleet would ask for them, instead of the order the robots' threads
+            get to run in
+    """
+
+    def __init__(self, robot_ids: Iterable[str], virtual_time: bool = False) -> None:
+        self.virtual_time = virtual_time
+        self._condition = threading.Condition()
+        self._queues: Dict[str, Deque[Tuple[Goal, float]]] = {
+            robot_id: deque() for robot_id in robot_ids
+        }
+        self._remaining: Dict[str, float] = {robot_id: 0. for robot_id in self._queues}
+        self._last: Dict[str, Goal] = {}
+        self._working: Set[str] = set()
+        # The time on each working robot's clock when it last asked for a goal, and when it is
+        # expected to be done with the goal it took then
+        self._clock: Dict[str, float] = {}
+        self._busy_until: Dict[str, float] = {}
+        # When each robot took its current goal, and that goal's estimate, until it reports back
+        self._started: Dict[str, Tuple[float, float]] = {}
+        # How long each robot's finished goals took, and how long they were estimated to take
+        self._taken: Dict[str, float] = {robot_id: 0. for robot_id in self._queues}
+        self._estimated: Dict[str, float] = {robot_id: 0. for robot_id in self._queues}
+        self.stolen = 0
+
+    def push(self, robot_id: str, goals: List[Goal], estimates: List[float]) -> None:
+        """
+        Appends goals to the tail of a robot's deque
+        Args:
+            robot_id: the id of the robot the goals are assigned to
+            goals: the goals, in the order the robot should reach them
+            estimates: the estimated time of each goal, see estimate_work
+
+        Returns:
+
+        """
+        with self._condition:
+            self._queues[robot_id].extend(zip(goals, estimates))
+            self._remaining[robot_id] += sum(estimates)
+
+    def pop(self, robot_id: str, now: Optional[float] = None) -> Optional[Goal]:
+        """
+        Takes the next goal for a robot: the head of its own deque, or else the tail of the deque of
+        the peer projected to finish last. A robot that gets nothing is marked idle, see claim_idle
+        Args:
+            robot_id: the id of the robot asking for work
+            now: the time on the robot's clock, in seconds, once it is done with its previous goal.
+                Without it, a robot steals from the peer with the most estimated work left, whenever
+                it can
+
+        Returns: the goal to work on, or None once there is nothing left to do
+        """
+        with self._condition:
+            if now is not None:
+                self._report(robot_id, now)
+            own = self._queues[robot_id]
+            if own:
+                goal, estimate = own.popleft()
+                self._remaining[robot_id] -= estimate
+            else:
+                victim = self._select_victim(robot_id, now)
+                if victim is None:
+                    self._leave(robot_id)
+                    return None
+                goal, estimate = self._queues[victim].pop()
+                self._remaining[victim] -= estimate
+                self.stolen += 1
+            if now is not None:
+                self._started[robot_id] = (now, estimate)
+                self._busy_until[robot_id] = now + estimate * self._pace(robot_id)
+            self._last[robot_id] = goal
+            return goal
+
+    def leave(self, robot_id: str) -> None:
+        """
+        Marks a robot that stops pulling goals before its pop came back empty as idle, so peers
+        waiting for its clock to catch up carry on without it
+        Args:
+            robot_id: the id of the robot
+
+        Returns:
+
+        """
+        with self._condition:
+            self._leave(robot_id)
+
+    def claim_idle(self) -> List[str]:
+        """
+        Finds the robots that have to be told to start pulling work: every idle robot, as long as
+        any goal is queued, since idle robots steal. The robots returned are marked as working, so
+        each is only told once
+        Returns: the ids of the robots to start
+        """
+        with self._condition:
+            if not any(self._queues.values()):
+                return []
+            idle = [robot_id for robot_id in self._queues if robot_id not in self._working]
+            self._working.update(idle)
+            return idle
+
+    def queued(self, robot_id: str) -> int:
+        """
+        Returns: How many goals are waiting in a robot's deque
+        """
+        with self._condition:
+            return len(self._queues[robot_id])
+
+    def remaining(self, robot_id: str) -> float:
+        """
+        Returns: The estimated time, in seconds, a robot needs for the goals waiting in its deque
+        """
+        with self._condition:
+            return max(self._remaining[robot_id], 0.)
+
+    def pace(self, robot_id: str) -> float:
+        """
+        Returns: How long a robot's goals actually take over how long they were estimated to take, 1
+            until
+        it has reported finishing one
+        """
+        with self._condition:
+            return self._pace(robot_id)
+
+    def last_goal(self, robot_id: str) -> Optional[Goal]:
+        """
+        Returns: The goal a robot will end on if nothing is stolen from it: the tail of its deque,
+            or else the
+        last goal it took. None if it has never had any
+        """
+        with self._condition:
+            queue = self._queues[robot_id]
+            return queue[-1][0] if queue else self._last.get(robot_id)
+
+    def _report(self, robot_id: str, now: float) -> None:
+        """
+        Records that a robot is done with its previous goal at the given time, learning its pace
+        from how long the goal took. With virtual time, waits until no other working robot is behind
+        it
+        """
+        started = self._started.pop(robot_id, None)
+        if started is not None:
+            self._taken[robot_id] += max(now - started[0], 0.)
+            self._estimated[robot_id] += started[1]
+        self._clock[robot_id] = self._busy_until[robot_id] = now
+        self._condition.notify_all()
+        if self.virtual_time:
+            self._condition.wait_for(lambda: not self._behind(robot_id, now))
+
+    def _behind(self, robot_id: str, now: float) -> List[str]:
+        """
+        Returns: The other working robots whose clocks are behind the given time, including those
+            that have
+        not asked for a goal yet, since they may still ask for one earlier
+        """
+        return [
+            peer for peer in self._working
+            if peer != robot_id and self._clock.get(peer, float("-inf")) < now
+        ]
+
+    def _leave(self, robot_id: str) -> None:
+        self._working.discard(robot_id)
+        self._clock.pop(robot_id, None)
+        self._started.pop(robot_id, None)
+        self._condition.notify_all()
+
+    def _pace(self, robot_id: str) -> float:
+        estimated = self._estimated[robot_id]
+        return self._taken[robot_id] / estimated if estimated > 0 else 1.
+
+    def _projected_finish(self, robot_id: str) -> float:
+        """
+        Returns: When a robot is expected to be done with every goal in its deque, on its own clock
+        """
+        remaining = max(self._remaining[robot_id], 0.)
+        return self._busy_until[robot_id] + remaining * self._pace(robot_id)
+
+    def _select_victim(self, robot_id: str, now: Optional[float]) -> Optional[str]:
+        """
+        Picks the peer to steal from. Without the thief's time, or a time from every peer with goals
+        waiting, that is the peer with the most estimated work left. Otherwise it is the peer
+        projected to finish last, as long as the thief would finish the goal at the tail of its
+        deque before it would
+        """
+        peers = [peer for peer in self._queues if self._queues[peer]]
+        if now is None or any(peer not in self._busy_until for peer in peers):
+            return max(peers, key=lambda peer: self._remaining[peer], default=None)
+        victim = max(peers, key=self._projected_finish, default=None)
+        if victim is None:
+            return None
+        estimate = self._queues[victim][-1][1]
+        if now + estimate * self._pace(robot_id) < self._projected_finish(victim):
+            return victim
+        return None
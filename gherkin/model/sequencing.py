@@ -0,0 +1,173 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from gherkin.common import Goal
+from gherkin.model.arm import ArmLimits
+from gherkin.model.assignment import RobotState, expected_pose, travel_costs
+from gherkin.model.base import RotationLimits
+
+# Time a robot spends at each goal besides travelling to it: the settle at the end of a reach, in
+# seconds
+SERVICE_TIME: float = 1.
+# Improving passes of 2-opt to make at most, each one trying every segment reversal
+MAX_PASSES: int = 20
+
+
+def transition_costs(
+        state: RobotState,
+        goals: List[Goal],
+        rotation_limits: Optional[RotationLimits] = None,
+        arm_limits: Optional[ArmLimits] = None
+) -> np.ndarray:
+    """
+    Estimates the travel time between every pair of poses a robot passes through while working on
+    the goals. Node 0 is the robot's starting state and node i + 1 is the pose it ends in after
+    goals[i], reached from the starting state with the robot's own choice of facing and joint
+    solution, see expected_pose. The estimates are the same rotation plans and joint move times used
+    to assign goals
+    Args:
+        state: where the robot will be before it starts on the goals
+        goals: the goals to be sequenced
+        rotation_limits: the physical limits of the robot's base. Defaults to RotationLimits()
+        arm_limits: the physical limits of the robot's arm. Defaults to ArmLimits()
+
+    Returns: a (goals + 1 x goals + 1) matrix whose [i, j] entry is the time to travel from node i
+        to node j
+    """
+    rotation_limits = rotation_limits or RotationLimits()
+    arm_limits = arm_limits or ArmLimits()
+    nodes = [state]
+    for goal in goals:
+        angle, theta_0, theta_1 = expected_pose(goal, state, arm_limits)
+        nodes.append(RobotState(state.robot_id, angle, theta_0, theta_1))
+    costs = np.zeros((len(nodes), len(nodes)))
+    costs[:, 1:] = travel_costs(nodes, goals, rotation_limits, arm_limits).T
+    return costs
+
+
+def sequence_goals(
+        state: RobotState,
+        goals: List[Goal],
+        deadlines: Optional[Sequence[Optional[float]]] = None,
+        rotation_limits: Optional[RotationLimits] = None,
+        arm_limits: Optional[ArmLimits] = None,
+        service_time: float = SERVICE_TIME,
+        max_passes: int = MAX_PASSES
+) -> List[int]:
+    """
+    Orders a robot's goals to minimize its total travel time. Builds a nearest neighbour tour from
+    the robot's starting state, then improves it with 2-opt segment reversals.
+    With deadlines, the starting tour is whichever of nearest neighbour and earliest deadline first
+    misses the deadlines by less in total, and 2-opt only keeps reversals that do not make them miss
+    by more.
+    Args:
+        state: where the robot will be before it starts on the goals
+        goals: the goals to be sequenced
+        deadlines: an optional deadline for each goal, in seconds from now. None means the goal has
+            no deadline
+        rotation_limits: the physical limits of the robot's base. Defaults to RotationLimits()
+        arm_limits: the physical limits of the robot's arm. Defaults to ArmLimits()
+        service_time: the time spent at each goal besides travelling to it
+        max_passes: the most improving passes of 2-opt to make
+
+    Returns: the indices of the goals, in the order they should be reached
+    """
+    if len(goals) < 2:
+        return list(range(len(goals)))
+    costs = transition_costs(state, goals, rotation_limits, arm_limits)
+    due = None
+    if deadlines is not None:
+        due = np.array(
+            [np.inf if deadline is None else deadline for deadline in deadlines], dtype=float
+        )
+        if np.isinf(due).all():
+            due = None
+
+    tour = _nearest_neighbour(costs)
+    if due is not None:
+        earliest_due = np.concatenate([[0], np.argsort(due, kind="stable") + 1])
+        late_by = _lateness(costs, earliest_due, due, service_time)
+        if late_by < _lateness(costs, tour, due, service_time):
+            tour = earliest_due
+    tour = _two_opt(costs, tour, due, service_time, max_passes)
+    return [int(node) - 1 for node in tour[1:]]
+
+
+def _nearest_neighbour(costs: np.ndarray) -> np.ndarray:
+    """
+    Builds a tour from node 0 by always moving to the closest node not yet visited
+    Args:
+        costs: the transition costs between nodes
+
+    Returns: the nodes in the order they are visited, starting with 0
+    """
+    tour = [0]
+    unvisited = np.ones(len(costs), dtype=bool)
+    unvisited[0] = False
+    for _ in range(len(costs) - 1):
+        node = int(np.argmin(np.where(unvisited, costs[tour[-1]], np.inf)))
+        unvisited[node] = False
+        tour.append(node)
+    return np.array(tour)
+
+
+def _lateness(costs: np.ndarray, tour: np.ndarray, due: np.ndarray, service_time: float) -> float:
+    """
+    The total time by which the goals in the tour are expected to miss their deadlines
+    """
+    finish = np.cumsum(costs[tour[:-1], tour[1:]] + service_time)
+    return float(np.maximum(finish - due[tour[1:] - 1], 0.).sum())
+
+
+def _two_opt(
+        costs: np.ndarray,
+        tour: np.ndarray,
+        due: Optional[np.ndarray],
+        service_time: float,
+        max_passes: int
+) -> np.ndarray:
+    """
+    Improves an open tour by reversing segments of it until no reversal shortens it. The costs need
+    not be symmetric: the edges inside a reversed segment are re-priced in the opposite direction
+    using prefix sums, so every candidate reversal is scored in constant time. With deadlines, a
+    reversal is only kept if it does not make any deadline miss by more in total
+    Args:
+        costs: the transition costs between nodes
+        tour: the starting tour, beginning with node 0, which stays in place
+        due: the deadline of each goal, or None
+        service_time: the time spent at each goal besides travelling to it
+        max_passes: the most improving passes to make
+
+    Returns: the improved tour
+    """
+    tour = tour.copy()
+    last = len(tour) - 1
+    lateness = _lateness(costs, tour, due, service_time) if due is not None else 0.
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, last):
+            forward = np.concatenate([[0.], np.cumsum(costs[tour[:-1], tour[1:]])])
+            backward = np.concatenate([[0.], np.cumsum(costs[tour[1:], tour[:-1]])])
+            j = np.arange(i + 1, last + 1)
+            after = np.minimum(j + 1, last)
+            has_next = j < last
+            delta = (
+                costs[tour[i - 1], tour[j]] - costs[tour[i - 1], tour[i]]
+                + np.where(has_next, costs[tour[i], tour[after]] - costs[tour[j], tour[after]], 0.)
+                + (backward[j] - backward[i]) - (forward[j] - forward[i])
+            )
+            for position in np.flatnonzero(delta < -1e-9)[np.argsort(delta[delta < -1e-9])]:
+                candidate = tour.copy()
+                candidate[i:j[position] + 1] = candidate[i:j[position] + 1][::-1]
+                if due is not None:
+                    candidate_lateness = _lateness(costs, candidate, due, service_time)
+                    if candidate_lateness > lateness + 1e-9:
+                        continue
+                    lateness = candidate_lateness
+                tour = candidate
+                improved = True
+                break
+        if not improved:
+            break
+    return tour
@@ -0,0 +1,165 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Type
+
+import numpy as np
+
+from gherkin.model.arm import Arm
+
+
+class ArmController(ABC):
+    """
+    Decides how a robot's arm moves towards its goal, one control tick at a time
+    """
+
+    @abstractmethod
+    def start(self, arm: Arm, goal_theta_0: float, goal_theta_1: float) -> None:
+        """
+        Prepares a move of the arm from its current joint angles to the goal
+        Args:
+            arm: the arm about to move
+            goal_theta_0: the angle joint 0 should end at
+            goal_theta_1: the angle joint 1 should end at
+
+        Returns:
+
+        """
+
+    @abstractmethod
+    def step(self, arm: Arm) -> None:
+        """
+        Moves the arm's joints by a single control tick
+        Args:
+            arm: the arm being moved
+
+        Returns:
+
+        """
+
+
+@dataclass
+class ProportionalController(ArmController):
+    """
+    Closes a fixed fraction of the remaining error on every tick. Simple, but it only converges
+    asymptotically and pays no attention to the arm's velocity and acceleration limits
+
+    Args:
+        divisor: each tick closes 1 / divisor of the remaining error
+    """
+    divisor: float = 10
+    goal_theta_0: float = 0.
+    goal_theta_1: float = 0.
+
+    def start(self, arm: Arm, goal_theta_0: float, goal_theta_1: float) -> None:
+        self.goal_theta_0 = goal_theta_0
+        self.goal_theta_1 = goal_theta_1
+
+    def step(self, arm: Arm) -> None:
+        theta_0_error = self.goal_theta_0 - arm.theta_0
+        theta_1_error = self.goal_theta_1 - arm.theta_1
+        arm.theta_0 += theta_0_error / self.divisor
+        arm.theta_1 += theta_1_error / self.divisor
+
+
+def trapezoidal_profile(
+        distance: float,
+        max_velocity: float,
+        max_acceleration: float,
+        dt: float
+) -> np.ndarray:
+    """
+    Plans the fastest move over the given distance that keeps within the velocity and acceleration
+    limits when sampled every dt. The move accelerates at the limit, cruises, and decelerates at the
+    limit, stretched so it ends exactly on a tick. Because sampling a profile can only average its
+    velocity and acceleration, the sampled positions never exceed the limits either.
+    Args:
+        distance: how far the joint has to travel, in radians
+        max_velocity: the largest velocity the move may use
+        max_acceleration: the largest acceleration the move may use
+        dt: the length of a control tick
+
+    Returns: the fraction of the distance covered at the end of each tick, ending at exactly 1
+    """
+    distance = abs(distance)
+    if distance == 0:
+        return np.ones(1)
+    if distance >= max_velocity ** 2 / max_acceleration:
+        duration = distance / max_velocity + max_velocity / max_acceleration
+    else:
+        duration = 2 * math.sqrt(distance / max_acceleration)
+    ticks = max(math.ceil(duration / dt - 1e-9), 1)
+    duration = ticks * dt
+    # Lower the cruise velocity so the same accelerations cover the distance in a whole number of
+    # ticks
+    discriminant = max_acceleration ** 2 * duration ** 2 - 4 * max_acceleration * distance
+    cruise = (max_acceleration * duration - math.sqrt(max(discriminant, 0.))) / 2
+    ramp = cruise / max_acceleration
+
+    t = np.arange(1, ticks + 1) * dt
+    position = np.where(
+        t < ramp,
+        max_acceleration * t ** 2 / 2,
+        np.where(
+            t <= duration - ramp,
+            max_acceleration * ramp ** 2 / 2 + cruise * (t - ramp),
+            distance - max_acceleration * (duration - t) ** 2 / 2
+        )
+    )
+    profile = np.clip(position / distance, 0., 1.)
+    profile[-1] = 1.
+    return profile
+
+
+@dataclass
+class TrapezoidalController(ArmController):
+    """
+    Moves the arm along a time-optimal trapezoidal profile. Both joints follow the same profile,
+    scaled to their own distance, so they arrive on the same tick and the goal is hit exactly in the
+    fewest ticks the limits allow.
+
+    Args:
+        margin: the fraction of the arm's velocity and acceleration limits the profile may use,
+            leaving headroom for the strict limit checks and floating point error
+    """
+    margin: float = 0.95
+    _start_theta_0: float = field(init=False, default=0.)
+    _start_theta_1: float = field(init=False, default=0.)
+    _distance_0: float = field(init=False, default=0.)
+    _distance_1: float = field(init=False, default=0.)
+    _profile: np.ndarray = field(init=False, default_factory=lambda: np.ones(1))
+    _tick: int = field(init=False, default=0)
+
+    def start(self, arm: Arm, goal_theta_0: float, goal_theta_1: float) -> None:
+        self._start_theta_0, self._start_theta_1 = arm.theta_0, arm.theta_1
+        self._distance_0 = goal_theta_0 - arm.theta_0
+        self._distance_1 = goal_theta_1 - arm.theta_1
+        self._profile = trapezoidal_profile(
+            max(abs(self._distance_0), abs(self._distance_1)),
+            arm.limits.MAX_VELOCITY * self.margin,
+            arm.limits.MAX_ACCELERATION * self.margin,
+            arm.limits.DT
+        )
+        self._tick = 0
+
+    @property
+    def ticks(self) -> int:
+        """
+
+        Returns: The number of ticks the planned move takes
+        """
+        return len(self._profile)
+
+    def step(self, arm: Arm) -> None:
+        if self._tick >= len(self._profile):
+            return
+        fraction = float(self._profile[self._tick])
+        arm.theta_0 = self._start_theta_0 + self._distance_0 * fraction
+        arm.theta_1 = self._start_theta_1 + self._distance_1 * fraction
+        self._tick += 1
+
+
+CONTROLLERS: Dict[str, Type[ArmController]] = {
+    "proportional": ProportionalController,
+    "trapezoidal": TrapezoidalController,
+}
@@ -0,0 +1,223 @@
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from gherkin.common import ELBOW
+from gherkin.model.arm import Arm
+
+# The elbow configuration stored at each index of a table's third axis
+ELBOWS: Tuple[ELBOW, ELBOW] = (ELBOW.DOWN, ELBOW.UP)
+# Points closer than this many pixels to the edge of the workspace are solved exactly instead of
+# interpolated, since the joint angles change too quickly there for a 1 pixel grid to interpolate
+# within the success tolerance
+INTERPOLATION_MARGIN: float = 2.
+
+_TABLES: Dict[Tuple[float, float], "WorkspaceTable"] = {}
+# Robots that start together would otherwise each build the same table, and race to write its file
+_TABLES_LOCK = threading.Lock()
+
+
+def solve_inverse(
+        link_1: float,
+        link_2: float,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        elbow: ELBOW = ELBOW.DOWN
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the joint angles of an arm with the given links for many end positions at once, see
+    Arm.inverse_batch
+    Returns: the angles of joint 0 and joint 1, NaN wherever the position is out of reach
+    """
+    theta_0s, theta_1s, valid = Arm.inverse_batch(xs, ys, elbow, link_1, link_2)
+    return np.where(valid, theta_0s, np.nan), np.where(valid, theta_1s, np.nan)
+
+
+@dataclass
+class WorkspaceTable:
+    """
+    The inverse kinematics of an arm, solved ahead of time for every integer pixel of its workspace.
+    Since goals have integer coordinates, validating a goal and finding its joint angles become a
+    single array lookup.
+
+    Args:
+        link_1: the length of the first link the table was built for
+        link_2: the length of the second link the table was built for
+        radius: the table covers every point with |x| and |y| up to radius
+        solutions: a (2 * radius + 1 x 2 * radius + 1 x 2 x 2) float32 array, indexed by
+            [y + radius, x + radius, elbow, joint], holding theta_0 and theta_1 for both elbow
+            configurations, see ELBOWS. Points out of reach hold NaN
+    """
+    link_1: float
+    link_2: float
+    radius: int
+    solutions: np.ndarray
+
+    @classmethod
+    def build(cls, link_1: float, link_2: float, path: Optional[str] = None) -> "WorkspaceTable":
+        """
+        Solves the whole workspace of an arm with the given links
+        Args:
+            link_1: the length of the first link
+            link_2: the length of the second link
+            path: an optional .npy file to write the table to, so it can later be memory-mapped with
+                load
+
+        Returns: the table
+        """
+        radius = int(math.ceil(link_1 + link_2))
+        shape = (2 * radius + 1, 2 * radius + 1, len(ELBOWS), 2)
+        solutions: np.ndarray
+        if path:
+            solutions = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+        else:
+            solutions = np.empty(shape, dtype=np.float32)
+        ys, xs = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        for index, elbow in enumerate(ELBOWS):
+            theta_0s, theta_1s = solve_inverse(link_1, link_2, xs, ys, elbow)
+            solutions[:, :, index, 0], solutions[:, :, index, 1] = theta_0s, theta_1s
+        if isinstance(solutions, np.memmap):
+            solutions.flush()
+        return cls(link_1, link_2, radius, solutions)
+
+    @classmethod
+    def load(cls, link_1: float, link_2: float, path: str) -> "WorkspaceTable":
+        """
+        Memory-maps a table written by build, so only the pages that are looked up are ever read
+        Args:
+            link_1: the length of the first link the table was built for
+            link_2: the length of the second link the table was built for
+            path: the .npy file holding the table
+
+        Returns: the table
+        """
+        solutions = np.load(path, mmap_mode="r")
+        return cls(link_1, link_2, (solutions.shape[0] - 1) // 2, solutions)
+
+    def reachable(self, x: float, y: float) -> bool:
+        """
+        Check whether the arm can reach the given position
+        """
+        cell = self._cell(x, y)
+        if cell:
+            return not math.isnan(self.solutions.item(cell[0], cell[1], 0, 0))
+        return abs(self.link_1 - self.link_2) <= math.hypot(x, y) <= self.link_1 + self.link_2
+
+    def reachable_batch(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Check which of many positions the arm can reach
+        Args:
+            xs: the x positions of the end of the links
+            ys: the y positions of the end of the links
+
+        Returns: a mask of the reachable positions
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        on_grid = (xs == np.round(xs)) & (ys == np.round(ys)) & (np.abs(xs) <= self.radius) & \
+            (np.abs(ys) <= self.radius)
+        columns = np.where(on_grid, xs, 0).astype(int) + self.radius
+        rows = np.where(on_grid, ys, 0).astype(int) + self.radius
+        distance = np.hypot(xs, ys)
+        reachable: np.ndarray = np.where(
+            on_grid,
+            ~np.isnan(self.solutions[rows, columns, 0, 0]),
+            (abs(self.link_1 - self.link_2) <= distance) & (distance <= self.link_1 + self.link_2)
+        )
+        return reachable
+
+    def lookup(self, x: float, y: float, elbow: ELBOW = ELBOW.DOWN) -> Tuple[float, float]:
+        """
+        Finds the joint angles that put the end of the links at the given position. Integer
+        positions are read straight from the table. Others are interpolated between the four
+        surrounding entries, or solved exactly near the edge of the workspace and wherever theta_0
+        wraps between the entries
+        Args:
+            x: the x position of the end of the links
+            y: the y position of the end of the links
+            elbow: which of the two solutions to find
+
+        Raises:
+            ValueError: if the position is outside of the arm's reachable workspace
+
+        Returns: the angles of joint 0 and joint 1
+        """
+        index = ELBOWS.index(elbow)
+        cell = self._cell(x, y)
+        if cell:
+            theta_0 = self.solutions.item(cell[0], cell[1], index, 0)
+            theta_1 = self.solutions.item(cell[0], cell[1], index, 1)
+        else:
+            theta_0, theta_1 = self._interpolate(x, y, index)
+        if math.isnan(theta_0):
+            raise ValueError(f"Position ({x}, {y}) is outside of the arm's reachable workspace")
+        return theta_0, theta_1
+
+    def _cell(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """
+        Finds the table entry for an integer position. Reading single entries with item, rather than
+        indexing, keeps a lookup cheaper than solving the position with trig
+        Returns: the row and column of the entry, or None if the position is not an integer one
+            inside the table
+        """
+        if type(x) is not int or type(y) is not int:
+            if not (float(x).is_integer() and float(y).is_integer()):
+                return None
+            x, y = int(x), int(y)
+        if -self.radius <= x <= self.radius and -self.radius <= y <= self.radius:
+            return y + self.radius, x + self.radius
+        return None
+
+    def _interpolate(self, x: float, y: float, index: int) -> Tuple[float, float]:
+        distance = math.hypot(x, y)
+        inner, outer = abs(self.link_1 - self.link_2), self.link_1 + self.link_2
+        if inner + INTERPOLATION_MARGIN <= distance <= outer - INTERPOLATION_MARGIN:
+            column, row = int(math.floor(x)) + self.radius, int(math.floor(y)) + self.radius
+            corners = self.solutions[row:row + 2, column:column + 2, index]
+            if np.ptp(corners[:, :, 0]) < math.pi:
+                fx, fy = x - math.floor(x), y - math.floor(y)
+                weights = np.array([[(1 - fx) * (1 - fy), fx * (1 - fy)], [(1 - fx) * fy, fx * fy]])
+                theta_0, theta_1 = (corners * weights[:, :, np.newaxis]).sum(axis=(0, 1))
+                return float(theta_0), float(theta_1)
+        theta_0s, theta_1s = solve_inverse(
+            self.link_1, self.link_2, np.array([x]), np.array([y]), ELBOWS[index]
+        )
+        return float(theta_0s[0]), float(theta_1s[0])
+
+
+def workspace_table(
+        link_1: float,
+        link_2: float,
+        directory: Optional[str] = None
+) -> WorkspaceTable:
+    """
+    Returns the table for an arm with the given links, building it on first use. Tables are cached
+    per pair of link lengths, so an arm whose links change simply gets the table that matches its
+    new lengths.
+    Args:
+        link_1: the length of the first link
+        link_2: the length of the second link
+        directory: an optional directory to keep the table in as a .npy file, memory-mapped by every
+            process that asks for the same links instead of being rebuilt
+
+    Returns: the table
+    """
+    key = (float(link_1), float(link_2))
+    with _TABLES_LOCK:
+        table = _TABLES.get(key)
+        if table is None:
+            if directory:
+                path = os.path.join(directory, f"workspace-{link_1:g}-{link_2:g}.npy")
+                if os.path.exists(path):
+                    table = WorkspaceTable.load(link_1, link_2, path)
+                else:
+                    os.makedirs(directory, exist_ok=True)
+                    table = WorkspaceTable.build(link_1, link_2, path)
+            else:
+                table = WorkspaceTable.build(link_1, link_2)
+            _TABLES[key] = table
+        return table
@@ -0,0 +1,4 @@
+from gherkin.service.client import run_load
+from gherkin.service.server import GoalServer, serve
+
+__all__ = ["GoalServer", "run_load", "serve"]
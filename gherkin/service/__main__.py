@@ -0,0 +1,102 @@
+"""
+A goal ingestion server for a local fleet, and a load generator to measure it. Start a server with
+
+    $ python -m gherkin.service serve unix:/tmp/gherkin.sock --robots 4
+
+and drive it from another terminal with
+
+    $ python -m gherkin.service load unix:/tmp/gherkin.sock --goals 10000
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from gherkin.common import RealTimeClock, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.async_fleet import ActorBackend, AsyncFleetManager, EngineBackend, FleetBackend
+from gherkin.model.engine import FleetEngine
+from gherkin.model.fleet_manager import FleetManager
+from gherkin.service.client import run_load
+from gherkin.service.server import serve
+from gherkin.util import generate_random_goals
+from gherkin.util.utilities import GOAL_SHAPES
+
+
+def build_backend(num_robots: int, engine: bool = False, realtime: bool = False) -> FleetBackend:
+    """
+    Builds the fleet a server submits its goals to
+    Args:
+        num_robots: how many robots are in the fleet
+        engine: whether to simulate the fleet with the lock-step engine rather than robot actors
+        realtime: whether robot actors wait on the wall clock rather than a virtual clock
+
+    Returns: the back end
+    """
+    if engine:
+        return EngineBackend(FleetEngine(num_robots))
+    start = datetime.now()
+    robots = [
+        Robot.start(i, clock=RealTimeClock() if realtime else VirtualClock(start)).proxy()
+        for i in range(num_robots)
+    ]
+    return ActorBackend(FleetManager(robots, None))
+
+
+async def run_server(address: str, backend: FleetBackend) -> None:
+    async with AsyncFleetManager(backend) as manager:
+        server = await serve(manager, address)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m gherkin.service", description="Serve goals to a local fleet"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="accept goals and stream results back")
+    serve_parser.add_argument("address", help="unix:PATH or HOST:PORT")
+    serve_parser.add_argument(
+        "--robots", type=int, default=4, help="how many robots are in the fleet"
+    )
+    serve_parser.add_argument(
+        "--engine", action="store_true", help="simulate the fleet with the lock-step engine"
+    )
+    serve_parser.add_argument(
+        "--realtime", action="store_true", help="have robot actors wait on the wall clock"
+    )
+    load_parser = commands.add_parser(
+        "load", help="send random goals and measure throughput and latency"
+    )
+    load_parser.add_argument("address", help="unix:PATH or HOST:PORT")
+    load_parser.add_argument("--goals", type=int, default=10_000, help="how many goals to send")
+    load_parser.add_argument(
+        "--batch", type=int, default=64, help="how many goals to pack into each frame"
+    )
+    load_parser.add_argument(
+        "--rate", type=float, help="goals per second to send at, as fast as possible by default"
+    )
+    load_parser.add_argument(
+        "--shape", choices=GOAL_SHAPES, default="uniform", help="the workload to generate"
+    )
+    load_parser.add_argument(
+        "--seed", type=int, help="seed for the goals, so a load test can be repeated exactly"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        backend = build_backend(args.robots, args.engine, args.realtime)
+        print(f"Serving goals on {args.address}", flush=True)
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(run_server(args.address, backend))
+    else:
+        goals = generate_random_goals(args.goals, args.seed, args.shape)
+        report = asyncio.run(run_load(args.address, goals, args.batch, args.rate))
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
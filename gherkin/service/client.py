@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from gherkin.common import Goal, Histogram
+from gherkin.service.protocol import (
+    GOALS, RESULTS, encode_frame, goal_records, open_connection, read_frame
+)
+
+
+async def run_load(
+        address: str,
+        goals: List[Goal],
+        batch_size: int = 64,
+        rate: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Sends goals to a GoalServer over a single connection and measures the fleet end to end, from
+    the moment each goal is written to the moment its result is read back
+    Args:
+        address: where the server listens, see gherkin.service.protocol.parse_address
+        goals: the goals to send
+        batch_size: how many goals to pack into each frame
+        rate: the goals per second to send at. As fast as the server accepts them when None
+
+    Returns: the number of goals and failures, the wall time, the sustained goals per second, and
+        the latency percentiles in milliseconds
+    """
+    reader, writer = await open_connection(address)
+    sent_at = np.zeros(len(goals))
+    latencies: Histogram = Histogram()
+    failures = 0
+
+    async def receive() -> None:
+        nonlocal failures
+        received = 0
+        while received < len(goals):
+            frame = await read_frame(reader)
+            if frame is None:
+                raise ConnectionError(
+                    f"Server closed the connection after {received} of {len(goals)} results"
+                )
+            kind, records = frame
+            if kind != RESULTS:
+                raise ValueError(f"Expected a frame of results, but got kind {kind}")
+            now = time.perf_counter()
+            for latency in now - sent_at[records["request_id"]]:
+                latencies.record(latency)
+            failures += int((~records["success"]).sum())
+            received += len(records)
+
+    receiver = asyncio.ensure_future(receive())
+    start = time.perf_counter()
+    for first in range(0, len(goals), batch_size):
+        batch = goals[first:first + batch_size]
+        if rate:
+            await asyncio.sleep(max(start + first / rate - time.perf_counter(), 0))
+        sent_at[first:first + len(batch)] = time.perf_counter()
+        request_ids = list(range(first, first + len(batch)))
+        writer.write(encode_frame(GOALS, goal_records(request_ids, batch)))
+        await writer.drain()
+    await receiver
+    wall = time.perf_counter() - start
+    writer.close()
+    summary = latencies.summary()
+    return {
+        "goals": len(goals),
+        "failures": failures,
+        "wall_s": wall,
+        "goals_per_s": len(goals) / wall,
+        "p50_ms": summary["p50"] * 1e3,
+        "p99_ms": summary["p99"] * 1e3,
+        "max_ms": summary["max"] * 1e3,
+    }
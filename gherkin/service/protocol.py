@@ -0,0 +1,162 @@
+import asyncio
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from gherkin.common import Angle, Goal, Result
+from gherkin.model.result_log import error_code
+
+# Every frame starts with its kind and the length of its payload. A payload is a run of
+# fixed-width, little endian records, so a whole batch of goals or results is packed and unpacked
+# with a single NumPy call
+HEADER = struct.Struct("<BI")
+# Kinds of frame. Clients send GOALS, the server answers with RESULTS on the same connection
+GOALS, RESULTS = 1, 2
+# The largest payload either side accepts, in bytes
+MAX_PAYLOAD: int = 16 * 1024 * 1024
+
+# A goal, tagged by the client with an id that its result echoes back
+GOAL_DTYPE = np.dtype([("request_id", "<u4"), ("x", "<i4"), ("y", "<i4"), ("angle", "<i2")])
+# The result of a goal. error holds one of the codes of gherkin.model.result_log. robot_id is wide
+# enough for a whole uuid, so no robot id in use is cut short
+RESULT_DTYPE = np.dtype([
+    ("request_id", "<u4"),
+    ("robot_id", "S36"),
+    ("success", "?"),
+    ("completed_at", "<f8"),
+    ("ticks", "<u4"),
+    ("error", "u1"),
+])
+RECORD_DTYPES = {GOALS: GOAL_DTYPE, RESULTS: RESULT_DTYPE}
+
+
+def encode_frame(kind: int, records: np.ndarray) -> bytes:
+    """
+    Packs records into a single frame
+    Args:
+        kind: GOALS or RESULTS
+        records: an array of the kind's records
+
+    Returns: the frame, ready to be written to a socket
+    """
+    payload = records.astype(RECORD_DTYPES[kind], copy=False).tobytes()
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def decode_payload(kind: int, payload: bytes) -> np.ndarray:
+    """
+    Unpacks the records of a frame
+    Args:
+        kind: the kind of frame
+        payload: the bytes that followed the header
+
+    Raises:
+        ValueError: if the kind is unknown or the payload does not hold a whole number of records
+
+    Returns: the records
+    """
+    dtype = RECORD_DTYPES.get(kind)
+    if dtype is None:
+        raise ValueError(f"Unknown frame kind {kind}")
+    if len(payload) % dtype.itemsize:
+        raise ValueError(
+            f"A payload of {len(payload)} bytes does not hold whole records of "
+            f"{dtype.itemsize} bytes"
+        )
+    return np.frombuffer(payload, dtype=dtype)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[int, np.ndarray]]:
+    """
+    Reads the next frame from a connection
+    Args:
+        reader: the connection
+
+    Raises:
+        ValueError: if the frame is malformed or larger than MAX_PAYLOAD
+
+    Returns: the kind and records of the frame, or None once the other side has closed the
+        connection
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ValueError("Connection closed in the middle of a frame header")
+        return None
+    kind, length = HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ValueError(f"Frame of {length} bytes exceeds the limit of {MAX_PAYLOAD}")
+    return kind, decode_payload(kind, await reader.readexactly(length))
+
+
+def goal_records(request_ids: List[int], goals: List[Goal]) -> np.ndarray:
+    """
+    Builds GOALS records
+    Args:
+        request_ids: the id the client tags each goal with
+        goals: the goals
+
+    Returns: the records
+    """
+    records = np.zeros(len(goals), dtype=GOAL_DTYPE)
+    records["request_id"] = request_ids
+    records["x"] = [goal.x for goal in goals]
+    records["y"] = [goal.y for goal in goals]
+    records["angle"] = [goal.angle.angle for goal in goals]
+    return records
+
+
+def to_goal(record: np.void) -> Goal:
+    """
+    Turns a GOALS record back into a goal
+    """
+    return Goal(int(record["x"]), int(record["y"]), Angle(int(record["angle"])))
+
+
+def result_records(request_ids: List[int], results: List[Result]) -> np.ndarray:
+    """
+    Builds RESULTS records
+    Args:
+        request_ids: the id of the goal each result is for
+        results: the results
+
+    Returns: the records
+    """
+    records = np.zeros(len(results), dtype=RESULT_DTYPE)
+    for index, (request_id, result) in enumerate(zip(request_ids, results)):
+        records[index] = (
+            request_id, result.robot_id.encode(), result.success, result.completed_at.timestamp(),
+            result.ticks, error_code(result.error)
+        )
+    return records
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """
+    Parses where a server listens: "unix:PATH" for a Unix socket, or "HOST:PORT" for TCP
+    Args:
+        address: the address
+
+    Raises:
+        ValueError: if the address is neither
+
+    Returns: the host, port and path, with either the path or the host and port set
+    """
+    if address.startswith("unix:"):
+        return None, None, address[len("unix:"):]
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"Expected unix:PATH or HOST:PORT, but got {address}")
+    return host or "127.0.0.1", int(port), None
+
+
+async def open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Connects to a server, see parse_address
+    """
+    host, port, path = parse_address(address)
+    if path:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
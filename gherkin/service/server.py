@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import List, Set, Tuple
+
+from gherkin.common import Goal, Result
+from gherkin.model.async_fleet import AsyncFleetManager
+from gherkin.service.protocol import (
+    GOALS, RESULTS, encode_frame, parse_address, read_frame, result_records, to_goal
+)
+
+logger = logging.getLogger(__name__)
+
+# How many goals a single connection may have waiting for results before the server stops reading
+# from it
+MAX_PENDING_PER_CONNECTION: int = 1024
+
+
+class GoalServer:
+    """
+    Accepts goals from local clients and streams their results back on the same connection. Goals
+    from every connection are submitted to one AsyncFleetManager, which coalesces them into batches
+    for the fleet. Results are written back as they finish, packed together with whatever other
+    results finished while the previous write was in progress. A connection that has too many goals
+    waiting is no longer read from, so a client that outpaces the fleet is slowed down by the socket
+    itself
+
+    Args:
+        manager: the fleet manager goals are submitted to. It must already be started
+        max_pending: how many goals a single connection may have waiting for results
+    """
+
+    def __init__(
+            self,
+            manager: AsyncFleetManager,
+            max_pending: int = MAX_PENDING_PER_CONNECTION
+    ) -> None:
+        self.manager = manager
+        self.max_pending = max_pending
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves a single connection until the client closes it, then finishes every goal it sent
+        Args:
+            reader: the incoming side of the connection
+            writer: the outgoing side of the connection
+
+        Returns:
+
+        """
+        outbox: List[Tuple[int, Result]] = []
+        ready = asyncio.Event()
+        done = asyncio.Event()
+        slots = asyncio.Semaphore(self.max_pending)
+        pending: Set[asyncio.Future] = set()
+        flusher = asyncio.ensure_future(self._flush_loop(writer, outbox, ready, done))
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                kind, records = frame
+                if kind != GOALS:
+                    raise ValueError(f"Expected a frame of goals, but got kind {kind}")
+                for record in records:
+                    await slots.acquire()
+                    request_id = int(record["request_id"])
+                    task = asyncio.ensure_future(
+                        self._reach(request_id, to_goal(record), outbox, ready)
+                    )
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    task.add_done_callback(lambda _: slots.release())
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.warning("Dropping connection: %r", e)
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            done.set()
+            ready.set()
+            try:
+                await flusher
+            finally:
+                writer.close()
+
+    async def _reach(
+            self,
+            request_id: int,
+            goal: Goal,
+            outbox: List[Tuple[int, Result]],
+            ready: asyncio.Event
+    ) -> None:
+        try:
+            result = await self.manager.submit(goal)
+        except (asyncio.CancelledError, RuntimeError):
+            # The fleet shut down before the goal was reached
+            return
+        outbox.append((request_id, result))
+        ready.set()
+
+    @staticmethod
+    async def _flush_loop(
+            writer: asyncio.StreamWriter,
+            outbox: List[Tuple[int, Result]],
+            ready: asyncio.Event,
+            done: asyncio.Event
+    ) -> None:
+        """
+        Writes the finished results of a connection in as few frames as possible, until the
+        connection is done. Stops at the first failed write, logging why, since the rest of the
+        results could no longer be delivered
+        """
+        while True:
+            await ready.wait()
+            ready.clear()
+            if outbox:
+                batch = outbox[:]
+                outbox.clear()
+                request_ids, results = zip(*batch)
+                try:
+                    records = result_records(list(request_ids), list(results))
+                    writer.write(encode_frame(RESULTS, records))
+                    await writer.drain()
+                except ConnectionError as e:
+                    logger.warning("Dropping %d results of a closed connection: %r", len(batch), e)
+                    return
+                except Exception:
+                    logger.exception("Failed to write %d results", len(batch))
+                    return
+            if done.is_set() and not outbox:
+                return
+
+
+async def serve(manager: AsyncFleetManager, address: str) -> asyncio.AbstractServer:
+    """
+    Starts serving goals, see GoalServer
+    Args:
+        manager: the fleet manager goals are submitted to. It must already be started
+        address: where to listen, "unix:PATH" for a Unix socket or "HOST:PORT" for TCP
+
+    Returns: the listening server
+    """
+    server = GoalServer(manager)
+    host, port, path = parse_address(address)
+    if path:
+        return await asyncio.start_unix_server(server.handle, path=path)
+    return await asyncio.start_server(server.handle, host, port)
@@ -1,4 +1,28 @@
-from gherkin.util.utilities import generate_random_goal, generate_visualizer
-from gherkin.util.visualizer import Visualizer
+from typing import Any, List
 
-__all__ = ["generate_random_goal", "generate_visualizer", "Visualizer"]
+from gherkin.util.utilities import generate_random_goal, generate_random_goals, generate_visualizer
+
+__all__ = [
+    "generate_random_goal", "generate_random_goals", "generate_visualizer", "OffscreenVisualizer",
+    "Visualizer"
+]
+
+# The visualizers import pygame, which is slow to import, so they are only imported once they are
+# first used. Headless code, such as the simulation core and worker processes, never pays for it
+_LAZY = {
+    "OffscreenVisualizer": "gherkin.util.offscreen",
+    "Visualizer": "gherkin.util.visualizer",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
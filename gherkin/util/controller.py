@@ -2,7 +2,8 @@ import logging
 from dataclasses import dataclass, field
 from typing import Optional
 
-from gherkin.model import Goal, Robot, Rotation
+from gherkin.common import Goal, Rotation
+from gherkin.model import Robot
 
 
 
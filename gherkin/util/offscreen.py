@@ -0,0 +1,198 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+import pygame
+
+from gherkin.common import Goal
+from gherkin.model import Robot, World
+from gherkin.util.visualizer import Visualizer
+
+
+def surface_to_rgb(surface: pygame.Surface) -> np.ndarray:
+    """
+    Copies a surface into a (height x width x 3) RGB array
+    """
+    rgb: np.ndarray = pygame.surfarray.array3d(surface)
+    return np.swapaxes(rgb, 0, 1)
+
+
+class FrameSink(ABC):
+    """
+    A destination for the frames recorded by an OffscreenVisualizer
+    """
+
+    @abstractmethod
+    def write(self, surface: pygame.Surface) -> None:
+        """
+        Records a single frame
+        Args:
+            surface: the fully drawn frame
+
+        Returns:
+
+        """
+
+    def close(self) -> None:
+        """
+        Flushes anything still buffered once the recording is over
+        """
+
+
+class PngFrameSink(FrameSink):
+    """
+    Writes every frame to its own numbered PNG file in a directory
+    """
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.frames = 0
+
+    def write(self, surface: pygame.Surface) -> None:
+        pygame.image.save(surface, os.path.join(self.directory, f"frame_{self.frames:06d}.png"))
+        self.frames += 1
+
+
+class RawFrameSink(FrameSink):
+    """
+    Appends every frame to a single file as raw, tightly packed RGB bytes
+    """
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "wb")
+
+    def write(self, surface: pygame.Surface) -> None:
+        self.file.write(pygame.image.tostring(surface, "RGB"))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class MemmapFrameSink(FrameSink):
+    """
+    Writes frames into a preallocated, memory-mapped (frames x height x width x 3) uint8 file, so a
+    recording can be opened with np.memmap and sliced without loading it. Frames past the capacity
+    are dropped
+    """
+
+    def __init__(self, path: str, width: int, height: int, capacity: int) -> None:
+        self.frames = np.memmap(path, dtype=np.uint8, mode="w+", shape=(capacity, height, width, 3))
+        self.count = 0
+
+    def write(self, surface: pygame.Surface) -> None:
+        if self.count < len(self.frames):
+            self.frames[self.count] = surface_to_rgb(surface)
+            self.count += 1
+
+    def close(self) -> None:
+        self.frames.flush()
+
+
+class ArrayFrameSink(FrameSink):
+    """
+    Keeps every frame in memory as an RGB array
+    """
+
+    def __init__(self) -> None:
+        self.frames: List[np.ndarray] = []
+
+    def write(self, surface: pygame.Surface) -> None:
+        self.frames.append(surface_to_rgb(surface))
+
+
+class OffscreenVisualizer(Visualizer):
+    """
+    A visualizer for headless runs. It draws into an in-memory surface instead of a window, and
+    records frames on the robots' clocks rather than the wall clock: the sink gets one frame for
+    every 1 / fps seconds of robot time, so a recording plays back at the robots' own pace even when
+    virtual clocks run far faster than real time.
+    Robots publish their state through update_display exactly as they do with the windowed
+    Visualizer.
+    """
+
+    def __init__(self, world: World, fps: int = 30, sink: Optional[FrameSink] = None) -> None:
+        self.sink = sink
+        self.frames_written = 0
+        self._start: Optional[datetime] = None
+        self._record_lock = threading.Lock()
+        super().__init__(world, fps)
+
+    def _create_surface(self) -> pygame.Surface:
+        surface = pygame.Surface((self.world.total_width, self.world.height + 100))
+        surface.fill(self.WHITE)
+        return surface
+
+    def _create_canvas(self) -> pygame.Surface:
+        # Nothing is presented to a window, so the renderer draws straight into the surface frames
+        # are read from
+        return self.screen
+
+    def _handle_events(self) -> None:
+        pass
+
+    def _present(self, rects: List[pygame.Rect]) -> None:
+        pass
+
+    def _render_loop(self) -> None:
+        # Frames are drawn as the robots' clocks advance, see update_display, never on the wall
+        # clock
+        pass
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> bool:
+        """
+        Records every frame the robot's clock has moved past, then publishes the robot's new state
+        Args:
+            robot: the robot whose state changed
+            goal: the goal the robot is working towards
+            success: whether the robot has reached the goal
+
+        Returns: always True, as there is no window to close
+        """
+        with self._record_lock:
+            self._record_until(robot.clock.now())
+            return super().update_display(robot, goal, success)
+
+    def _record_until(self, now: datetime) -> None:
+        """
+        Writes the frames of every 1 / fps interval that ended before now. They show the state
+        published before now, repeated across any interval in which nothing moved, such as a robot
+        settling at its goal
+        Args:
+            now: the current time on the clock of the robot that is publishing
+
+        Returns:
+
+        """
+        if self._start is None:
+            self._start = now
+        frame = int((now - self._start).total_seconds() * self.fps)
+        if frame <= self.frames_written:
+            return
+        self.render_frame()
+        while self.frames_written < frame:
+            self._write_frame()
+
+    def _write_frame(self) -> None:
+        if self.sink:
+            self.sink.write(self.screen)
+        self.frames_written += 1
+
+    def frame(self) -> np.ndarray:
+        """
+
+        Returns: The current contents of the surface as a (height x width x 3) RGB array
+        """
+        return surface_to_rgb(self.screen)
+
+    def cleanup(self) -> None:
+        with self._record_lock:
+            # The frame of the last interval, which no later update will close
+            self.render_frame()
+            self._write_frame()
+        super().cleanup()
+        if self.sink:
+            self.sink.close()
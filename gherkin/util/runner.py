@@ -3,9 +3,10 @@ from dataclasses import dataclass
 
 import numpy as np
 
-from gherkin.model import DIRECTION, Goal, Robot, Rotation, SPEED, World
+from gherkin.common import DIRECTION, Goal, Rotation, SPEED
+from gherkin.model import Robot, World
 from gherkin.util.controller import Controller
-from gherkin.visuals.visualizer import Visualizer
+from gherkin.util.visualizer import Visualizer
 
 
 @dataclass()
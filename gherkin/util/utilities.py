@@ -1,8 +1,23 @@
+from typing import TYPE_CHECKING, List, Optional, Union
+
 import numpy as np
 
 from gherkin.common import Angle, Goal
 from gherkin.model import World
-from gherkin.util.visualizer import Visualizer
+from gherkin.model.arm import Arm
+
+if TYPE_CHECKING:
+    from gherkin.util.offscreen import FrameSink
+    from gherkin.util.visualizer import Visualizer
+
+
+# A goal as a record of a structured array, see generate_random_goal_array
+GOAL_DTYPE = np.dtype([("x", "<i4"), ("y", "<i4"), ("angle", "<i2")])
+# The workloads generate_random_goals can produce
+GOAL_SHAPES = ("uniform", "annulus", "clustered", "adversarial")
+# Rounding a point to integer coordinates moves it by at most this much, so radii are drawn at least
+# this far inside the reachable annulus for the rounded goal to stay reachable
+ROUNDING_MARGIN: float = np.sqrt(0.5)
 
 
 def generate_random_goal(min_radius: float, max_radius: float) -> Goal:
@@ -11,24 +26,147 @@ def generate_random_goal(min_radius: float, max_radius: float) -> Goal:
     """
     # Ensure theta is not 0
     theta = (np.random.random() + np.finfo(float).eps) * 2 * np.pi
-    # Ensure point is reachable
-    r = np.random.uniform(low=min_radius, high=max_radius)
+    # Ensure point is reachable, even once rounded to integer coordinates
+    r = np.random.uniform(low=min_radius + ROUNDING_MARGIN, high=max_radius - ROUNDING_MARGIN)
 
-    x = int(r * np.cos(theta))
-    y = int(r * np.sin(theta))
-    angle = Angle(np.random.randint(low=0, high=180))
+    x = int(round(r * np.cos(theta)))
+    y = int(round(r * np.sin(theta)))
+    angle = Angle(int(np.random.randint(low=0, high=180)))
     return Goal(x, y, angle)
 
 
-def generate_visualizer(num_robots: int):
+def generate_random_goals(
+        num_goals: int,
+        rng: Union[None, int, np.random.Generator] = None,
+        shape: str = "uniform",
+        min_radius: Optional[float] = None,
+        max_radius: Optional[float] = None,
+        clusters: int = 8,
+        spread: float = 10.
+) -> List[Goal]:
+    """
+    Generate many random goals that are reachable by the robot arm at once, from a single random
+    generator
+    Args:
+        num_goals: how many goals to generate
+        rng: the random generator, or a seed for a new one. The same seed always produces the same
+            goals
+        shape: the workload to generate, one of GOAL_SHAPES, see generate_random_goal_array
+        min_radius: the smallest radius a goal may have, the arm's minimum reachable radius by
+            default
+        max_radius: the largest radius a goal may have, the arm's maximum reachable radius by
+            default
+        clusters: how many centres clustered goals gather around
+        spread: the standard deviation of clustered goals around their centre, in pixels and degrees
+
+    Raises:
+        ValueError: if the shape is unknown
+
+    Returns: the goals, with integer coordinates and angles between 0 and 180
+    """
+    goals = generate_random_goal_array(
+        num_goals, rng, shape, min_radius, max_radius, clusters, spread
+    )
+    return [Goal(x, y, Angle(angle)) for x, y, angle in goals.tolist()]
+
+
+def generate_random_goal_array(
+        num_goals: int,
+        rng: Union[None, int, np.random.Generator] = None,
+        shape: str = "uniform",
+        min_radius: Optional[float] = None,
+        max_radius: Optional[float] = None,
+        clusters: int = 8,
+        spread: float = 10.
+) -> np.ndarray:
+    """
+    Generate many random goals that are reachable by the robot arm at once, as a structured array of
+    GOAL_DTYPE records
+    Args:
+        num_goals: how many goals to generate
+        rng: the random generator, or a seed for a new one. The same seed always produces the same
+            goals
+        shape: the workload to generate, one of GOAL_SHAPES:
+            uniform: radius and direction drawn uniformly, as generate_random_goal does
+            annulus: positions spread evenly over the area of the reachable annulus
+            clustered: positions and angles gathered around a few random centres
+            adversarial: every goal is as far as possible from the previous one, a quarter turn of
+                the base away and on the opposite side of the workspace, so every goal needs the
+                longest rotation
+        min_radius: the smallest radius a goal may have, the arm's minimum reachable radius by
+            default
+        max_radius: the largest radius a goal may have, the arm's maximum reachable radius by
+            default
+        clusters: how many centres clustered goals gather around
+        spread: the standard deviation of clustered goals around their centre, in pixels and degrees
+
+    Raises:
+        ValueError: if the shape is unknown
+
+    Returns: the goals, with integer coordinates and angles between 0 and 180
+    """
+    if shape not in GOAL_SHAPES:
+        raise ValueError(f"Expected one of {', '.join(GOAL_SHAPES)}, but got {shape}")
+    rng = np.random.default_rng(rng)
+    radius: np.ndarray
+    theta: np.ndarray
+    angle: np.ndarray
+    low = (Arm.min_reachable_radius() if min_radius is None else min_radius) + ROUNDING_MARGIN
+    high = (Arm.max_reachable_radius() if max_radius is None else max_radius) - ROUNDING_MARGIN
+
+    if shape == "uniform":
+        radius = rng.uniform(low, high, num_goals)
+        theta = rng.uniform(0, 2 * np.pi, num_goals)
+        angle = rng.integers(0, 180, num_goals)
+    elif shape == "annulus":
+        radius = np.sqrt(rng.uniform(low ** 2, high ** 2, num_goals))
+        theta = rng.uniform(0, 2 * np.pi, num_goals)
+        angle = rng.integers(0, 180, num_goals)
+    elif shape == "clustered":
+        centre = rng.integers(0, clusters, num_goals)
+        centre_radius = rng.uniform(low, high, clusters)[centre]
+        centre_theta = rng.uniform(0, 2 * np.pi, clusters)[centre]
+        x = centre_radius * np.cos(centre_theta) + rng.normal(0, spread, num_goals)
+        y = centre_radius * np.sin(centre_theta) + rng.normal(0, spread, num_goals)
+        # Keep the spread goals inside the workspace by pulling their radius back into it
+        radius = np.clip(np.hypot(x, y), low, high)
+        theta = np.arctan2(y, x)
+        centre_angle = rng.integers(0, 180, clusters)[centre]
+        angle = np.rint(centre_angle + rng.normal(0, spread, num_goals)).astype(int) % 180
+    else:
+        alternate = np.arange(num_goals) % 2
+        radius = np.where(alternate, low, high)
+        theta = rng.uniform(0, 2 * np.pi) + alternate * np.pi
+        theta = np.broadcast_to(theta, num_goals)
+        # With the base able to face a goal or its inverse, a quarter turn is the longest rotation
+        # there is
+        angle = (rng.integers(0, 180) + alternate * 90) % 180
+
+    goals = np.empty(num_goals, dtype=GOAL_DTYPE)
+    goals["x"] = np.rint(radius * np.cos(theta))
+    goals["y"] = np.rint(radius * np.sin(theta))
+    goals["angle"] = angle
+    return goals
+
+
+def generate_visualizer(
+        num_robots: int,
+        fps: int = 30,
+        offscreen: bool = False,
+        sink: Optional["FrameSink"] = None
+) -> "Visualizer":
     """
     Generates a Visualizer object with parameters based on the number of robots
     Args:
         num_robots: how many robots will be in the fleet
+        fps: how many frames per second the renderer draws at most
+        offscreen: whether to draw into memory instead of opening a window, for headless runs
+        sink: where an offscreen visualizer records its frames, fps of them per second of robot time
 
     Returns: A visualizer object built for the current problem space
     Notes:
-        Currently only scales horizontally.
+        Currently only scales horizontally. pygame is only imported here, once a visualizer is
+        actually built.
 
     """
     height = 300
@@ -36,5 +174,7 @@ def generate_visualizer(num_robots: int):
     total_width = robot_width * num_robots
     robot_origins = [(int(robot_width / 2) + (robot_width * i), int(height / 2)) for i in range(num_robots)]
     world = World(total_width, robot_width, height, robot_origins)
-    vis = Visualizer(world)
+    from gherkin.util.offscreen import OffscreenVisualizer
+    from gherkin.util.visualizer import Visualizer
+    vis: Visualizer = OffscreenVisualizer(world, fps, sink) if offscreen else Visualizer(world, fps)
     return vis
\ No newline at end of file
@@ -1,96 +1,205 @@
-from typing import Tuple
+import math
+import threading
+from typing import Dict, List, NamedTuple, Set, Tuple
 
 import pygame
-from numpy.lib import math
 
 from gherkin.common import Goal
 from gherkin.model import World, Robot
 
 
+class RobotSnapshot(NamedTuple):
+    """
+    Everything needed to draw a robot, copied out of the robot at the moment it published its state
+    """
+    offset: int
+    joint_1: Tuple[float, float]
+    joint_2: Tuple[float, float]
+    angle: int
+    goal: Tuple[int, int]
+    success: bool
+
+
 class Visualizer:
     BLACK: Tuple[int, int, int] = (0, 0, 0)
     RED: Tuple[int, int, int] = (255, 0, 0)
     GREEN: Tuple[int, int, int] = (0, 255, 0)
     WHITE: Tuple[int, int, int] = (255, 255, 255)
 
-    def __init__(self, world: World) -> None:
+    def __init__(self, world: World, fps: int = 30) -> None:
         """
         Note: while the Robot and World have the origin in the center of the
         visualization, rendering places (0, 0) in the top left corner.
+
+        Robots only publish their state through update_display. A separate renderer thread draws the
+        regions of robots whose state changed into an in-memory canvas, at most fps times a second.
+        pygame only handles events and updates the window on the main thread, so the main thread
+        presents the prepared regions in pump.
         """
         pygame.init()
         pygame.font.init()
         self.world = world
-        self.screen = pygame.display.set_mode((world.total_width, world.height + 100))
-        pygame.display.set_caption('Gherkin Challenge')
+        self.fps = fps
+        self.screen = self._create_surface()
+        self.canvas = self._create_canvas()
         self.font = pygame.font.SysFont('freesansbolf.tff', 30)
+        self.rotating_text = self.font.render('Rotating:', True, self.BLACK)
+        self.success_text = self.font.render('Success!', True, self.BLACK)
+        self.running = True
+        self._snapshots: Dict[int, RobotSnapshot] = {}
+        self._dirty: Set[int] = set()
+        self._prepared: Dict[int, pygame.Rect] = {}
+        self._lock = threading.Lock()
+        self._canvas_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._renderer = threading.Thread(target=self._render_loop, name="visualizer", daemon=True)
+        self._renderer.start()
+
+    def _create_surface(self) -> pygame.Surface:
+        screen = pygame.display.set_mode((self.world.total_width, self.world.height + 100))
+        pygame.display.set_caption('Gherkin Challenge')
+        return screen
 
-    def display_world(self, goal: Goal, offset: int) -> None:
+    def _create_canvas(self) -> pygame.Surface:
+        canvas = pygame.Surface(self.screen.get_size())
+        canvas.fill(self.WHITE)
+        return canvas
+
+    def display_world(self, goal: Tuple[int, int], offset: int) -> None:
         """
         Display the world
         """
-        goal = self.world.convert_to_display((goal.x, goal.y), offset)
-        pygame.draw.circle(self.screen, self.RED, goal, 6)
+        goal = self.world.convert_to_display(goal, offset)
+        pygame.draw.circle(self.canvas, self.RED, goal, 6)
 
-    def display_robot(self, robot: Robot) -> None:
+    def display_robot(self, snapshot: RobotSnapshot) -> None:
         """
         Display the robot
         """
-        j0 = self.world.robot_origins[robot.offset]
-        j1 = self.world.convert_to_display(robot.arm.joint_1_pos(), robot.offset)
-        j2 = self.world.convert_to_display(robot.arm.joint_2_pos(), robot.offset)
+        j0 = self.world.robot_origins[snapshot.offset]
+        j1 = self.world.convert_to_display(snapshot.joint_1, snapshot.offset)
+        j2 = self.world.convert_to_display(snapshot.joint_2, snapshot.offset)
         # Draw joint 0
-        pygame.draw.circle(self.screen, self.BLACK, j0, 4)
+        pygame.draw.circle(self.canvas, self.BLACK, j0, 4)
         # Draw link 1
-        pygame.draw.line(self.screen, self.BLACK, j0, j1, 2)
+        pygame.draw.line(self.canvas, self.BLACK, j0, j1, 2)
         # Draw joint 1
-        pygame.draw.circle(self.screen, self.BLACK, j1, 4)
+        pygame.draw.circle(self.canvas, self.BLACK, j1, 4)
         # Draw link 2
-        pygame.draw.line(self.screen, self.BLACK, j1, j2, 2)
+        pygame.draw.line(self.canvas, self.BLACK, j1, j2, 2)
         # Draw joint 2
-        pygame.draw.circle(self.screen, self.BLACK, j2, 4)
-        self.draw_rotation_indicator(robot)
+        pygame.draw.circle(self.canvas, self.BLACK, j2, 4)
+        self.draw_rotation_indicator(snapshot)
 
-    def draw_rotation_indicator(self, robot: Robot):
+    def draw_rotation_indicator(self, snapshot: RobotSnapshot) -> None:
         """
         Draws a line to show the rotation of the robot arm as if from above, to indicate the it's planar angle
         """
-        text = self.font.render('Rotating:', True, self.BLACK)
-        self.screen.blit(text, (1, self.world.height + 50))
-        center = (self.world.robot_origins[robot.offset][0], self.world.height + 60)
+        self.canvas.blit(self.rotating_text, (1, self.world.height + 50))
+        center = (self.world.robot_origins[snapshot.offset][0], self.world.height + 60)
         line_length = 35
-        x1 = center[0] + math.cos(math.radians(robot.base.angle.inverse.angle)) * line_length
-        y1 = center[1] + math.sin(math.radians(robot.base.angle.inverse.angle)) * line_length
-        x2 = center[0] + math.cos(math.radians(robot.base.angle.angle)) * line_length
-        y2 = center[1] + math.sin(math.radians(robot.base.angle.angle)) * line_length
+        inverse = (snapshot.angle + 180) % 360
+        x1 = center[0] + math.cos(math.radians(inverse)) * line_length
+        y1 = center[1] + math.sin(math.radians(inverse)) * line_length
+        x2 = center[0] + math.cos(math.radians(snapshot.angle)) * line_length
+        y2 = center[1] + math.sin(math.radians(snapshot.angle)) * line_length
         cx = (x1 + x2) / 2
         cy = (y1 + y2) / 2
-        pygame.draw.circle(self.screen, self.BLACK, (cx, cy), 4)
-        pygame.draw.line(self.screen, self.GREEN, (x1, y1), (cx, cy), 4)
-        pygame.draw.line(self.screen, self.RED, (cx, cy), (x2, y2), 4)
+        pygame.draw.circle(self.canvas, self.BLACK, (cx, cy), 4)
+        pygame.draw.line(self.canvas, self.GREEN, (x1, y1), (cx, cy), 4)
+        pygame.draw.line(self.canvas, self.RED, (cx, cy), (x2, y2), 4)
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> bool:
+        """
+        Publishes the robot's current state for the renderer to pick up. Never waits on drawing
+        Args:
+            robot: the robot whose state changed
+            goal: the goal the robot is working towards
+            success: whether the robot has reached the goal
 
-    def update_display(self, robot: Robot, goal: Goal, success: bool):
+        Returns: False once the window has been closed
+        """
+        snapshot = RobotSnapshot(
+            robot.offset, robot.arm.joint_1_pos(), robot.arm.joint_2_pos(), robot.base.angle.angle,
+            (goal.x, goal.y), success
+        )
+        with self._lock:
+            self._snapshots[robot.offset] = snapshot
+            self._dirty.add(robot.offset)
+        self.pump()
+        return self.running
+
+    def render_frame(self) -> List[pygame.Rect]:
+        """
+        Redraws the regions of every robot that published new state since the last frame into the
+        canvas, leaving them for pump to present
+        Returns: the regions that were redrawn
+
+        """
+        with self._lock:
+            snapshots = [self._snapshots[offset] for offset in self._dirty]
+            self._dirty.clear()
+
+        rects = []
+        with self._canvas_lock:
+            for snapshot in snapshots:
+                rect = pygame.Rect(
+                    self.world.robot_width * snapshot.offset, 0, self.world.robot_width,
+                    self.canvas.get_height()
+                )
+                self.canvas.fill(self.WHITE, rect)
+                self.display_world(snapshot.goal, snapshot.offset)
+                self.display_robot(snapshot)
+                if snapshot.success:
+                    origin = self.world.robot_origins[snapshot.offset]
+                    self.canvas.blit(self.success_text, (origin[0] - 55, 1))
+                rects.append(rect)
+                self._prepared[snapshot.offset] = rect
+        return rects
+
+    def pump(self) -> None:
+        """
+        Handles window events and presents the regions the renderer has prepared. pygame only allows
+        both on the main thread, so this does nothing when called from any other. Whatever runs the
+        main thread while robots work should call it regularly, which update_display does for robots
+        driven on the main thread
+        Returns:
+
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._handle_events()
+        with self._canvas_lock:
+            rects = list(self._prepared.values())
+            self._prepared.clear()
+            if rects:
+                self._present(rects)
+
+    def _handle_events(self) -> None:
         for event in pygame.event.get():
             # Keypress
             if event.type == pygame.KEYDOWN:
                 # Escape key
                 if event.key == pygame.K_ESCAPE:
-                    return False
+                    self.running = False
             # Window Close Button Clicked
             if event.type == pygame.QUIT:
-                return False
-
-        self.screen.fill(self.WHITE, (self.world.robot_width * robot.offset, 0, self.world.robot_width, self.screen.get_height()))
-
-        self.display_world(goal, robot.offset)
-
-        self.display_robot(robot)
+                self.running = False
 
-        if success:
-            text = self.font.render('Success!', True, self.BLACK)
-            self.screen.blit(text, (self.world.robot_origins[robot.offset][0]-55, 1))
+    def _present(self, rects: List[pygame.Rect]) -> None:
+        for rect in rects:
+            self.screen.blit(self.canvas, rect, rect)
+        pygame.display.update(rects)
 
-        pygame.display.flip()
+    def _render_loop(self) -> None:
+        clock = pygame.time.Clock()
+        while not self._stop.is_set():
+            self.render_frame()
+            clock.tick(self.fps)
 
     def cleanup(self) -> None:
-        pygame.quit()
\ No newline at end of file
+        self._stop.set()
+        self._renderer.join()
+        self.render_frame()
+        self.pump()
+        pygame.quit()
@@ -2,18 +2,30 @@
 main.py
 """
 import itertools
+import logging
 import pprint
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
 
 import pykka
 
+from gherkin.common import Clock, RealTimeClock, Result, RobotMetrics, VirtualClock
+from gherkin.common.metrics import summarize
 from gherkin.model import Robot
-from gherkin.model.arm import Arm
+from gherkin.model.engine import FleetEngine
 from gherkin.model.fleet_manager import FleetManager
-from gherkin.util import generate_random_goal
+from gherkin.model.process_fleet import ProcessFleetManager
+from gherkin.model.result_log import ResultLog
+from gherkin.model.trajectory import CONTROLLERS
+from gherkin.util import generate_random_goals
 from gherkin.util.utilities import generate_visualizer
 
 
 def main() -> None:
+    # Robots log every goal they receive at debug level
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("gherkin.model.robot").setLevel(logging.DEBUG)
     try:
         run_fleet(2, 8)
         #run_single(10)
@@ -24,19 +36,85 @@ def main() -> None:
         pass
 
 
-def run_fleet(num_robots: int, num_goals: int):
-    robots = [Robot.start(i).proxy() for i in range(num_robots)]
+def make_clocks(num_robots: int, realtime: bool = True) -> List[Clock]:
+    """
+    Builds one clock per robot. Virtual clocks share a start so the robots' simulated timelines
+    line up
+    Args:
+        num_robots: how many robots will be in the fleet
+        realtime: whether the robots should wait on the wall clock or advance instantly
+
+    Returns: A clock for each robot
+    """
+    if realtime:
+        return [RealTimeClock() for _ in range(num_robots)]
+    start = datetime.now()
+    return [VirtualClock(start) for _ in range(num_robots)]
+
+
+def run_fleet(
+        num_robots: int,
+        num_goals: int,
+        realtime: bool = True,
+        controller: str = "proportional",
+        concurrent_motion: bool = False,
+        result_log: Optional[str] = None,
+        metrics: bool = False,
+        seed: Optional[int] = None
+) -> None:
+    robot_metrics = [RobotMetrics() if metrics else None for _ in range(num_robots)]
+    robots = [
+        Robot.start(
+            i, clock=clock, controller=CONTROLLERS[controller](),
+            concurrent_motion=concurrent_motion, metrics=robot_metrics[i]
+        ).proxy()
+        for i, clock in enumerate(make_clocks(num_robots, realtime))
+    ]
     vis = generate_visualizer(num_robots)
-    fleet_manager = FleetManager(robots, vis)
-    fleet_manager.receive_goals(
-        [generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius()) for _ in range(num_goals)]
-    )
+    log = ResultLog(result_log, jsonl=result_log.endswith(".jsonl")) if result_log else None
+    fleet_manager = FleetManager(robots, vis, result_log=log)
+    try:
+        fleet_manager.receive_goals(generate_random_goals(num_goals, seed))
+    finally:
+        if log:
+            log.close()
+    if metrics:
+        pprint.pprint(summarize(m for m in robot_metrics if m))
+
+
+def run_engine(num_robots: int, num_goals: int, seed: Optional[int] = None) -> None:
+    engine = FleetEngine(num_robots)
+    engine.receive_goals(generate_random_goals(num_goals, seed))
+    results_dict: Dict[str, List[Result]] = defaultdict(list)
+    for result in engine.run():
+        results_dict[result.robot_id].append(result)
+    pprint.pprint(results_dict)
+
+
+def run_process_fleet(
+        num_robots: int,
+        num_goals: int,
+        realtime: bool = False,
+        seed: Optional[int] = None
+) -> None:
+    fleet_manager = ProcessFleetManager(num_robots, realtime=realtime).start()
+    fleet_manager.receive_goals(generate_random_goals(num_goals, seed))
+    results_dict: Dict[str, List[Result]] = defaultdict(list)
+    for result in fleet_manager.iter_results():
+        results_dict[result.robot_id].append(result)
+    fleet_manager.shutdown()
+    pprint.pprint(results_dict)
 
 
-def run_single(num_goals: int):
+def run_single(
+        num_goals: int,
+        realtime: bool = True,
+        controller: str = "proportional",
+        seed: Optional[int] = None
+) -> None:
     vis = generate_visualizer(1)
-    goals = [generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius()) for _ in range(num_goals)]
-    robot = Robot(0)
+    goals = generate_random_goals(num_goals, seed)
+    robot = Robot(0, clock=make_clocks(1, realtime)[0], controller=CONTROLLERS[controller]())
     for goal in goals:
         robot.reach(goal, vis)
 
@@ -0,0 +1,22 @@
+import json
+
+from benchmarks.__main__ import main
+from benchmarks.imports import MODULES
+
+
+def test_benchmarks_write_json(tmp_path):
+    output = tmp_path / "results.json"
+    main(["controller", "--quick", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert report["quick"]
+    controllers = [result["params"]["controller"] for result in report["results"]]
+    assert controllers == ["proportional"] * 2 + ["trapezoidal"] * 2
+    assert all(result["metrics"]["mean_ticks"] > 0 for result in report["results"])
+
+
+def test_headless_imports_do_not_load_pygame(tmp_path):
+    output = tmp_path / "results.json"
+    main(["imports", "--quick", "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert [result["params"]["module"] for result in report["results"]] == MODULES
+    assert not any(result["metrics"]["pygame_loaded"] for result in report["results"])
@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta
+
+from gherkin.common import VirtualClock
+
+
+def test_virtual_clock_starts_at_start():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    clock: VirtualClock = VirtualClock(start)
+    assert clock.now() == start
+
+
+def test_virtual_clock_sleep_advances_instantly():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    clock: VirtualClock = VirtualClock(start)
+    clock.sleep(1.5)
+    clock.sleep(0.5)
+    assert clock.now() == start + timedelta(seconds=2)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from gherkin.common import Histogram, RobotMetrics
+from gherkin.common.metrics import summarize
+
+
+def test_histogram_quantiles_within_precision():
+    rng = np.random.default_rng(3)
+    values = rng.exponential(0.05, size=5000)
+    histogram: Histogram = Histogram()
+    for value in values:
+        histogram.record(float(value))
+    for q in (0.5, 0.9, 0.99):
+        expected = np.quantile(values, q)
+        assert abs(histogram.quantile(q) - expected) <= expected * 0.02 + 1e-6
+    assert histogram.count == 5000
+    assert np.isclose(histogram.summary()["mean"], values.mean(), rtol=1e-3)
+    assert np.isclose(histogram.summary()["max"], values.max(), atol=1e-6)
+
+
+def test_histogram_merge():
+    first: Histogram = Histogram()
+    second: Histogram = Histogram()
+    first.record(0.001)
+    second.record(2.)
+    first.merge(second)
+    assert first.count == 2
+    assert abs(first.quantile(1.) - 2.) < 2. * 0.01
+    assert first.quantile(0.) == 0.001
+
+
+def test_summarize_fleet():
+    robots = [RobotMetrics(), RobotMetrics()]
+    robots[0].histograms["arm"].record(1.)
+    robots[1].histograms["arm"].record(3.)
+    robots[1].arm_ticks = 30
+    summary = summarize(robots)
+    assert summary["arm"]["count"] == 2
+    assert summary["ticks"]["arm"] == 30
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from gherkin.common import ELBOW
+from gherkin.model.arm import Arm, ArmLimits, JointLimitChecker, select_solution, wrap_to_limits
+
+
+def test_limit_checker_matches_history():
+    limits: ArmLimits = ArmLimits()
+    thetas = [0.1, 0.15, 0.12, 0.3, 0.31, 0.2]
+    checker: JointLimitChecker = JointLimitChecker(limits.DT)
+    for theta in thetas:
+        checker.update(theta)
+    assert np.isclose(checker.max_velocity, limits.max_velocity(thetas))
+    assert np.isclose(checker.max_acceleration, limits.max_acceleration(thetas))
+
+
+def test_limit_checker_single_sample():
+    checker: JointLimitChecker = JointLimitChecker()
+    checker.update(1.)
+    assert checker.max_velocity == 0.
+    assert checker.max_acceleration == 0.
+
+
+def test_limit_checker_reset():
+    checker: JointLimitChecker = JointLimitChecker()
+    for theta in [0., 0.1, 0.3]:
+        checker.update(theta)
+    checker.reset()
+    checker.update(5.)
+    assert checker.max_velocity == 0.
+    assert checker.max_acceleration == 0.
+
+
+def test_arm_velocity_limit_exceeded():
+    arm: Arm = Arm()
+    arm.theta_0 = 0.
+    with pytest.raises(AssertionError, match="Joint 0 Velocity"):
+        arm.theta_0 = 1.
+
+
+def test_arm_acceleration_limit_exceeded():
+    arm: Arm = Arm()
+    arm.theta_1 = 0.
+    arm.theta_1 = 0.
+    with pytest.raises(AssertionError, match="Joint 1 Accel"):
+        arm.theta_1 = 0.1
+
+
+def test_arm_reset_clears_limit_history():
+    arm: Arm = Arm()
+    arm.theta_0 = 0.
+    arm.reset()
+    arm.theta_0 = 1.
+    assert arm.theta_0 == 1.
+
+
+def test_forward_batch_matches_scalar():
+    theta_0s = np.array([0., 0.5, -1.2, 3.])
+    theta_1s = np.array([0.3, 1.1, 2.5, -0.7])
+    xs, ys = Arm.forward_batch(theta_0s, theta_1s)
+    for theta_0, theta_1, x, y in zip(theta_0s, theta_1s, xs, ys):
+        assert np.allclose(Arm.forward(theta_0, theta_1), (x, y))
+
+
+def test_inverse_batch_matches_scalar():
+    xs = np.array([50., -30., 100., 0.])
+    ys = np.array([50., 80., -20., -60.])
+    theta_0s, theta_1s, valid = Arm.inverse_batch(xs, ys)
+    assert valid.all()
+    for x, y, theta_0, theta_1 in zip(xs, ys, theta_0s, theta_1s):
+        assert np.allclose(Arm.inverse(x, y), (theta_0, theta_1))
+
+
+def test_inverse_batch_masks_unreachable():
+    xs = np.array([0., 50., 200.])
+    ys = np.array([10., 50., 0.])
+    theta_0s, theta_1s, valid = Arm.inverse_batch(xs, ys)
+    assert valid.tolist() == [False, True, False]
+    assert not np.isnan(theta_0s).any()
+    assert not np.isnan(theta_1s).any()
+
+
+def test_inverse_unreachable_raises():
+    with pytest.raises(ValueError):
+        Arm.inverse(200., 0.)
+
+
+def test_inverse_solutions_reach_the_same_point():
+    solutions = Arm.inverse_solutions(-80, 30)
+    assert solutions[ELBOW.DOWN] == Arm.inverse(-80, 30)
+    assert solutions[ELBOW.UP][1] == -solutions[ELBOW.DOWN][1]
+    for theta_0, theta_1 in solutions.values():
+        assert np.allclose(Arm.forward(theta_0, theta_1), (-80, 30))
+
+
+def test_wrap_to_limits_takes_the_closest_turn():
+    limits: ArmLimits = ArmLimits()
+    assert np.isclose(wrap_to_limits(-3., 3., limits), -3. + 2 * np.pi)
+    assert wrap_to_limits(1., 0.5, limits) == 1.
+    assert np.isclose(wrap_to_limits(6., 0., limits), 6. - 2 * np.pi)
+
+
+def test_select_solution_prefers_the_closer_elbow():
+    limits: ArmLimits = ArmLimits()
+    solutions = Arm.inverse_solutions(-80, 30)
+    up_theta_0, up_theta_1 = solutions[ELBOW.UP]
+    theta_0, theta_1 = select_solution(
+        solutions.values(), up_theta_0 + 0.1, up_theta_1 - 0.1, limits
+    )
+    assert np.isclose(theta_0, up_theta_0) and np.isclose(theta_1, up_theta_1)
+
+
+def test_fastest_inverse_never_moves_further():
+    arm: Arm = Arm(_theta_0=2.5, _theta_1=-1.)
+    for x, y in [(-80, 30), (50, 50), (10, -100), (-60, -60)]:
+        theta_0, theta_1 = arm.fastest_inverse(x, y)
+        down_theta_0, down_theta_1 = Arm.inverse(x, y)
+        assert np.allclose(Arm.forward(theta_0, theta_1), (x, y))
+        elbow_down_move = max(abs(down_theta_0 - 2.5), abs(down_theta_1 + 1.))
+        assert max(abs(theta_0 - 2.5), abs(theta_1 + 1.)) <= elbow_down_move
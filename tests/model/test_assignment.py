@@ -0,0 +1,96 @@
+import itertools
+from typing import List
+
+import numpy as np
+
+from gherkin.common import Angle, Goal, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.arm import Arm, ArmLimits, select_solution
+from gherkin.model.assignment import (
+    RobotState, assign_goals, estimate_rotation_time, expected_pose, solve_assignment, travel_costs
+)
+from gherkin.model.base import RotationLimits
+
+
+def test_solve_assignment_matches_brute_force():
+    rng = np.random.default_rng(7)
+    cost = rng.random((4, 6))
+    best = min(
+        itertools.permutations(range(6), 4),
+        key=lambda columns: sum(cost[row, column] for row, column in enumerate(columns))
+    )
+    assignment = solve_assignment(cost)
+    best_cost = sum(cost[row, column] for row, column in enumerate(best))
+    assert np.isclose(cost[np.arange(4), assignment].sum(), best_cost)
+    assert len(set(assignment.tolist())) == 4
+
+
+def test_estimate_rotation_time_uses_inverse_angle():
+    limits: RotationLimits = RotationLimits()
+    assert estimate_rotation_time(Angle(0), Angle(180), limits) == 0
+    inverse: float = estimate_rotation_time(Angle(0), Angle(8), limits)
+    assert estimate_rotation_time(Angle(0), Angle(172), limits) == inverse
+    assert estimate_rotation_time(Angle(0), Angle(7), limits) == 3 * limits.DT
+
+
+def test_travel_costs_match_rotation_plans():
+    goals: List[Goal] = [Goal(x=0, y=50, angle=Angle(angle)) for angle in range(0, 360, 7)]
+    states: List[RobotState] = [
+        RobotState(str(angle), angle=Angle(angle)) for angle in range(0, 360, 13)
+    ]
+    arm_limits: ArmLimits = ArmLimits()
+    # Every goal is at x = 0, so whichever way a robot faces it, the arm makes the same move from
+    # the rest pose
+    theta_0, theta_1 = select_solution(Arm.inverse_solutions(0, 50).values(), 0., 0., arm_limits)
+    arm_time = max(arm_limits.move_time(theta_0), arm_limits.move_time(theta_1))
+    costs = travel_costs(states, goals, RotationLimits(), arm_limits)
+    expected = [
+        [
+            estimate_rotation_time(state.angle, goal.angle, RotationLimits()) + arm_time
+            for state in states
+        ]
+        for goal in goals
+    ]
+    assert np.allclose(costs, expected)
+
+
+def test_expected_pose_matches_robot():
+    robot: Robot = Robot(0, clock=VirtualClock())
+    for goal in [Goal(x=-80, y=30, angle=Angle(170)), Goal(x=10, y=-100, angle=Angle(275))]:
+        start: RobotState = RobotState("0", robot.base.angle, robot.arm.theta_0, robot.arm.theta_1)
+        angle, theta_0, theta_1 = expected_pose(goal, start)
+        assert robot.reach(goal, settle=False).success
+        assert angle == robot.base.angle
+        assert np.allclose((theta_0, theta_1), (robot.arm.theta_0, robot.arm.theta_1), atol=0.05)
+
+
+def test_expected_pose_of_unreachable_goal_keeps_start():
+    start: RobotState = RobotState("0", Angle(30), 0.5, 1.)
+    assert expected_pose(Goal(x=200, y=0, angle=Angle(90)), start) == (Angle(30), 0.5, 1.)
+
+
+def test_assign_goals_uses_idle_robots():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)), Goal(x=60, y=40, angle=Angle(12))]
+    states: List[RobotState] = [RobotState("1"), RobotState("2")]
+    assert sorted(assign_goals(states, goals)) == ["1", "2"]
+
+
+def test_assign_goals_prefers_closer_robot():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(90))]
+    states: List[RobotState] = [RobotState("1", angle=Angle(0)), RobotState("2", angle=Angle(85))]
+    assert assign_goals(states, goals) == ["2"]
+
+
+def test_assign_goals_avoids_long_queue():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(90))]
+    states: List[RobotState] = [
+        RobotState("1", angle=Angle(0)), RobotState("2", angle=Angle(90), queued=5)
+    ]
+    assert assign_goals(states, goals) == ["1"]
+
+
+def test_assign_goals_greedy_fallback_balances():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)) for _ in range(6)]
+    states: List[RobotState] = [RobotState("1"), RobotState("2"), RobotState("3")]
+    assignment: List[str] = assign_goals(states, goals, max_optimal_cells=0)
+    assert sorted(assignment) == ["1", "1", "2", "2", "3", "3"]
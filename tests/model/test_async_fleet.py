@@ -0,0 +1,162 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Tuple
+
+import pykka
+import pytest
+
+from gherkin.common import Angle, Goal, RealTimeClock, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.async_fleet import (
+    ActorBackend, AsyncFleetManager, Dispatched, EngineBackend, FleetBackend
+)
+from gherkin.model.engine import FleetEngine
+from gherkin.model.fleet_manager import FleetManager
+
+GOALS: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)), Goal(x=60, y=40, angle=Angle(40)),
+                     Goal(x=-70, y=30, angle=Angle(90)), Goal(x=55, y=-45, angle=Angle(150)),
+                     Goal(x=80, y=-20, angle=Angle(100)), Goal(x=-60, y=40, angle=Angle(30))]
+
+
+class StalledBackend(FleetBackend):
+    """
+    Accepts goals but never finishes any of them
+    """
+
+    def __init__(self) -> None:
+        self.dispatched: List[Goal] = []
+
+    def start(self, on_result: Callable[[Result], None]) -> None:
+        pass
+
+    def dispatch(self, goals: List[Goal]) -> Dispatched:
+        self.dispatched.extend(goals)
+        return {"1": list(range(len(goals)))}, []
+
+    def stop(self) -> None:
+        pass
+
+
+def test_engine_backend_results_match_submissions():
+    async def run() -> List[Result]:
+        backend = EngineBackend(FleetEngine(2, ids=["1", "2"]))
+        async with AsyncFleetManager(backend, batch_size=4) as manager:
+            return await asyncio.gather(*(manager.submit(goal) for goal in GOALS))
+
+    results: List[Result] = asyncio.run(run())
+    assert all(result.success for result in results)
+    # Results carry the goal after the robot adjusted it for the way its base faces, so compare the
+    # y coordinates
+    assert [result.goal.y for result in results] == [goal.y for goal in GOALS]
+
+
+def test_actor_backend_results_match_submissions():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robots = [Robot.start(offset=i, id=str(i), clock=VirtualClock(start)).proxy() for i in range(2)]
+
+    async def run() -> List[Result]:
+        backend = ActorBackend(FleetManager(robots=robots, visualizer=None))
+        async with AsyncFleetManager(backend, batch_size=3) as manager:
+            submissions = GOALS + [Goal(x=0, y=0, angle=Angle(0))]
+            results = await asyncio.gather(*(manager.submit(goal) for goal in submissions))
+        return results
+
+    results: List[Result] = asyncio.run(run())
+    pykka.ActorRegistry.stop_all()
+    assert all(result.success for result in results[:-1])
+    assert [result.goal.y for result in results[:-1]] == [goal.y for goal in GOALS]
+    assert isinstance(results[-1].error, ValueError)
+
+
+def test_repeated_goal_gets_every_result():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robots = [Robot.start(offset=i, id=str(i), clock=VirtualClock(start)).proxy() for i in range(2)]
+    unreachable: Goal = Goal(x=200, y=0, angle=Angle(0))
+
+    async def run() -> List[Result]:
+        backend = ActorBackend(FleetManager(robots=robots, visualizer=None))
+        async with AsyncFleetManager(backend, batch_size=8, batch_window=0.05) as manager:
+            submissions = [GOALS[0], unreachable, GOALS[0], unreachable, GOALS[0]]
+            return await asyncio.wait_for(
+                asyncio.gather(*(manager.submit(goal) for goal in submissions)), 5
+            )
+
+    results: List[Result] = asyncio.run(run())
+    pykka.ActorRegistry.stop_all()
+    assert [result.success for result in results] == [True, False, True, False, True]
+
+
+def test_saturated_fleet_applies_backpressure():
+    backend: StalledBackend = StalledBackend()
+
+    async def run() -> None:
+        manager = AsyncFleetManager(backend, intake_size=2, max_in_flight=2, batch_window=0)
+        await manager.start()
+        submissions = [asyncio.ensure_future(manager.submit(goal)) for goal in GOALS[:5]]
+        await asyncio.sleep(0.05)
+        assert len(backend.dispatched) == 2
+        assert manager._running.intake.full()
+        assert not any(submission.done() for submission in submissions)
+        await manager.shutdown(drain=False)
+        await asyncio.sleep(0.01)
+        assert all(submission.cancelled() for submission in submissions)
+        with pytest.raises(RuntimeError):
+            await manager.submit(GOALS[0])
+
+    asyncio.run(run())
+
+
+def test_shutdown_without_drain_abandons_queued_goals():
+    # Every goal takes a couple of seconds on the wall clock, so reaching them all would take far
+    # longer
+    robots = [Robot.start(offset=i, id=str(i), clock=RealTimeClock()).proxy() for i in range(2)]
+
+    async def run() -> float:
+        backend = ActorBackend(FleetManager(robots=robots, visualizer=None, chunk_size=4))
+        manager = AsyncFleetManager(backend)
+        await manager.start()
+        submissions = [asyncio.ensure_future(manager.submit(goal)) for goal in GOALS * 4]
+        await asyncio.sleep(0.2)
+        started = time.perf_counter()
+        await manager.shutdown(drain=False)
+        assert all(submission.cancelled() for submission in submissions)
+        return time.perf_counter() - started
+
+    elapsed: float = asyncio.run(run())
+    pykka.ActorRegistry.stop_all()
+    assert elapsed < 8
+
+
+def test_failed_dispatch_does_not_shift_later_results():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robots = [Robot.start(offset=i, id=str(i), clock=VirtualClock(start)).proxy() for i in range(2)]
+    fleet_manager: FleetManager = FleetManager(robots=robots, visualizer=None)
+    sequence = fleet_manager._sequence
+    calls: List[str] = []
+
+    def sequence_once(state, goals, deadlines):
+        # The first batch fails while planning its second robot's share
+        calls.append(state.robot_id)
+        if len(calls) == 2:
+            raise RuntimeError("sequencing failed")
+        return sequence(state, goals, deadlines)
+
+    fleet_manager._sequence = sequence_once
+
+    async def run() -> Tuple[List[Any], List[Result]]:
+        backend = ActorBackend(fleet_manager)
+        async with AsyncFleetManager(backend, batch_size=8, batch_window=0.05) as manager:
+            failed = await asyncio.gather(
+                *(manager.submit(goal) for goal in GOALS), return_exceptions=True
+            )
+            results = await asyncio.wait_for(
+                asyncio.gather(*(manager.submit(goal) for goal in GOALS)), 5
+            )
+        return failed, results
+
+    failed, results = asyncio.run(run())
+    pykka.ActorRegistry.stop_all()
+    assert all(isinstance(error, RuntimeError) for error in failed)
+    assert all(result.success for result in results)
+    assert [result.goal.y for result in results] == [goal.y for goal in GOALS]
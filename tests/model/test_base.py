@@ -1,5 +1,5 @@
-from gherkin.common import Rotation, DIRECTION, SPEED, Angle
-from gherkin.model.base import RotatingBase
+from gherkin.common import Rotation, DIRECTION, SPEED, Angle, VirtualClock
+from gherkin.model.base import RotatingBase, RotationPlan
 
 
 def test_rotating_clockwise_fast():
@@ -31,4 +31,27 @@ def test_rotating_counterclockwise_fine():
     rotation: Rotation = Rotation(DIRECTION.COUNTER_CLOCKWISE, SPEED.FINE)
     expected = Angle(89)
     base.rotate(rotation)
-    assert base.angle == expected
\ No newline at end of file
+    assert base.angle == expected
+
+
+def test_plan_rotation_counts_fast_and_fine_steps():
+    base: RotatingBase = RotatingBase(_angle=Angle(300))
+    plan: RotationPlan = base.plan_rotation(Angle(27))
+    assert (plan.direction, plan.fast_steps, plan.fine_steps) == (DIRECTION.CLOCKWISE, 17, 2)
+    assert plan.duration == 19 * base.limits.DT
+
+
+def test_plan_rotation_already_facing_inverse():
+    base: RotatingBase = RotatingBase(_angle=Angle(190))
+    assert base.plan_rotation(Angle(10)).steps == 0
+
+
+def test_execute_rotation_plan_matches_stepping():
+    stepped: RotatingBase = RotatingBase(_angle=Angle(10), clock=VirtualClock())
+    skipped: RotatingBase = RotatingBase(_angle=Angle(10), clock=VirtualClock())
+    steps = []
+    stepped.execute(stepped.plan_rotation(Angle(293)), lambda: steps.append(stepped.angle))
+    skipped.execute(skipped.plan_rotation(Angle(293)))
+    assert len(steps) == 17
+    assert stepped.angle == skipped.angle == Angle(293)
+    assert abs(stepped.clock.elapsed - skipped.clock.elapsed) < 1e-9
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.engine import FleetEngine
+
+GOALS: List[Goal] = [
+    Goal(x=50, y=50, angle=Angle(20)),
+    Goal(x=-80, y=30, angle=Angle(170)),
+    Goal(x=10, y=-100, angle=Angle(95)),
+    Goal(x=200, y=0, angle=Angle(45)),
+]
+
+
+def test_engine_matches_robot_reach():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robot: Robot = Robot(0, id="1", clock=VirtualClock(start))
+    expected: List[Result] = [robot.reach(goal) for goal in GOALS]
+    engine: FleetEngine = FleetEngine(1, ids=["1"], start=start)
+    for goal in GOALS:
+        engine.assign(0, goal)
+    results: List[Result] = list(engine.run())
+    assert [result.goal for result in results] == [result.goal for result in expected]
+    assert [result.success for result in results] == [result.success for result in expected]
+    completed_at: List[datetime] = [result.completed_at for result in expected]
+    assert [result.completed_at for result in results] == completed_at
+    assert [result.ticks for result in results] == [result.ticks for result in expected]
+    assert engine.angle[0] == robot.base.angle.angle
+
+
+def test_engine_runs_robots_in_lock_step():
+    engine: FleetEngine = FleetEngine(3, ids=["1", "2", "3"])
+    engine.receive_goals(GOALS[:3] * 2)
+    results: List[Result] = list(engine.run())
+    assert len(results) == 6
+    assert all(result.success for result in results)
+    assert not engine.busy
@@ -1,9 +1,10 @@
 from typing import List
 
 import pykka
+import pytest
 from pykka import ActorProxy
 
-from gherkin.common import Goal, Angle
+from gherkin.common import Goal, Angle, Result, VirtualClock
 from gherkin.model import Robot
 from gherkin.model.arm import Arm
 from gherkin.model.fleet_manager import FleetManager
@@ -19,6 +20,7 @@ def test_robot_assignment_idle_robot():
         visualizer=None,
         robot_goals={"2": goals}
     )
+    manager._queued = {"2": len(goals)}
     goal: Goal = generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius())
     expected = "1"
     result: str = manager._select_robot(goal)
@@ -38,6 +40,7 @@ def test_robot_assignment_ignore_overworked_robot():
         visualizer=None,
         robot_goals={"1": [goal1], "2": goals, "3": [goal2]}
     )
+    manager._queued = {"1": 1, "2": len(goals), "3": 1}
     goal: Goal = generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius())
     result: str = manager._select_robot(goal)
     pykka.ActorRegistry.stop_all()
@@ -55,7 +58,117 @@ def test_robot_assignment_closest_goal():
         visualizer=None,
         robot_goals={"1": [goal1], "2": [goal2]}
     )
+    manager._queued = {"1": 1, "2": 1}
     goal: Goal = generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius())
     result: str = manager._select_robot(new_goal)
     pykka.ActorRegistry.stop_all()
-    assert result != "1"
+    # Both robots are equally busy, and robot 1 ends up right next to the new goal
+    assert result == "1"
+
+
+def test_unreachable_goals_are_rejected():
+    reachable: Goal = Goal(x=50, y=50, angle=Angle(20))
+    unreachable: Goal = Goal(x=200, y=0, angle=Angle(20))
+    robot1: ActorProxy = Robot.start(offset=1, id="1").proxy()
+    manager: FleetManager = FleetManager(robots=[robot1], visualizer=None)
+    result: List[int] = manager._filter_reachable([reachable, unreachable])
+    pykka.ActorRegistry.stop_all()
+    assert result == [0]
+    assert manager.rejected == [unreachable]
+
+
+def test_receive_goal_rejects_unreachable_goal():
+    unreachable: Goal = Goal(x=200, y=0, angle=Angle(20))
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot1], visualizer=None)
+    manager.receive_goal(unreachable)
+    pykka.ActorRegistry.stop_all()
+    assert manager.rejected == [unreachable]
+    assert manager.robot_goals == {}
+    assert manager._outstanding == 0
+
+
+def test_iter_results_streams_every_result():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)), Goal(x=-60, y=40, angle=Angle(30)),
+                         Goal(x=80, y=-20, angle=Angle(100))]
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    robot2: ActorProxy = Robot.start(offset=2, id="2", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot1, robot2], visualizer=None)
+    for goal, robot_id in zip(goals, ["1", "2", "1"]):
+        manager._dispatch(goal, robot_id)
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert len(results) == 3
+    assert all(result.success for result in results)
+    assert sorted(result.robot_id for result in results) == ["1", "1", "2"]
+
+
+def test_iter_results_stops_early():
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot1], visualizer=None, result_buffer=1)
+    for _ in range(4):
+        manager._dispatch(Goal(x=50, y=50, angle=Angle(10)), "1")
+    results = manager.iter_results()
+    first: Result = next(results)
+    results.close()
+    pykka.ActorRegistry.stop_all(block=True)
+    assert first.robot_id == "1"
+    assert manager._closed
+    with pytest.raises(RuntimeError):
+        manager.dispatch_goals([Goal(x=50, y=50, angle=Angle(10))])
+    with pytest.raises(RuntimeError):
+        next(manager.iter_results())
+
+
+def test_dispatch_goals_sends_chunks():
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)), Goal(x=60, y=40, angle=Angle(12)),
+                         Goal(x=70, y=30, angle=Angle(14)), Goal(x=55, y=45, angle=Angle(11))]
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot1], visualizer=None, chunk_size=3)
+    messages: List[List[Goal]] = []
+    dispatch_many = manager._dispatch_many
+    manager._dispatch_many = lambda chunk, robot_id: (
+        messages.append(chunk) or dispatch_many(chunk, robot_id)
+    )
+    manager.dispatch_goals(goals)
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert [len(chunk) for chunk in messages] == [3, 1]
+    assert len(results) == 4
+    assert all(result.success for result in results)
+    assert sorted(map(id, manager.robot_goals["1"])) == sorted(map(id, goals))
+
+
+def test_deadlines_follow_repeated_goals():
+    goal: Goal = Goal(x=50, y=50, angle=Angle(10))
+    goals: List[Goal] = [goal, Goal(x=200, y=0, angle=Angle(20)), goal]
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot1], visualizer=None)
+    sequenced: List[List[float]] = []
+    sequence = manager._sequence
+
+    def record_deadlines(state, share, deadlines):
+        sequenced.append(deadlines)
+        return sequence(state, share, deadlines)
+
+    manager._sequence = record_deadlines
+    manager.dispatch_goals(goals, [1., 2., 50.])
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert sequenced == [[1., 50.]]
+    assert len(results) == 2
+
+
+def test_receive_goal_joins_work_queues():
+    robot1: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    robot2: ActorProxy = Robot.start(offset=2, id="2", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(
+        robots=[robot1, robot2], visualizer=None, work_stealing=True
+    )
+    manager.receive_goal(Goal(x=50, y=50, angle=Angle(10)))
+    manager.receive_goal(Goal(x=-60, y=40, angle=Angle(30)))
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert len(results) == 2
+    assert all(result.success for result in results)
+    assert manager._queued == {}
@@ -0,0 +1,67 @@
+import time
+
+from gherkin.common import Angle, Goal, Result, RobotMetrics, VirtualClock
+from gherkin.model import Robot
+
+
+class CountingDisplay:
+    def __init__(self) -> None:
+        self.updates = 0
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> bool:
+        self.updates += 1
+        return True
+
+
+def test_robot_metrics_cover_every_phase():
+    metrics: RobotMetrics = RobotMetrics()
+    robot: Robot = Robot(offset=1, clock=VirtualClock(), metrics=metrics)
+    vis: CountingDisplay = CountingDisplay()
+    result: Result = robot.reach(
+        Goal(x=50, y=50, angle=Angle(20)), vis, dispatched_at=time.perf_counter()
+    )
+    snapshot = metrics.snapshot()
+    assert result.success
+    assert metrics.rotation_ticks == 4
+    assert metrics.rotation_ticks + metrics.arm_ticks == result.ticks
+    assert snapshot["visualizer"]["count"] == vis.updates == result.ticks
+    assert snapshot["limit_check"]["count"] == 2 * metrics.arm_ticks
+    assert snapshot["queue_wait"]["count"] == 1
+    assert abs(snapshot["rotation"]["mean"] - 4 * robot.base.limits.DT) < 0.01
+    assert snapshot["reach"]["mean"] > snapshot["rotation"]["mean"] + snapshot["arm"]["mean"]
+
+
+def test_robot_without_metrics_is_untouched():
+    robot: Robot = Robot(offset=1, clock=VirtualClock())
+    assert type(robot.arm.joint_0_checker).__name__ == "JointLimitChecker"
+
+
+class FailingDisplay(CountingDisplay):
+    def __init__(self, fail_after: int) -> None:
+        super().__init__()
+        self.fail_after = fail_after
+
+    def update_display(self, robot: Robot, goal: Goal, success: bool) -> bool:
+        if self.updates == self.fail_after:
+            raise RuntimeError("display lost")
+        return super().update_display(robot, goal, success)
+
+
+def test_failed_goal_never_counts_negative_arm_ticks():
+    metrics: RobotMetrics = RobotMetrics()
+    robot: Robot = Robot(offset=1, clock=VirtualClock(), metrics=metrics)
+    # Fails on the first arm tick, once all 4 rotation steps are done
+    result: Result = robot.reach(Goal(x=50, y=50, angle=Angle(20)), FailingDisplay(fail_after=4))
+    assert not result.success
+    assert result.ticks == 0
+    assert metrics.rotation_ticks == 4
+    assert metrics.arm_ticks == 0
+    assert metrics.snapshot()["arm"]["max"] == 0
+
+
+def test_reach_many_records_queue_wait_of_every_goal():
+    metrics: RobotMetrics = RobotMetrics()
+    robot: Robot = Robot(offset=1, clock=VirtualClock(), metrics=metrics)
+    goals = [Goal(x=50, y=50, angle=Angle(20)), Goal(x=-60, y=40, angle=Angle(30))]
+    robot.reach_many(goals, dispatched_at=time.perf_counter())
+    assert metrics.snapshot()["queue_wait"]["count"] == len(goals)
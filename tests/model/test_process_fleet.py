@@ -0,0 +1,48 @@
+import os
+from typing import List
+
+import numpy as np
+import pytest
+
+from gherkin.common import Angle, Goal, Result
+from gherkin.model.process_fleet import IDLE, STATUS, SUCCEEDED, FleetState, ProcessFleetManager
+
+
+def test_fleet_state_attach_sees_updates():
+    state: FleetState = FleetState.create(2)
+    monitor: FleetState = FleetState.attach(state.path, 2)
+    state.array[1] = (90, 0.5, 1.5, SUCCEEDED)
+    assert np.allclose(monitor.snapshot()[1], (90, 0.5, 1.5, SUCCEEDED))
+    state.unlink()
+    assert not os.path.exists(state.path)
+
+
+def test_process_fleet_reaches_goals():
+    goals: List[Goal] = [
+        Goal(x=50, y=50, angle=Angle(20)),
+        Goal(x=-80, y=30, angle=Angle(170)),
+        Goal(x=10, y=-100, angle=Angle(95)),
+        Goal(x=200, y=0, angle=Angle(45)),
+    ]
+    manager: ProcessFleetManager = ProcessFleetManager(2, num_workers=2, ids=["1", "2"]).start()
+    manager.receive_goals(goals)
+    results: List[Result] = list(manager.iter_results())
+    snapshot: np.ndarray = manager.state.snapshot()
+    manager.shutdown()
+    assert len(results) == 3
+    assert all(result.success for result in results)
+    assert manager.rejected == [goals[3]]
+    assert (snapshot[:, STATUS] == IDLE).all()
+
+
+def test_process_fleet_raises_when_a_worker_dies():
+    manager: ProcessFleetManager = ProcessFleetManager(
+        2, num_workers=2, realtime=True, ids=["1", "2"], poll_interval=0.05
+    ).start()
+    manager.receive_goals([Goal(x=50, y=50, angle=Angle(20)), Goal(x=-80, y=30, angle=Angle(170))])
+    for process in manager._workers:
+        process.kill()
+        process.join()
+    with pytest.raises(RuntimeError, match="exited"):
+        list(manager.iter_results())
+    manager.state.unlink()
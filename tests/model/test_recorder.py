@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.recorder import MemmapRecorder, RingBufferRecorder, load_trace
+
+
+def test_ring_buffer_keeps_the_last_ticks():
+    recorder: RingBufferRecorder = RingBufferRecorder(capacity=4)
+    for tick in range(10):
+        recorder.record(float(tick), tick, tick / 10, -tick / 10)
+    trace: np.ndarray = recorder.trace()
+    assert trace["time"].tolist() == [6., 7., 8., 9.]
+    assert trace["theta_1"][-1] == -0.9
+
+
+def test_memmap_recorder_spills_every_tick(tmp_path):
+    path: str = str(tmp_path / "robot.trace")
+    recorder: MemmapRecorder = MemmapRecorder(path, chunk=3)
+    for tick in range(10):
+        recorder.record(float(tick), tick, 0., 0.)
+    recorder.close()
+    trace: np.ndarray = load_trace(path)
+    assert trace["time"].tolist() == [float(tick) for tick in range(10)]
+    assert recorder.trace()["time"].tolist() == trace["time"].tolist()
+
+
+def test_memmap_recorder_rejects_ticks_once_closed(tmp_path):
+    recorder: MemmapRecorder = MemmapRecorder(str(tmp_path / "robot.trace"))
+    recorder.record(0., 0., 0., 0.)
+    recorder.close()
+    recorder.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        recorder.record(1., 0., 0., 0.)
+
+
+def test_robot_records_every_tick():
+    recorder: RingBufferRecorder = RingBufferRecorder(capacity=10000)
+    robot: Robot = Robot(offset=1, clock=VirtualClock(), recorder=recorder)
+    result: Result = robot.reach(Goal(x=50, y=50, angle=Angle(20)))
+    trace: np.ndarray = recorder.trace()
+    assert result.success
+    assert trace["angle"][0] == 5 and trace["angle"][-1] == 20
+    assert np.all(np.diff(trace["time"]) > 0)
+    assert (trace["theta_0"][-1], trace["theta_1"][-1]) == (robot.arm.theta_0, robot.arm.theta_1)
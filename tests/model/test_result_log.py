@@ -0,0 +1,78 @@
+import json
+from datetime import datetime
+from typing import List
+
+import numpy as np
+import pykka
+import pytest
+from pykka import ActorProxy
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.fleet_manager import FleetManager
+from gherkin.model.result_log import LIMIT_EXCEEDED, NO_ERROR, UNREACHABLE, ResultLog, read_results
+
+RESULTS: List[Result] = [
+    Result("1", Goal(x=50, y=50, angle=Angle(20)), True, datetime(2021, 6, 1, 12, 0, 1), None, 40),
+    Result("2", Goal(x=200, y=0, angle=Angle(np.int64(90))), False, datetime(2021, 6, 1, 12, 0, 2),
+           ValueError("math domain error"), 0),
+    Result("1", Goal(x=-50, y=20, angle=Angle(5)), False, datetime(2021, 6, 1, 12, 0, 3),
+           AssertionError("Joint 0 value 7 exceeds joint limits"), 12),
+]
+
+
+def test_binary_log_round_trips(tmp_path):
+    path: str = str(tmp_path / "results.bin")
+    with ResultLog(path, batch_size=2) as log:
+        for result in RESULTS:
+            log.write(result)
+    records: np.ndarray = read_results(path)
+    assert records["robot_id"].tolist() == [b"1", b"2", b"1"]
+    assert records["x"].tolist() == [50, 200, -50]
+    assert records["success"].tolist() == [True, False, False]
+    assert records["ticks"].tolist() == [40, 0, 12]
+    assert records["error"].tolist() == [NO_ERROR, UNREACHABLE, LIMIT_EXCEEDED]
+    assert records["completed_at"][0] == RESULTS[0].completed_at.timestamp()
+
+
+def test_jsonl_log(tmp_path):
+    path: str = str(tmp_path / "results.jsonl")
+    with ResultLog(path, jsonl=True) as log:
+        for result in RESULTS:
+            log.write(result)
+    with open(path) as file:
+        lines = [json.loads(line) for line in file]
+    assert [line["angle"] for line in lines] == [20, 90, 5]
+    assert lines[1]["error"] == "ValueError('math domain error')"
+
+
+def test_fleet_manager_logs_results(tmp_path):
+    path: str = str(tmp_path / "results.bin")
+    robot: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    log: ResultLog = ResultLog(path)
+    manager: FleetManager = FleetManager(robots=[robot], visualizer=None, result_log=log)
+    manager.dispatch_goals([Goal(x=50, y=50, angle=Angle(10)), Goal(x=-60, y=40, angle=Angle(30))])
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    log.close()
+    records: np.ndarray = read_results(path)
+    assert len(records) == 2
+    assert records["ticks"].tolist() == [result.ticks for result in results]
+
+
+def test_append_errors_are_raised(tmp_path):
+    log: ResultLog = ResultLog(str(tmp_path / "results.bin"))
+    log._file.close()
+    log.write(RESULTS[0])
+    with pytest.raises(RuntimeError, match="result log"):
+        log.close()
+    with pytest.raises(RuntimeError):
+        log.write(RESULTS[1])
+
+
+def test_full_queue_waits_for_the_writer(tmp_path):
+    path: str = str(tmp_path / "results.bin")
+    with ResultLog(path, batch_size=1, max_pending=1) as log:
+        for result in RESULTS * 10:
+            log.write(result)
+    assert len(read_results(path)) == 30
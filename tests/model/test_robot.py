@@ -1,6 +1,10 @@
-from gherkin.common import Angle, Goal, DIRECTION, Rotation, SPEED
+from datetime import datetime
+from typing import List
+
+from gherkin.common import Angle, Goal, DIRECTION, Result, Rotation, SPEED, VirtualClock
 from gherkin.model import Robot
 from gherkin.model.base import RotatingBase
+from gherkin.model.robot import SETTLE_TIME
 
 
 def test_check_angle_match():
@@ -98,4 +102,45 @@ def test_evaluate_goal_change_facing_inverse_angle():
     robot: Robot = Robot(1)
     goal: Goal = Goal(x=50, y=50, angle=Angle(170))
     expected: Goal = Goal(x=-50, y=50, angle=Angle(350))
-    assert robot._evaluate_goal(goal) == expected
\ No newline at end of file
+    assert robot._evaluate_goal(goal) == expected
+
+
+def test_reach_on_virtual_clock():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robot: Robot = Robot(1, clock=VirtualClock(start))
+    goal: Goal = Goal(x=50, y=50, angle=Angle(20))
+    result: Result = robot.reach(goal)
+    assert result.success
+    assert result.completed_at > start
+    assert robot.arm.clock is robot.clock
+    assert robot.base.clock is robot.clock
+
+
+def test_reach_concurrent_motion_overlaps_rotation_and_arm():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    goal: Goal = Goal(x=-80, y=60, angle=Angle(60))
+    sequential: Robot = Robot(offset=0, clock=VirtualClock(start))
+    concurrent: Robot = Robot(offset=0, clock=VirtualClock(start), concurrent_motion=True)
+    expected: Result = sequential.reach(goal)
+    result: Result = concurrent.reach(goal)
+    assert result.success
+    assert result.goal == expected.goal
+    assert concurrent._check_angle(result.goal)
+    assert result.completed_at < expected.completed_at
+
+
+def test_reach_many_settles_only_after_last_goal():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    goals: List[Goal] = [Goal(x=50, y=50, angle=Angle(20)), Goal(x=-60, y=40, angle=Angle(30)),
+                         Goal(x=80, y=-20, angle=Angle(100))]
+    one_by_one: Robot = Robot(offset=0, clock=VirtualClock(start))
+    batched: Robot = Robot(offset=0, clock=VirtualClock(start))
+    expected: List[Result] = [one_by_one.reach(goal) for goal in goals]
+    streamed: List[Result] = []
+    results: List[Result] = batched.reach_many(goals, on_result=streamed.append)
+    assert streamed == results
+    assert [result.goal for result in results] == [result.goal for result in expected]
+    assert [result.ticks for result in results] == [result.ticks for result in expected]
+    assert all(result.success for result in results)
+    saved = (expected[-1].completed_at - results[-1].completed_at).total_seconds()
+    assert saved == (len(goals) - 1) * SETTLE_TIME
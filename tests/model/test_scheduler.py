@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import List
+
+import pykka
+from pykka import ActorProxy
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.assignment import GOAL_TIME_ESTIMATE, RobotState
+from gherkin.model.fleet_manager import FleetManager
+from gherkin.model.scheduler import WorkQueues, estimate_work
+from gherkin.model.sequencing import SERVICE_TIME
+from gherkin.model.trajectory import ProportionalController
+
+GOALS: List[Goal] = [Goal(x=50, y=50, angle=Angle(10)), Goal(x=60, y=40, angle=Angle(40)),
+                     Goal(x=-70, y=30, angle=Angle(90)), Goal(x=55, y=-45, angle=Angle(150))]
+
+
+def test_pop_takes_own_head_then_steals_tail_of_busiest():
+    queues: WorkQueues = WorkQueues(["1", "2", "3"])
+    queues.push("1", GOALS[:2], [1., 1.])
+    queues.push("2", GOALS[2:], [5., 5.])
+    assert queues.pop("1") is GOALS[0]
+    assert queues.pop("3") is GOALS[3]
+    assert queues.stolen == 1
+    assert queues.remaining("2") == 5.
+    assert queues.last_goal("2") is GOALS[2]
+    assert queues.last_goal("3") is GOALS[3]
+
+
+def test_claim_idle_wakes_every_idle_robot_once():
+    queues: WorkQueues = WorkQueues(["1", "2"])
+    assert queues.claim_idle() == []
+    queues.push("1", GOALS[:1], [1.])
+    assert queues.claim_idle() == ["1", "2"]
+    assert queues.claim_idle() == []
+    assert queues.pop("2") is GOALS[0]
+    assert queues.pop("1") is None
+    queues.push("2", GOALS[1:2], [1.])
+    assert queues.claim_idle() == ["1"]
+
+
+def test_estimate_work_includes_service_time():
+    estimates: List[float] = estimate_work(RobotState("1"), GOALS)
+    assert len(estimates) == len(GOALS)
+    assert all(estimate > SERVICE_TIME for estimate in estimates)
+
+
+def test_idle_robots_steal_from_slow_robot():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    slow: ActorProxy = Robot.start(
+        offset=0, id="slow", clock=VirtualClock(start),
+        controller=ProportionalController(divisor=60)
+    ).proxy()
+    fast: ActorProxy = Robot.start(offset=1, id="fast", clock=VirtualClock(start)).proxy()
+    manager: FleetManager = FleetManager(robots=[slow, fast], visualizer=None, work_stealing=True)
+    manager._queues.push("slow", GOALS * 3, [GOAL_TIME_ESTIMATE] * len(GOALS) * 3)
+    for robot_id in manager._queues.claim_idle():
+        manager.id_robot[robot_id].work(manager._queues, None, manager._publish_result)
+    manager._outstanding = len(GOALS) * 3
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert len(results) == len(GOALS) * 3
+    assert all(result.success for result in results)
+    assert "fast" in {result.robot_id for result in results}
+    assert manager.stolen > 0
+
+
+def test_dispatch_goals_with_work_stealing_reaches_every_goal():
+    robots: List[ActorProxy] = [
+        Robot.start(offset=i, id=str(i), clock=VirtualClock()).proxy() for i in range(3)
+    ]
+    manager: FleetManager = FleetManager(robots=robots, visualizer=None, work_stealing=True)
+    manager.dispatch_goals(GOALS * 2)
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert len(results) == len(GOALS) * 2
+    assert all(result.success for result in results)
+    assert all(manager._queues.queued(str(i)) == 0 for i in range(3))
+
+
+def test_pop_steals_only_goals_the_thief_finishes_sooner():
+    queues: WorkQueues = WorkQueues(["1", "2"])
+    queues.push("1", GOALS[:2], [10., 10.])
+    assert queues.pop("1", now=0.) is GOALS[0]
+    # Robot 1 is projected to finish its second goal at 20, so a thief that would be done at 25
+    # waits
+    assert queues.pop("2", now=15.) is None
+    assert queues.stolen == 0
+    assert queues.pop("2", now=5.) is GOALS[1]
+    assert queues.stolen == 1
+
+
+def test_pace_is_learnt_from_reported_times():
+    queues: WorkQueues = WorkQueues(["1"])
+    queues.push("1", GOALS[:2], [2., 2.])
+    assert queues.pace("1") == 1.
+    queues.pop("1", now=0.)
+    queues.pop("1", now=6.)
+    assert queues.pace("1") == 3.
+
+
+def _uneven_makespan(work_stealing: bool) -> float:
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    robots: List[ActorProxy] = [
+        Robot.start(
+            offset=i, id=str(i), clock=VirtualClock(start),
+            controller=ProportionalController(divisor=60 if i == 0 else 10)
+        ).proxy()
+        for i in range(3)
+    ]
+    manager: FleetManager = FleetManager(
+        robots=robots, visualizer=None, work_stealing=work_stealing
+    )
+    manager.dispatch_goals(GOALS * 3)
+    finished: List[datetime] = [result.completed_at for result in manager.iter_results()]
+    pykka.ActorRegistry.stop_all()
+    return (max(finished) - start).total_seconds()
+
+
+def test_work_stealing_shortens_makespan_of_uneven_fleet():
+    assert _uneven_makespan(work_stealing=True) < 0.6 * _uneven_makespan(work_stealing=False)
@@ -0,0 +1,56 @@
+import itertools
+from typing import List
+
+import numpy as np
+import pykka
+from pykka import ActorProxy
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.assignment import RobotState
+from gherkin.model.fleet_manager import FleetManager
+from gherkin.model.sequencing import sequence_goals, transition_costs
+
+GOALS: List[Goal] = [
+    Goal(x=50, y=50, angle=Angle(0)),
+    Goal(x=60, y=40, angle=Angle(90)),
+    Goal(x=50, y=55, angle=Angle(5)),
+    Goal(x=60, y=45, angle=Angle(95)),
+    Goal(x=50, y=60, angle=Angle(10)),
+    Goal(x=60, y=50, angle=Angle(100)),
+]
+
+
+def tour_cost(costs: np.ndarray, order: List[int]) -> float:
+    tour = [0] + [index + 1 for index in order]
+    return float(sum(costs[a, b] for a, b in zip(tour, tour[1:])))
+
+
+def test_sequence_goals_is_near_optimal():
+    state: RobotState = RobotState("1")
+    costs: np.ndarray = transition_costs(state, GOALS)
+    order: List[int] = sequence_goals(state, GOALS)
+    tours = itertools.permutations(range(len(GOALS)))
+    best: float = min(tour_cost(costs, list(tour)) for tour in tours)
+    assert sorted(order) == list(range(len(GOALS)))
+    assert tour_cost(costs, order) <= best * 1.05
+    assert tour_cost(costs, order) < tour_cost(costs, list(range(len(GOALS))))
+
+
+def test_sequence_goals_meets_deadline():
+    state: RobotState = RobotState("1")
+    deadlines = [None] * len(GOALS)
+    deadlines[5] = 2.
+    order: List[int] = sequence_goals(state, GOALS, deadlines)
+    assert order[0] == 5
+
+
+def test_fleet_manager_sequences_each_share():
+    robot: ActorProxy = Robot.start(offset=1, id="1", clock=VirtualClock()).proxy()
+    manager: FleetManager = FleetManager(robots=[robot], visualizer=None)
+    manager.dispatch_goals(GOALS)
+    results: List[Result] = list(manager.iter_results())
+    pykka.ActorRegistry.stop_all()
+    assert all(result.success for result in results)
+    assert manager.robot_goals["1"] != GOALS
+    assert sorted(manager.robot_goals["1"]) == sorted(GOALS)
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import numpy as np
+
+from gherkin.common import Angle, Goal, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.arm import Arm, ArmLimits
+from gherkin.model.trajectory import (
+    ProportionalController, TrapezoidalController, trapezoidal_profile
+)
+
+
+def test_trapezoidal_profile_respects_limits():
+    limits: ArmLimits = ArmLimits()
+    for distance in [0.01, 0.5, 2., 5.]:
+        profile: np.ndarray = trapezoidal_profile(
+            distance, limits.MAX_VELOCITY, limits.MAX_ACCELERATION, limits.DT
+        )
+        position: np.ndarray = np.concatenate([[0., 0.], profile, [1.]]) * distance
+        velocity: np.ndarray = np.diff(position) / limits.DT
+        acceleration: np.ndarray = np.diff(velocity) / limits.DT
+        assert profile[-1] == 1.
+        assert np.all(np.abs(velocity) <= limits.MAX_VELOCITY + 1e-9)
+        assert np.all(np.abs(acceleration) <= limits.MAX_ACCELERATION + 1e-9)
+
+
+def test_trapezoidal_controller_reaches_goal_within_limits():
+    arm: Arm = Arm(clock=VirtualClock())
+    goal_theta_0, goal_theta_1 = Arm.inverse(-80, 60)
+    controller: TrapezoidalController = TrapezoidalController()
+    controller.start(arm, goal_theta_0, goal_theta_1)
+    for _ in range(controller.ticks):
+        # The arm's limit checks are never reset, so they cover the whole move
+        controller.step(arm)
+    assert (arm.theta_0, arm.theta_1) == (goal_theta_0, goal_theta_1)
+
+
+def test_trapezoidal_controller_beats_proportional():
+    goal_theta_0, goal_theta_1 = Arm.inverse(-80, 60)
+    arm: Arm = Arm(clock=VirtualClock())
+    proportional: ProportionalController = ProportionalController()
+    proportional.start(arm, goal_theta_0, goal_theta_1)
+    ticks = 0
+    while not np.allclose(arm.joint_2_pos(), (-80, 60), atol=0.25):
+        proportional.step(arm)
+        arm.reset()
+        ticks += 1
+    trapezoidal: TrapezoidalController = TrapezoidalController()
+    trapezoidal.start(Arm(), goal_theta_0, goal_theta_1)
+    assert trapezoidal.ticks < ticks
+
+
+def test_reach_with_trapezoidal_controller():
+    start: datetime = datetime(2021, 6, 1, 12, 0, 0)
+    proportional: Robot = Robot(0, clock=VirtualClock(start))
+    trapezoidal: Robot = Robot(0, clock=VirtualClock(start), controller=TrapezoidalController())
+    goal: Goal = Goal(x=-80, y=60, angle=Angle(0))
+    expected: Result = proportional.reach(goal)
+    result: Result = trapezoidal.reach(goal)
+    assert result.success
+    assert result.completed_at < expected.completed_at
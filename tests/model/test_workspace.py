@@ -0,0 +1,75 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+import pytest
+
+from gherkin.common import ELBOW, Goal, Angle, Result, VirtualClock
+from gherkin.model import Robot
+from gherkin.model.arm import Arm
+from gherkin.model.workspace import WorkspaceTable, workspace_table
+
+
+def test_lookup_matches_inverse():
+    table: WorkspaceTable = workspace_table(Arm.link_1, Arm.link_2)
+    for x, y in [(50, 50), (-80, 30), (10, -100), (0, 125), (-25, 0)]:
+        assert np.allclose(table.lookup(x, y), Arm.inverse(x, y), atol=1e-5)
+
+
+def test_lookup_both_elbows_reach_the_point():
+    table: WorkspaceTable = workspace_table(Arm.link_1, Arm.link_2)
+    down = table.lookup(-80, 30, ELBOW.DOWN)
+    up = table.lookup(-80, 30, ELBOW.UP)
+    assert down != up
+    for theta_0, theta_1 in (down, up):
+        assert np.allclose(Arm.forward(theta_0, theta_1), (-80, 30), atol=1e-3)
+
+
+def test_lookup_interpolates_between_pixels():
+    table: WorkspaceTable = workspace_table(Arm.link_1, Arm.link_2)
+    for x, y in [(50.5, 50.25), (-80.3, 30.9), (0.5, 124.2)]:
+        theta_0, theta_1 = table.lookup(x, y, ELBOW.UP)
+        forward_x, forward_y = Arm.forward(theta_0, theta_1)
+        assert math.hypot(forward_x - x, forward_y - y) < 0.05
+
+
+def test_lookup_rejects_unreachable():
+    table: WorkspaceTable = workspace_table(Arm.link_1, Arm.link_2)
+    assert not table.reachable(200, 0)
+    assert not table.reachable(3, 4)
+    assert table.reachable(50, 50)
+    reachable: np.ndarray = table.reachable_batch([200, 3, 50, 50.5], [0, 4, 50, 50.5])
+    assert reachable.tolist() == [False, False, True, True]
+    with pytest.raises(ValueError):
+        table.lookup(200, 0)
+
+
+def test_tables_follow_link_lengths():
+    assert workspace_table(75., 50.) is workspace_table(75, 50)
+    table: WorkspaceTable = workspace_table(60., 50.)
+    assert table.reachable(105, 0)
+    assert not table.reachable(115, 0)
+
+
+def test_table_memory_maps_from_disk(tmp_path):
+    built: WorkspaceTable = WorkspaceTable.build(75., 50., str(tmp_path / "table.npy"))
+    loaded: WorkspaceTable = WorkspaceTable.load(75., 50., str(tmp_path / "table.npy"))
+    assert isinstance(loaded.solutions, np.memmap)
+    assert loaded.radius == built.radius
+    assert loaded.lookup(50, 50) == built.lookup(50, 50)
+
+
+def test_concurrent_first_use_builds_one_table(tmp_path):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tables: List[WorkspaceTable] = list(executor.map(
+            lambda _: workspace_table(61., 37., str(tmp_path)), range(8)
+        ))
+    assert all(table is tables[0] for table in tables)
+    assert [path.name for path in tmp_path.iterdir()] == ["workspace-61-37.npy"]
+
+
+def test_reach_with_workspace_table():
+    robot: Robot = Robot(offset=1, clock=VirtualClock(), use_workspace_table=True)
+    result: Result = robot.reach(Goal(x=50, y=50, angle=Angle(20)))
+    assert result.success
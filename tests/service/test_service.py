@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from gherkin.common import Angle, Goal, Result
+from gherkin.model.async_fleet import AsyncFleetManager, EngineBackend
+from gherkin.model.engine import FleetEngine
+from gherkin.model.result_log import NO_ERROR, UNREACHABLE
+from gherkin.service import run_load, serve
+from gherkin.service.server import GoalServer
+from gherkin.service.protocol import (
+    GOALS, HEADER, RESULTS, decode_payload, encode_frame, goal_records, parse_address,
+    result_records, to_goal
+)
+
+SAMPLE_GOALS: List[Goal] = [
+    Goal(x=50, y=50, angle=Angle(10)), Goal(x=-60, y=40, angle=Angle(30)),
+    Goal(x=80, y=-20, angle=Angle(100)), Goal(x=55, y=-45, angle=Angle(150))
+]
+
+
+def test_goal_frames_round_trip():
+    frame: bytes = encode_frame(GOALS, goal_records([7, 8, 9, 10], SAMPLE_GOALS))
+    kind, length = HEADER.unpack(frame[:HEADER.size])
+    records = decode_payload(kind, frame[HEADER.size:])
+    assert kind == GOALS
+    assert length == len(frame) - HEADER.size
+    assert records["request_id"].tolist() == [7, 8, 9, 10]
+    assert [to_goal(record) for record in records] == SAMPLE_GOALS
+
+
+def test_result_frames_round_trip():
+    results: List[Result] = [
+        Result("robot-1", SAMPLE_GOALS[0], True, datetime(2021, 6, 1, 12), None, 42),
+        Result("", SAMPLE_GOALS[1], False, datetime(2021, 6, 1, 12), ValueError("unreachable")),
+    ]
+    frame: bytes = encode_frame(RESULTS, result_records([3, 4], results))
+    records = decode_payload(RESULTS, frame[HEADER.size:])
+    assert records["robot_id"].tolist() == [b"robot-1", b""]
+    assert records["success"].tolist() == [True, False]
+    assert records["ticks"].tolist() == [42, 0]
+    assert records["error"].tolist() == [NO_ERROR, UNREACHABLE]
+
+
+def test_uuid_robot_ids_are_sent_whole():
+    robot_id: str = str(uuid.uuid4())
+    results: List[Result] = [
+        Result(robot_id, SAMPLE_GOALS[0], True, datetime(2021, 6, 1, 12), None, 42)
+    ]
+    frame: bytes = encode_frame(RESULTS, result_records([3], results))
+    records = decode_payload(RESULTS, frame[HEADER.size:])
+    assert records["robot_id"][0].decode() == robot_id
+
+
+class BrokenWriter:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    def write(self, data: bytes) -> None:
+        raise self.error
+
+    async def drain(self) -> None:
+        pass
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError("reset"), OSError("disk on fire")])
+def test_flush_loop_logs_failed_writes(caplog, error):
+    async def run() -> None:
+        ready, done = asyncio.Event(), asyncio.Event()
+        outbox = [(1, Result("1", SAMPLE_GOALS[0], True, datetime(2021, 6, 1, 12), None, 1))]
+        ready.set()
+        await asyncio.wait_for(GoalServer._flush_loop(BrokenWriter(error), outbox, ready, done), 1)
+
+    asyncio.run(run())
+    assert "1 results" in caplog.text
+
+
+def test_malformed_payload_is_rejected():
+    with pytest.raises(ValueError):
+        decode_payload(GOALS, b"\x00" * 3)
+    with pytest.raises(ValueError):
+        decode_payload(99, b"")
+
+
+def test_parse_address():
+    assert parse_address("unix:/tmp/gherkin.sock") == (None, None, "/tmp/gherkin.sock")
+    assert parse_address("localhost:7000") == ("localhost", 7000, None)
+    assert parse_address(":7000") == ("127.0.0.1", 7000, None)
+    with pytest.raises(ValueError):
+        parse_address("/tmp/gherkin.sock")
+
+
+@pytest.mark.parametrize("unix", [True, False])
+def test_load_generator_gets_every_result(tmp_path, unix):
+    async def run() -> Dict[str, Any]:
+        async with AsyncFleetManager(EngineBackend(FleetEngine(3))) as manager:
+            address = f"unix:{tmp_path / 'gherkin.sock'}" if unix else "127.0.0.1:0"
+            server = await serve(manager, address)
+            if not unix:
+                address = "127.0.0.1:{}".format(server.sockets[0].getsockname()[1])
+            async with server:
+                return await run_load(address, SAMPLE_GOALS * 25, batch_size=16)
+
+    report: Dict[str, Any] = asyncio.run(run())
+    assert report["goals"] == 100
+    assert report["failures"] == 0
+    assert report["goals_per_s"] > 0
+    assert 0 < report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert np.isfinite(report["wall_s"])
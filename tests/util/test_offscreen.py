@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from gherkin.common import Angle, Goal, VirtualClock
+from gherkin.model import Robot
+from gherkin.util import generate_visualizer
+from gherkin.util.offscreen import ArrayFrameSink, MemmapFrameSink, PngFrameSink, RawFrameSink
+
+
+def _record(sink, num_frames: int = 2):
+    vis = generate_visualizer(1, fps=10, offscreen=True, sink=sink)
+    robot: Robot = Robot(0, clock=VirtualClock())
+    vis.update_display(robot, Goal(x=50, y=50, angle=Angle(10)), True)
+    robot.clock.sleep((num_frames - 1) / 10)
+    vis.update_display(robot, Goal(x=50, y=50, angle=Angle(10)), True)
+    vis.cleanup()
+    return vis
+
+
+def test_offscreen_draws_robot():
+    sink: ArrayFrameSink = ArrayFrameSink()
+    vis = _record(sink)
+    assert vis.frames_written == len(sink.frames)
+    frame: np.ndarray = sink.frames[-1]
+    assert frame.shape == (400, 300, 3)
+    # The goal is drawn in red, 50 pixels right of and above the robot's origin
+    assert tuple(frame[150 - 50, 150 + 50]) == vis.RED
+
+
+def test_png_sink_writes_numbered_files(tmp_path):
+    sink: PngFrameSink = PngFrameSink(str(tmp_path))
+    _record(sink)
+    assert os.path.exists(tmp_path / "frame_000000.png")
+
+
+def test_raw_sink_writes_whole_frames(tmp_path):
+    path = str(tmp_path / "frames.rgb")
+    vis = _record(RawFrameSink(path))
+    assert os.path.getsize(path) == vis.frames_written * 400 * 300 * 3
+
+
+def test_memmap_sink_drops_frames_past_capacity(tmp_path):
+    path = str(tmp_path / "frames.bin")
+    sink: MemmapFrameSink = MemmapFrameSink(path, width=300, height=400, capacity=1)
+    vis = _record(sink, num_frames=3)
+    assert vis.frames_written == 3
+    assert sink.count == 1
+    assert os.path.getsize(path) == 400 * 300 * 3
+
+
+def test_offscreen_samples_frames_on_the_robot_clock():
+    sink: ArrayFrameSink = ArrayFrameSink()
+    vis = _record(sink, num_frames=31)
+    # Three seconds of robot time at 10 fps, however little wall time the virtual clock took
+    assert vis.frames_written == len(sink.frames) == 31
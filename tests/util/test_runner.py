@@ -0,0 +1,5 @@
+from gherkin.util.runner import Runner
+
+
+def test_runner_imports():
+    assert callable(Runner.cleanup)
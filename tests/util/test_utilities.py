@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from gherkin.common import Goal
+from gherkin.model.arm import Arm
+from gherkin.util import generate_random_goal, generate_random_goals
+from gherkin.util.utilities import GOAL_DTYPE, GOAL_SHAPES, generate_random_goal_array
+
+
+@pytest.mark.parametrize("shape", GOAL_SHAPES)
+def test_generated_goals_are_reachable(shape):
+    goals = generate_random_goal_array(5_000, 7, shape)
+    _, _, valid = Arm.inverse_batch(goals["x"].astype(float), goals["y"].astype(float))
+    assert goals.dtype == GOAL_DTYPE
+    assert valid.all()
+    assert np.hypot(goals["x"], goals["y"]).min() >= Arm.min_reachable_radius()
+    assert ((goals["angle"] >= 0) & (goals["angle"] < 180)).all()
+
+
+def test_generated_goals_are_reproducible():
+    first = generate_random_goals(100, 1234)
+    second = generate_random_goals(100, np.random.default_rng(1234))
+    assert first == second
+    assert first != generate_random_goals(100, 4321)
+    assert all(isinstance(goal, Goal) and type(goal.angle.angle) is int for goal in first)
+
+
+def test_adversarial_goals_need_a_quarter_turn_each():
+    goals = generate_random_goal_array(10, 3, "adversarial")
+    turns = np.abs(np.diff(goals["angle"].astype(int)))
+    assert (np.minimum(turns, 180 - turns) == 90).all()
+    assert (np.sign(goals["x"][1:]) != np.sign(goals["x"][:-1])).any()
+
+
+def test_unknown_shape_is_rejected():
+    with pytest.raises(ValueError):
+        generate_random_goals(10, shape="spiral")
+
+
+def test_random_goal_never_falls_inside_minimum_radius():
+    np.random.seed(0)
+    goals = [
+        generate_random_goal(Arm.min_reachable_radius(), Arm.max_reachable_radius())
+        for _ in range(5_000)
+    ]
+    assert min(np.hypot(goal.x, goal.y) for goal in goals) >= Arm.min_reachable_radius()
@@ -0,0 +1,43 @@
+import os
+import threading
+import time
+from typing import List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from gherkin.common import Angle, Goal  # noqa: E402
+from gherkin.model import Robot  # noqa: E402
+from gherkin.util import generate_visualizer  # noqa: E402
+
+
+def test_update_display_is_rendered_by_renderer_thread():
+    vis = generate_visualizer(2, fps=200)
+    robot: Robot = Robot(1)
+    assert vis.update_display(robot, Goal(x=50, y=50, angle=Angle(10)), False)
+    deadline = time.time() + 2
+    while vis._dirty and time.time() < deadline:
+        time.sleep(0.01)
+    dirty = set(vis._dirty)
+    vis.cleanup()
+    assert not dirty
+    assert vis._snapshots[1].goal == (50, 50)
+
+
+def test_pump_presents_prepared_regions_on_the_main_thread():
+    vis = generate_visualizer(2, fps=200)
+    vis._stop.set()
+    vis._renderer.join()
+    vis.update_display(Robot(0), Goal(x=50, y=50, angle=Angle(10)), True)
+    assert vis.render_frame()
+    presented: List[pygame.Rect] = []
+    vis._present = presented.extend
+    worker = threading.Thread(target=vis.pump)
+    worker.start()
+    worker.join()
+    assert not presented
+    vis.pump()
+    assert presented == [pygame.Rect(0, 0, 300, 400)]
+    assert not vis._prepared
+    vis.cleanup()